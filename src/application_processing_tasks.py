@@ -1,20 +1,37 @@
+import os
 import logging
 import asyncio
 
-from typing import Tuple, List
+from typing import Awaitable, Callable, Tuple, List, Iterable, Optional
 from datetime import timezone, datetime
+from dotenv import load_dotenv
 
 from src.gigachat_module.resume_screening import ResumeScreening
-from src.gigachat_module.parser import parse_multiple_resumes
+from src.gigachat_module.parser import parse_resume
+from src.gigachat_module.utils.fetcher import ResumeFetcher
 
 from src.database.session import Session
 from src.database.models import Vacancy, BotQuestion
-from src.database.utils.entry_creation import create_candidates_entries
+from src.database.utils.entry_creation import create_candidates_entries_batch
 from src.database.utils.entry_update import update_candidate_entry_resume_score
 
 from tests.bot_questions_data import QUESTION_DATA
 
 logger = logging.getLogger(__name__)
+load_dotenv()
+
+# Количество воркеров на каждой стадии конвейера обработки резюме
+PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", "4"))
+PERSIST_WORKERS = int(os.getenv("RESUME_PERSIST_WORKERS", "1"))
+SCREEN_WORKERS = int(os.getenv("RESUME_SCREEN_WORKERS", "2"))
+# Размер очереди между стадиями конвейера
+PIPELINE_QUEUE_SIZE = int(os.getenv("RESUME_PIPELINE_QUEUE_SIZE", "20"))
+# Максимальное количество резюме, сохраняемых в БД одной транзакцией на стадии сохранения
+PERSIST_BATCH_SIZE = int(os.getenv("RESUME_PERSIST_BATCH_SIZE", "20"))
+
+# Маркер завершения работы воркера стадии
+_STOP = object()
+
 resume_screener = ResumeScreening()
 
 def fetch_new_resumes_data() -> List[Tuple[str, int]]:
@@ -62,8 +79,155 @@ def fetch_new_resumes_data() -> List[Tuple[str, int]]:
     return test_return_data
 
 
-async def resumes_processing_task(delay_hours: int = 24) -> None:
+async def _parse_stage(
+    in_queue: asyncio.Queue,
+    out_queue: asyncio.Queue,
+    fetcher: ResumeFetcher
+) -> None:
+    '''Стадия парсинга: (URL, ID вакансии) -> ResumeData'''
+    while True:
+        item = await in_queue.get()
+        try:
+            if item is _STOP:
+                return
+            url, vacancy_id = item
+            resume_data = await parse_resume(url, vacancy_id, fetcher)
+            if resume_data:
+                await out_queue.put(resume_data)
+        except Exception as e:
+            logger.error(f'Failed to parse resume {item}: {str(e)}')
+        finally:
+            in_queue.task_done()
+
+
+async def _persist_stage(
+    in_queue: asyncio.Queue,
+    out_queue: asyncio.Queue,
+    batch_size: int = PERSIST_BATCH_SIZE
+) -> None:
+    '''
+    Стадия сохранения: ResumeData -> (ResumeData, ID резюме в БД)
+    
+    Резюме, уже накопившиеся в очереди, сохраняются одной пачкой (до batch_size штук),
+    но стадия не ждет заполнения пачки - одиночное резюме сохраняется сразу
+    '''
+    while True:
+        batch = [await in_queue.get()]
+        stop = batch[0] is _STOP
+        while not stop and len(batch) < batch_size:
+            try:
+                item = in_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            batch.append(item)
+            stop = item is _STOP
+        
+        resumes = [item for item in batch if item is not _STOP]
+        try:
+            if resumes:
+                resume_ids = await create_candidates_entries_batch(resumes=resumes)
+                for resume_data, resume_id in zip(resumes, resume_ids):
+                    if resume_id:
+                        await out_queue.put((resume_data, resume_id))
+        except Exception as e:
+            logger.error(f'Failed to persist resumes {[resume_data.link for resume_data in resumes]}: {str(e)}')
+        finally:
+            for _ in batch:
+                in_queue.task_done()
+        if stop:
+            return
+
+
+async def _screen_stage(in_queue: asyncio.Queue) -> None:
+    '''Стадия скрининга: оценка резюме GigaChat и сохранение оценки'''
+    while True:
+        item = await in_queue.get()
+        try:
+            if item is _STOP:
+                return
+            resume_data, resume_id = item
+            # Отправляем данные о резюме на скрининг GigaChat
+            resume_screening_score = await resume_screener.screen_resume(resume_data=resume_data)
+            # Обновляем сущности в базе данных
+            await update_candidate_entry_resume_score(
+                resume_id=resume_id, 
+                score=resume_screening_score
+            )
+        except Exception as e:
+            logger.error(f'Failed to process resume {item[0].name}: {str(e)}')
+        finally:
+            in_queue.task_done()
+
+
+async def _stop_stage(queue: asyncio.Queue, workers: List[asyncio.Task]) -> None:
+    '''Дождаться завершения всех воркеров стадии'''
+    for _ in workers:
+        await queue.put(_STOP)
+    await asyncio.gather(*workers)
+
+
+async def run_resumes_pipeline(
+    resumes_data: Iterable[Tuple[str, int]],
+    parse_workers: int = PARSE_WORKERS,
+    persist_workers: int = PERSIST_WORKERS,
+    screen_workers: int = SCREEN_WORKERS,
+    queue_size: int = PIPELINE_QUEUE_SIZE
+) -> None:
+    '''
+    Обработать резюме потоковым конвейером: парсинг -> сохранение в БД -> скрининг GigaChat
+    
+    Стадии связаны ограниченными очередями, поэтому резюме уходит на скрининг
+    сразу после сохранения, а в памяти одновременно находится не более
+    нескольких queue_size резюме, независимо от размера пачки.
+    
+    Args:
+        resumes_data (Iterable[Tuple[str, int]]): Пары (URL резюме, ID вакансии)
+        parse_workers (int): Количество воркеров стадии парсинга
+        persist_workers (int): Количество воркеров стадии сохранения в БД
+        screen_workers (int): Количество воркеров стадии скрининга
+        queue_size (int): Размер очереди перед каждой стадией
+    '''
+    urls_queue = asyncio.Queue(maxsize=queue_size)
+    parsed_queue = asyncio.Queue(maxsize=queue_size)
+    persisted_queue = asyncio.Queue(maxsize=queue_size)
+    
+    async with ResumeFetcher() as fetcher:
+        parsers = [
+            asyncio.create_task(_parse_stage(urls_queue, parsed_queue, fetcher))
+            for _ in range(max(1, parse_workers))
+        ]
+        persisters = [
+            asyncio.create_task(_persist_stage(parsed_queue, persisted_queue))
+            for _ in range(max(1, persist_workers))
+        ]
+        screeners = [
+            asyncio.create_task(_screen_stage(persisted_queue))
+            for _ in range(max(1, screen_workers))
+        ]
+        
+        try:
+            # Подаем ссылки в конвейер; при заполненной очереди ждем, пока парсеры освободятся
+            for url, vacancy_id in resumes_data:
+                await urls_queue.put((url, vacancy_id))
+            
+            # Останавливаем стадии по порядку, чтобы не потерять данные в очередях
+            await _stop_stage(urls_queue, parsers)
+            await _stop_stage(parsed_queue, persisters)
+            await _stop_stage(persisted_queue, screeners)
+        finally:
+            for worker in (*parsers, *persisters, *screeners):
+                if not worker.done():
+                    worker.cancel()
+
+
+async def resumes_processing_task(
+    delay_hours: int = 24,
+    ensure_leader: Optional[Callable[[], Awaitable[None]]] = None
+) -> None:
     while True:
+        # Процесс мог потерять лидерство за время сна: проверяем до обработки резюме
+        if ensure_leader is not None:
+            await ensure_leader()
         try:
             '''
                 TODO:
@@ -73,25 +237,9 @@ async def resumes_processing_task(delay_hours: int = 24) -> None:
             '''
             # Получаем новые ссылки на резюме
             resumes_data = fetch_new_resumes_data()
-            # Парсим информацию по ссылкам на резюме              
-            parsed_results = await parse_multiple_resumes(resumes_data=resumes_data)
-            # Заполняем базу данных необходимыми сущностями
-            created_resume_ids = await create_candidates_entries(resumes=parsed_results)
-            if not created_resume_ids:
-                logger.error(f'No resume IDs were created. Skipping updates')
-                return
-
-            for resume_data, resume_id in zip(parsed_results, created_resume_ids):
-                try:
-                    # Отправляем данные о резюме на скрининг GigaChat
-                    resume_screening_score = await resume_screener.screen_resume(resume_data=resume_data)
-                    # Обновляем сущности в базе данных
-                    await update_candidate_entry_resume_score(
-                        resume_id=resume_id, 
-                        score=resume_screening_score
-                    )
-                except Exception as e:
-                    logger.error(f'Failed to process resume {resume_data.name}: {str(e)}')
+            if resumes_data:
+                # Парсим резюме, заполняем базу данных и отправляем резюме на скрининг GigaChat
+                await run_resumes_pipeline(resumes_data=resumes_data)
                 
         except Exception as e:
             logger.error(f'Error in resume_processing_task: {str(e)}', exc_info=True)
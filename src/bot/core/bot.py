@@ -5,6 +5,7 @@ from aiogram import Bot, Dispatcher
 from dotenv import load_dotenv
 
 from src.bot.config import TELEGRAM_BOT_TOKEN
+from src.bot.utils.outbound_dispatcher import outbound_dispatcher
 
 # Основные роутеры
 from src.bot.handlers.admin_commands import admin_router
@@ -23,6 +24,8 @@ mongo_url = os.environ.get('MONGO_DB_CONNECTION')
 
 memory = MongoStorage.from_url(url=mongo_url)
 bot = Bot(TELEGRAM_BOT_TOKEN)
+# Исходящие сообщения вне диалогов идут через общую очередь с учетом лимитов Telegram
+outbound_dispatcher.attach(bot)
 dp = Dispatcher(storage=memory)
 # Регистрируем роутеры.
 # Внимание! 
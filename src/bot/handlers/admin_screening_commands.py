@@ -1,8 +1,9 @@
 import logging
 import src.bot.utils.message_templates as msg_templates
 
-from typing import List, Union, Optional
-from sqlalchemy import desc, func
+from typing import Union, Optional
+from datetime import datetime
+from sqlalchemy import func, select
 from aiogram import F
 from aiogram import Router
 from aiogram.types import (
@@ -19,6 +20,8 @@ from src.database.models.bot_question import AnswerFormat
 from src.database.models.application import ApplicationStatus
 from src.bot.config import ADMIN_CHANNEL_ID, ADMIN_USER_ID
 from src.bot.utils.error_handlers import handle_db_error
+from src.bot.utils.pagination import KeysetPage, SortKey, paginate, build_pagination_row
+from src.database.utils.questionnaire_cache import questionnaire_cache
 
 
 logger = logging.getLogger(__name__)
@@ -43,12 +46,37 @@ class QuestionEditingStates(StatesGroup):
 #---------------
 # Display Utilites
 #---------------
-def _build_questions_keyboard(questions: List[BotQuestion], vacancy_id: int, page: int = 0, items_per_page: int = 10):
-    total_pages = (len(questions) + items_per_page - 1) // items_per_page
-    page_questions = questions[page*items_per_page:(page+1)*items_per_page]
-    
+ITEMS_PER_PAGE = 10
+
+# order и created_at допускают NULL: такие строки сортируются как порядок 0 и дата 1970-01-01
+VACANCY_SORT_KEYS = [
+    SortKey(Vacancy.created_at, 'created_at', descending=True, null_value=datetime(1970, 1, 1)),
+    SortKey(Vacancy.id, 'id', descending=True)
+]
+QUESTION_SORT_KEYS = [
+    SortKey(BotQuestion.order, 'order', null_value=0),
+    SortKey(BotQuestion.id, 'id')
+]
+
+
+def _get_vacancies_page(db, token: Optional[str] = None) -> KeysetPage:
+    return paginate(db, select(Vacancy), VACANCY_SORT_KEYS, token=token, page_size=ITEMS_PER_PAGE, scalars=True)
+
+
+def _get_questions_page(db, vacancy_id: int, token: Optional[str] = None) -> KeysetPage:
+    return paginate(
+        db,
+        select(BotQuestion).filter_by(vacancy_id=vacancy_id),
+        QUESTION_SORT_KEYS,
+        token=token,
+        page_size=ITEMS_PER_PAGE,
+        scalars=True
+    )
+
+
+def _build_questions_keyboard(page: KeysetPage, vacancy_id: int):
     keyboard = []
-    for question in page_questions:
+    for question in page.items:
         screening_mark = "🤖" if question.is_for_screening else ""
         keyboard.append([
             InlineKeyboardButton(
@@ -57,22 +85,8 @@ def _build_questions_keyboard(questions: List[BotQuestion], vacancy_id: int, pag
             )
         ])
     
-    if total_pages > 1:
-        pagination = []
-        if page > 0:
-            pagination.append(InlineKeyboardButton(
-                text="◀️", 
-                callback_data=f"questions_page_{vacancy_id}_{page-1}"
-            ))
-        pagination.append(InlineKeyboardButton(
-            text=f"{page+1}/{total_pages}", 
-            callback_data="noop"
-        ))
-        if page < total_pages - 1:
-            pagination.append(InlineKeyboardButton(
-                text="▶️", 
-                callback_data=f"questions_page_{vacancy_id}_{page+1}"
-            ))
+    pagination = build_pagination_row(page, f"questions_page_{vacancy_id}_")
+    if pagination:
         keyboard.append(pagination)
     
     keyboard.append([
@@ -95,15 +109,13 @@ async def _handle_questions_pagination(callback: CallbackQuery):
     try:
         parts = callback.data.split("_")
         vacancy_id = int(parts[2])
-        page = int(parts[3])
+        token = parts[3]
         
         with Session() as db:
-            questions = db.query(BotQuestion).filter_by(
-                vacancy_id=vacancy_id
-            ).order_by(BotQuestion.order).all()
+            page = _get_questions_page(db, vacancy_id, token)
             
             await callback.message.edit_reply_markup(
-                reply_markup=_build_questions_keyboard(questions, vacancy_id, page=page)
+                reply_markup=_build_questions_keyboard(page, vacancy_id)
             )
         await callback.answer()
     except Exception as e:
@@ -111,12 +123,9 @@ async def _handle_questions_pagination(callback: CallbackQuery):
         await handle_db_error(callback.message)
 
 
-def _build_vacancies_keyboard(vacancies: List[Vacancy], page: int = 0, items_per_page: int = 10):
-    total_pages = (len(vacancies) + items_per_page - 1) // items_per_page
-    page_vacancies = vacancies[page*items_per_page:(page+1)*items_per_page]
-    
+def _build_vacancies_keyboard(page: KeysetPage):
     keyboard = []
-    for vacancy in page_vacancies:
+    for vacancy in page.items:
         keyboard.append([
             InlineKeyboardButton(
                 text=f"📄 {vacancy.title}",
@@ -124,22 +133,8 @@ def _build_vacancies_keyboard(vacancies: List[Vacancy], page: int = 0, items_per
             )
         ])
         
-    if total_pages > 1:
-        pagination = []
-        if page > 0:
-            pagination.append(InlineKeyboardButton(
-                text="◀️", 
-                callback_data=f"vacancies_page_{page-1}"
-            ))
-        pagination.append(InlineKeyboardButton(
-            text=f"{page+1}/{total_pages}", 
-            callback_data="noop"
-        ))
-        if page < total_pages - 1:
-            pagination.append(InlineKeyboardButton(
-                text="▶️", 
-                callback_data=f"vacancies_page_{page+1}"
-            ))
+    pagination = build_pagination_row(page, "vacancies_page_")
+    if pagination:
         keyboard.append(pagination)
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -147,13 +142,13 @@ def _build_vacancies_keyboard(vacancies: List[Vacancy], page: int = 0, items_per
 @admin_screening.callback_query(F.data.startswith("vacancies_page_"))
 async def _handle_vacancies_pagination(callback: CallbackQuery):
     try:
-        page = int(callback.data.split("_")[-1])
+        token = callback.data.split("_")[-1]
         
         with Session() as db:
-            vacancies = db.query(Vacancy).order_by(desc(Vacancy.created_at)).all()
+            page = _get_vacancies_page(db, token)
             
             await callback.message.edit_reply_markup(
-                reply_markup=_build_vacancies_keyboard(vacancies, page=page)
+                reply_markup=_build_vacancies_keyboard(page)
             )
         await callback.answer()
     except Exception as e:
@@ -172,15 +167,15 @@ async def _handle_vacancies_pagination(callback: CallbackQuery):
 async def _list_vacancies(message: Message):
     try:
         with Session() as db:
-            vacancies = db.query(Vacancy).order_by(desc(Vacancy.created_at)).all()
+            page = _get_vacancies_page(db)
             
-            if not vacancies:
+            if not page.items:
                 await message.answer(msg_templates.NO_VACANCIES_IN_SYSTEM)
                 return
             
             await message.answer(
                 msg_templates.VACANCIES_LIST,
-                reply_markup=_build_vacancies_keyboard(vacancies)
+                reply_markup=_build_vacancies_keyboard(page)
             )
     except Exception as e:
         logger.error(f'Error while trying to list vacancies: {str(e)}')
@@ -317,10 +312,8 @@ async def _edit_vacancy_params_menu(msg_or_query: Union[Message, CallbackQuery],
                 await msg_or_query.answer(msg_templates.VACANCY_NOT_FOUND)
                 return
             
-            questions = db.query(BotQuestion).filter_by(
-                vacancy_id=vacancy_id
-            ).order_by(BotQuestion.order).all()
-            if not questions:
+            page = _get_questions_page(db, vacancy_id)
+            if not page.items:
                 await msg_or_query.answer(
                     msg_templates.NO_QUESTIONS_FOR_VACANCY,
                     reply_markup=InlineKeyboardMarkup(inline_keyboard=[
@@ -337,11 +330,11 @@ async def _edit_vacancy_params_menu(msg_or_query: Union[Message, CallbackQuery],
             try:
                 await msg_or_query.edit_text(
                     msg_templates.EDITING_VACANCY_QUESTIONS,
-                    reply_markup=_build_questions_keyboard(questions, vacancy_id))
+                    reply_markup=_build_questions_keyboard(page, vacancy_id))
             except:
                 await msg_or_query.answer(
                     msg_templates.EDITING_VACANCY_QUESTIONS,
-                    reply_markup=_build_questions_keyboard(questions, vacancy_id))
+                    reply_markup=_build_questions_keyboard(page, vacancy_id))
     except Exception as e:
             logger.error(f'Error editing vacancy params details: {str(e)}')
             await handle_db_error(msg_or_query)
@@ -415,11 +408,11 @@ async def _show_vacancy_detail(callback: CallbackQuery):
 async def _back_to_vacancies_list(callback: CallbackQuery):
     try:
         with Session() as db:
-            vacancies = db.query(Vacancy).order_by(desc(Vacancy.created_at)).all()
+            page = _get_vacancies_page(db)
             
             await callback.message.edit_text(
                 msg_templates.VACANCIES_LIST,
-                reply_markup=_build_vacancies_keyboard(vacancies)
+                reply_markup=_build_vacancies_keyboard(page)
             )
         await callback.answer()
     except Exception as e:
@@ -669,6 +662,7 @@ async def _save_new_question(callback: CallbackQuery, state: FSMContext):
             
             db.add(new_question)
             db.commit()
+            questionnaire_cache.invalidate(vacancy_id)
             
             await callback.message.edit_text(msg_templates.QUESTION_SAVED)
             await _edit_vacancy_params_menu(callback, vacancy_id=vacancy_id)
@@ -741,6 +735,7 @@ async def _process_new_question_screening(message: Message, state: FSMContext):
             
             db.add(new_question)
             db.commit()
+            questionnaire_cache.invalidate(vacancy_id)
             
             await message.answer(msg_templates.QUESTION_SAVED)
             await _edit_vacancy_params_menu(message, vacancy_id=vacancy_id)
@@ -769,6 +764,7 @@ async def _process_new_question_text(message: Message, state: FSMContext):
             if question:
                 question.question_text = message.text
                 db.commit()
+                questionnaire_cache.invalidate(question.vacancy_id)
                 
                 await message.answer("✅ Текст вопроса успешно обновлён")
                 await state.clear()
@@ -808,6 +804,7 @@ async def _process_new_choices_text(message: Message, state: FSMContext):
                 choices = [choice.strip().capitalize() for choice in message.text.split(',')]
                 question.choices = choices
                 db.commit()
+                questionnaire_cache.invalidate(question.vacancy_id)
 
                 await message.answer("✅ Варианты ответов успешно обновлены")
                 await state.clear()
@@ -872,6 +869,7 @@ async def _process_new_screening_criteria(message: Message, state: FSMContext):
                 question.is_for_screening = True
                 question.screening_criteria = message.text
                 db.commit()
+                questionnaire_cache.invalidate(question.vacancy_id)
                 
                 await message.answer("✅ Промпт успешно добавлен")
                 await state.clear()
@@ -1006,6 +1004,7 @@ async def _confirm_delete_question_data(callback: CallbackQuery, state: FSMConte
                 for index, q in enumerate(remaining_questions, start=1):
                     q.order = index
                 db.commit()
+                questionnaire_cache.invalidate(vacancy_id)
                 
                 await callback.message.edit_text("🗑️ Вопрос успешно удален")
                 await _edit_vacancy_params_menu(callback, vacancy_id=vacancy_id)
@@ -1014,6 +1013,7 @@ async def _confirm_delete_question_data(callback: CallbackQuery, state: FSMConte
                 question.choices = None
                 question.expected_format = AnswerFormat.TEXT
                 db.commit()
+                questionnaire_cache.invalidate(question.vacancy_id)
                 
                 await callback.message.edit_text("🗑️ Варианты ответа успешно удалены")
                 await _edit_question_detail_menu(callback, question_id=question_id)
@@ -1022,6 +1022,7 @@ async def _confirm_delete_question_data(callback: CallbackQuery, state: FSMConte
                 question.screening_criteria = None
                 question.is_for_screening = False
                 db.commit()
+                questionnaire_cache.invalidate(question.vacancy_id)
                 
                 await callback.message.edit_text("🗑️ Промпт успешно удален")
                 await _edit_question_detail_menu(callback, question_id=question_id)
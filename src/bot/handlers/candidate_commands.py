@@ -11,16 +11,18 @@ from aiogram.types import (
     InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 )
 from aiogram.types.reply_keyboard_remove import ReplyKeyboardRemove
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from sqlalchemy.orm import contains_eager, joinedload
 from datetime import datetime, timedelta, timezone
 
-from src.database.session import Session
+from src.database.session import AsyncSession
+from src.database.utils.interaction_buffer import interaction_buffer
+from src.database.utils.questionnaire_cache import questionnaire_cache, QuestionRecord
 from src.database.models import (
-    Candidate, Application, BotQuestion, HrNotification,
-    Vacancy, BotInteraction, AnalysisResult
+    Candidate, Application,
+    Vacancy, BotInteraction
 )
 
-from src.bot.utils.bot_answers_json_builder import build_json
 from src.bot.utils.schedule_form_reminder import schedule_form_reminder
 from src.bot.utils.error_handlers import handle_db_error
 
@@ -28,7 +30,7 @@ from src.database.models.application import ApplicationStatus
 from src.database.models.bot_interaction import InteractionState
 from src.database.models.bot_question import AnswerFormat
 
-from src.gigachat_module.telegram_screening import TelegramScreening
+from src.screening_processing_tasks import enqueue_screening_job, notify_screening_jobs
 
 
 logger = logging.getLogger(__name__)
@@ -54,16 +56,18 @@ CONSENT_KEYBOARD = ReplyKeyboardMarkup(
 # --------------------------
 #  Core Utilities
 # --------------------------
+def _utcnow() -> datetime:
+    '''
+        Текущее время UTC без tzinfo
+        asyncpg не принимает aware datetime для колонок DateTime (timestamp without time zone)
+    '''
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 async def _update_last_active(candidate_id: int, application_id: int):
+    '''Отметка активности кандидата, записывается в БД буфером interaction_buffer'''
     try:
-        with Session() as db:
-            interaction = db.query(BotInteraction).filter_by(
-                candidate_id=candidate_id,
-                application_id=application_id
-            ).first()
-            if interaction:
-                interaction.last_active = datetime.now(timezone.utc)
-                db.commit()
+        interaction_buffer.touch(application_id)
     except Exception as e:
         logger.error(f"Error updating last_active: {str(e)}")
 
@@ -86,16 +90,13 @@ async def _update_interaction_state(application_id: int, state_data: dict):
     '''
         Обновление BotInteraction instance данных об текущих ответах кандидата,
         текущем ID вопроса и последней отметке активности
+        Изменения записываются в БД пачкой, буфером interaction_buffer
     '''
-    with Session() as db:
-        interaction = db.query(BotInteraction).filter_by(
-            application_id=application_id
-        ).first()
-        if interaction:
-            interaction.answers = state_data['answers']
-            interaction.current_question_id = state_data['questions'][state_data['current_question']]
-            interaction.last_active = datetime.now(timezone.utc)
-            db.commit()
+    interaction_buffer.update_answers(
+        application_id,
+        answers=state_data['answers'],
+        current_question_id=state_data['questions'][state_data['current_question']]
+    )
 
 
 # --------------------------
@@ -144,7 +145,7 @@ async def _build_review_keyboard(questions, current_page, total_pages):
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-async def _show_question(question: BotQuestion, message: Message, state: FSMContext):
+async def _show_question(question: QuestionRecord, message: Message, state: FSMContext):
     '''Показать текущий вопрос кандидату'''
     try:
         data = await state.get_data()
@@ -198,36 +199,36 @@ async def handle_review(message: Message, state: FSMContext, page: int = 0):
         data = await state.get_data()
         QUESTIONS_PER_PAGE = 5
         
-        with Session() as db:
-            # Достаем все вопросы по вакансии
-            questions = db.query(BotQuestion).filter(
-                BotQuestion.id.in_(data['questions'])
-            ).order_by(BotQuestion.order).all()
-            # Собирает данные с ответами
-            content = await _build_review_content(questions, data['answers'])
-            # В случае большого количества вопросов, зависит от [QUESTIONS_PER_PAGE]
-            # готовимся к клавиатуре с пагинацией
-            page_questions = questions[page*QUESTIONS_PER_PAGE:(page+1)*QUESTIONS_PER_PAGE]
-            total_pages = (len(questions) + QUESTIONS_PER_PAGE - 1) // QUESTIONS_PER_PAGE
-            # Собираем клавиатуру финальной сверки
-            keyboard = await _build_review_keyboard(page_questions, page, total_pages)
-
-            if hasattr(message, 'message_id'):
-                await message.answer(f"📝 Ваши ответы:\n\n{content}", reply_markup=keyboard)
-            else:
-                logger.warning(f'{message} has no "message_id": This behaviour is unexpected!')
-                await message.answer(f"📝 Ваши ответы:\n\n{content}", reply_markup=keyboard)
-            
-            await state.set_state(CandidateStates.review)
-            await state.update_data(review_page=page)
+        # Достаем вопросы анкеты из кэша, в порядке анкеты
+        questionnaire = await questionnaire_cache.get(data['vacancy_id'])
+        questions = [q for q in questionnaire.questions if q.id in data['questions']]
+        # Собирает данные с ответами
+        content = await _build_review_content(questions, data['answers'])
+        # В случае большого количества вопросов, зависит от [QUESTIONS_PER_PAGE]
+        # готовимся к клавиатуре с пагинацией
+        page_questions = questions[page*QUESTIONS_PER_PAGE:(page+1)*QUESTIONS_PER_PAGE]
+        total_pages = (len(questions) + QUESTIONS_PER_PAGE - 1) // QUESTIONS_PER_PAGE
+        # Собираем клавиатуру финальной сверки
+        keyboard = await _build_review_keyboard(page_questions, page, total_pages)
+
+        if hasattr(message, 'message_id'):
+            await message.answer(f"📝 Ваши ответы:\n\n{content}", reply_markup=keyboard)
+        else:
+            logger.warning(f'{message} has no "message_id": This behaviour is unexpected!')
+            await message.answer(f"📝 Ваши ответы:\n\n{content}", reply_markup=keyboard)
+        
+        await state.set_state(CandidateStates.review)
+        await state.update_data(review_page=page)
             
     except Exception as e:
-        with Session() as db:
-            interaction = db.query(BotInteraction).filter_by(
+        await interaction_buffer.flush(data['application_id'])
+        async with AsyncSession() as db:
+            interaction = await db.scalar(select(BotInteraction).filter_by(
                 application_id=data['application_id']
-            ).first()
+            ).limit(1))
             interaction.state=InteractionState.PAUSED
-            db.commit()
+            interaction.last_active = _utcnow()
+            await db.commit()
         
         logger.error(f"Review error: {str(e)}")
         await handle_db_error(message)
@@ -248,22 +249,22 @@ async def handle_token_auth(message: Message, state: FSMContext):
     '''Обработка идентификации кандидата по его токену'''
     try:
         token = message.text.strip()
-        current_time = datetime.now(timezone.utc)
+        current_time = _utcnow()
         telegram_id = str(message.from_user.id)
         
-        with Session() as db:
+        async with AsyncSession() as db:
             # Ищем отклик по отправленному токену
-            application = db.query(Application).filter(
+            application = await db.scalar(select(Application).filter(
                 Application.auth_token == token,
                 Application.token_expiry > current_time
-            ).first()
+            ).limit(1))
             
             if not application:
                 await message.answer(msg_templates.TOKEN_AUTH_INVALID)
                 return
             
             # Получаем кандидата по отклику 
-            candidate = db.query(Candidate).get(application.candidate_id)
+            candidate = await db.get(Candidate, application.candidate_id)
             if not candidate:
                 await message.answer(msg_templates.CANDIDATE_NOT_FOUND)
                 return
@@ -271,7 +272,7 @@ async def handle_token_auth(message: Message, state: FSMContext):
             # Дополняем информацию о Telegram ID
             candidate.telegram_id = telegram_id
             
-            db.commit()
+            await db.commit()
             
             # Уведомляем кандидата об успешной идентификации его в система
             await message.answer(
@@ -304,22 +305,25 @@ async def cancel_interaction(query_or_msg: Message | CallbackQuery, state: FSMCo
         
         if data.get('current_question', 0) >= 0:
             try:
-                with Session() as db:
-                    interaction = db.query(BotInteraction).filter_by(
+                await interaction_buffer.flush(data['application_id'])
+                async with AsyncSession() as db:
+                    interaction = await db.scalar(select(BotInteraction).filter_by(
                         candidate_id=data['candidate_id'],
                         application_id=data['application_id']
-                    ).first()
+                    ).limit(1))
                     
                     if interaction:
                         interaction.state = InteractionState.PAUSED
                         interaction.current_question_id = data['questions'][data['current_question']]
-                        db.commit()
+                        # Ответы из состояния FSM: часть из них может ждать записи в буфере другого процесса
+                        if 'answers' in data:
+                            interaction.answers = data['answers']
+                        interaction.last_active = _utcnow()
+                        await db.commit()
                         
                         # Создаем напоминание для пользователя (default = 30 минут)
-                        bot = message.bot
                         user_id = message.chat.id
                         await schedule_form_reminder(
-                            bot=bot,
                             user_id=user_id,
                             application_id=data['application_id']
                         )
@@ -343,10 +347,10 @@ async def candidate_start(message: Message, state: FSMContext):
     try:
         telegram_id = str(message.from_user.id)
         
-        with Session() as db:
-            candidate = db.query(Candidate).filter(
+        async with AsyncSession() as db:
+            candidate = await db.scalar(select(Candidate).filter(
                 Candidate.telegram_id == telegram_id
-            ).first()
+            ).limit(1))
             
             if not candidate:
                 await message.answer(
@@ -357,12 +361,13 @@ async def candidate_start(message: Message, state: FSMContext):
                 await state.set_state(CandidateStates.token_auth)
                 return
 
-            application = db.query(Application).filter(
+            # Вакансия подгружается тем же запросом: ленивой подгрузки в асинхронной сессии нет
+            application = await db.scalar(select(Application).join(Vacancy).filter(
                 and_(
                     Application.candidate_id == candidate.id,
                     Application.status == ApplicationStatus.ACTIVE
                 )
-            ).join(Vacancy).first()
+            ).options(contains_eager(Application.vacancy)).limit(1))
             
             if not application:
                 await message.answer(
@@ -374,14 +379,14 @@ async def candidate_start(message: Message, state: FSMContext):
                 candidate_id=candidate.id, 
                 application_id=application.id
             )
+            # Сохраненные ответы читаются из БД, поэтому сначала записываем буфер этой анкеты
+            await interaction_buffer.flush(application.id)
             
-            interaction = db.query(BotInteraction).filter(
+            interaction = await db.scalar(select(BotInteraction).filter(
                 BotInteraction.application_id == application.id
-            ).order_by(BotInteraction.id.asc()).first()
+            ).order_by(BotInteraction.id.asc()).limit(1))
             
-            questions = db.query(BotQuestion).filter(
-                BotQuestion.vacancy_id == application.vacancy_id
-            ).order_by(BotQuestion.order).all()
+            questions = (await questionnaire_cache.get(application.vacancy_id)).questions
             
             if not questions:
                 await message.answer(
@@ -417,9 +422,9 @@ async def candidate_start(message: Message, state: FSMContext):
             if interaction and interaction.state == InteractionState.PAUSED:
                 # Ответы кандидата хранятся 24 часов, затем форму нужно заполнять с начала
                 # Beware, datetime.now(timezone.utc) will raise 'can't subtract offset-naive and offset-aware datetimes error'
-                if (datetime.utcnow() - interaction.last_active) > timedelta(hours=24):
-                    db.delete(interaction)
-                    db.commit()
+                if (_utcnow() - interaction.last_active) > timedelta(hours=24):
+                    await db.delete(interaction)
+                    await db.commit()
                     await message.answer(
                         msg_templates.CANDIDATE_BOT_INTERACTION_SESSION_TIMEOUT
                     )
@@ -441,8 +446,9 @@ async def candidate_start(message: Message, state: FSMContext):
                 }
                 # Возобновляем интерактив
                 interaction.state = InteractionState.STARTED
+                interaction.last_active = _utcnow()
                 resume_question = questions[state_data['current_question']]
-                db.commit()
+                await db.commit()
                 
                 await state.set_data(state_data)
                 # Приветственное сообщение для кандидата
@@ -466,10 +472,11 @@ async def candidate_start(message: Message, state: FSMContext):
                     vacancy_id=application.vacancy_id,
                     state=InteractionState.STARTED,
                     personal_data_consent=None,
-                    last_active=datetime.now(timezone.utc)
+                    started_at=_utcnow(),
+                    last_active=_utcnow()
                 )
                 db.add(interaction)
-                db.commit()
+                await db.commit()
                 await message.answer(
                     msg_templates.CANDIDATE_CONSENT_REQUEST,
                     reply_markup=CONSENT_KEYBOARD,
@@ -499,9 +506,15 @@ async def _handle_consent_response(message: Message, state: FSMContext):
     try:
         consent_given = message.text == msg_templates.CONSENT_AGREE_BUTTON
         state_data = await state.get_data()
+        await interaction_buffer.flush(state_data['application_id'])
         
-        with Session() as db:
-            interaction: Optional[BotInteraction] = db.query(BotInteraction).get(state_data['interaction_id'])
+        async with AsyncSession() as db:
+            # Кандидат и вакансия нужны для приветственного сообщения, подгружаем их сразу
+            interaction: Optional[BotInteraction] = await db.get(
+                BotInteraction,
+                state_data['interaction_id'],
+                options=[joinedload(BotInteraction.candidate), joinedload(BotInteraction.vacancy)]
+            )
             
             if not interaction:
                 await message.answer(
@@ -511,14 +524,12 @@ async def _handle_consent_response(message: Message, state: FSMContext):
                 await state.clear()
                 return
             
-            now = datetime.now(timezone.utc)
+            now = _utcnow()
             interaction.personal_data_consent = consent_given
             interaction.last_active = now
             
             if consent_given:
-                questions = db.query(BotQuestion).filter(
-                    BotQuestion.vacancy_id == state_data['vacancy_id']
-                ).order_by(BotQuestion.order).all()
+                questions = (await questionnaire_cache.get(state_data['vacancy_id'])).questions
             
                 if not questions:
                     await message.answer(
@@ -544,7 +555,7 @@ async def _handle_consent_response(message: Message, state: FSMContext):
                 
                 interaction.state = InteractionState.STARTED
                 interaction.current_question_id = questions[0].id
-                db.commit()
+                await db.commit()
                 
                 # Отправляем приветственное сообщение и начинаем показ вопросов
                 await state.set_data(new_state_data)
@@ -563,7 +574,7 @@ async def _handle_consent_response(message: Message, state: FSMContext):
                 if state_data.get('consent_retry', False):
                     interaction.completed_at = now
                     interaction.state = InteractionState.NO_CONSENT
-                    db.commit()
+                    await db.commit()
                     await message.answer(
                         msg_templates.CANDIDATE_CONSENT_DECLINED_THANKYOU,
                         reply_markup=ReplyKeyboardRemove(),
@@ -596,14 +607,13 @@ async def handle_next_question(callback: CallbackQuery, state: FSMContext):
         if data['current_question'] >= len(data['questions']) - 1:
             return await handle_review(callback.message, state)
 
-        with Session() as db:
-            next_question_id = data['questions'][data['current_question'] + 1]
-            next_question = db.query(BotQuestion).get(next_question_id)
-            
-            data['current_question'] += 1
-            await _update_interaction_state(data['application_id'], data)
-            await state.update_data(current_question=data['current_question'])
-            await _show_question(next_question, callback.message, state)
+        next_question_id = data['questions'][data['current_question'] + 1]
+        next_question = (await questionnaire_cache.get(data['vacancy_id'])).get(next_question_id)
+        
+        data['current_question'] += 1
+        await _update_interaction_state(data['application_id'], data)
+        await state.update_data(current_question=data['current_question'])
+        await _show_question(next_question, callback.message, state)
         
         await callback.answer()
     except Exception as e:
@@ -615,10 +625,10 @@ async def handle_next_question_auto(message: Message, state: FSMContext):
     '''Инициализация показа следующего вопроса из списка вопросов'''
     try:
         data = await _get_current_interaction_data(state)
-        with Session() as db:
-            next_question = db.query(BotQuestion).get(data['questions'][data['current_question'] + 1])
-            await state.update_data(current_question=data['current_question'] + 1)
-            await _show_question(next_question, message, state)
+        questionnaire = await questionnaire_cache.get(data['vacancy_id'])
+        next_question = questionnaire.get(data['questions'][data['current_question'] + 1])
+        await state.update_data(current_question=data['current_question'] + 1)
+        await _show_question(next_question, message, state)
     except Exception as e:
         logger.error(f"Auto next error: {str(e)}")
         await handle_db_error(message)
@@ -651,39 +661,38 @@ async def handle_text_answer(message: Message, state: FSMContext):
                 application_id=data['application_id']
         )
         
-        with Session() as db:
-            question = db.query(BotQuestion).get(question_id)
-            if not question:
-                await message.answer(msg_templates.QUESTION_NOT_FOUND)
-                return
+        question = (await questionnaire_cache.get(data['vacancy_id'])).get(question_id)
+        if not question:
+            await message.answer(msg_templates.QUESTION_NOT_FOUND)
+            return
 
-            if question.expected_format == AnswerFormat.CHOICE:
-                await message.answer("ℹ️ Пожалуйста, выберите вариант из предложенных")
-                return
+        if question.expected_format == AnswerFormat.CHOICE:
+            await message.answer("ℹ️ Пожалуйста, выберите вариант из предложенных")
+            return
 
-            answer_content = await _process_answer_content(message, question)
-            if not answer_content:
-                return
+        answer_content = await _process_answer_content(message, question)
+        if not answer_content:
+            return
 
-            await _update_answer(state, data, question_id, answer_content)
-            
-            if await state.get_state() == CandidateStates.editing:
-                # Если пришел из меню финальной сверки, отправляем назад
-                await handle_review(message, state)
-                await state.set_state(CandidateStates.review)
-            elif data['current_question'] < len(data['questions']) - 1:
-                # Если ещё есть вопросы, автоматически показывает новый вопрос
-                await handle_next_question_auto(message, state)
-            else:
-                # Иначе конец интерактива - идём в меню финальной сверки
-                await handle_review(message, state)
+        await _update_answer(state, data, question_id, answer_content)
+        
+        if await state.get_state() == CandidateStates.editing:
+            # Если пришел из меню финальной сверки, отправляем назад
+            await handle_review(message, state)
+            await state.set_state(CandidateStates.review)
+        elif data['current_question'] < len(data['questions']) - 1:
+            # Если ещё есть вопросы, автоматически показывает новый вопрос
+            await handle_next_question_auto(message, state)
+        else:
+            # Иначе конец интерактива - идём в меню финальной сверки
+            await handle_review(message, state)
 
     except Exception as e:
         logger.error(f"Answer error: {str(e)}")
         await handle_db_error(message)
 
 
-async def _process_answer_content(message: Message, question: BotQuestion):
+async def _process_answer_content(message: Message, question: QuestionRecord):
     '''Получение содержимого ответа, введенного кандидатом'''
     if question.expected_format == AnswerFormat.FILE:
         if not message.document:
@@ -716,20 +725,19 @@ async def handle_choice_answer(callback: CallbackQuery, state: FSMContext):
                 application_id=data['application_id']
         )
         
-        with Session() as db:
-            question = db.query(BotQuestion).get(question_id)
-            if not question or not question.choices:
-                await callback.answer("❌ Неверный вариант")
-                return
+        question = (await questionnaire_cache.get(data['vacancy_id'])).get(question_id)
+        if not question or not question.choices:
+            await callback.answer("❌ Неверный вариант")
+            return
 
-            selected_choice = question.choices[choice_idx]
-            await _update_answer(state, data, question_id, selected_choice)
-            await callback.message.edit_text(f"✅ Вы выбрали: {selected_choice}")
-            
-            if data['current_question'] < len(data['questions']) - 1:
-                await handle_next_question_auto(callback.message, state)
-            else:
-                await handle_review(callback.message, state)
+        selected_choice = question.choices[choice_idx]
+        await _update_answer(state, data, question_id, selected_choice)
+        await callback.message.edit_text(f"✅ Вы выбрали: {selected_choice}")
+        
+        if data['current_question'] < len(data['questions']) - 1:
+            await handle_next_question_auto(callback.message, state)
+        else:
+            await handle_review(callback.message, state)
                 
         await callback.answer()
     except Exception as e:
@@ -744,54 +752,53 @@ async def handle_choice_answer(callback: CallbackQuery, state: FSMContext):
 async def handle_edit_review(callback: CallbackQuery, state: FSMContext):
     try:
         question_id = int(callback.data.split("_")[1])
+        data = await _get_current_interaction_data(state)
         
-        with Session() as db:
-            question = db.query(BotQuestion).get(question_id)
-            if not question:
-                await callback.answer(msg_templates.QUESTION_NOT_FOUND)
-                return
+        question = (await questionnaire_cache.get(data['vacancy_id'])).get(question_id)
+        if not question:
+            await callback.answer(msg_templates.QUESTION_NOT_FOUND)
+            return
 
-            data = await _get_current_interaction_data(state)
-            new_current = data['questions'].index(question_id)
-            
-            await state.update_data(current_question=new_current)
-            await state.set_state(CandidateStates.editing)
-            
-            edit_text = (
-                f"✏️ Редактирование вопроса {new_current+1}:\n\n"
-                f"{question.question_text}\n\n"
-            )
-            edit_text += (
-                f"Текущий ответ: {data['answers'].get(str(question_id), 'Нет ответа')}"
+        new_current = data['questions'].index(question_id)
+        
+        await state.update_data(current_question=new_current)
+        await state.set_state(CandidateStates.editing)
+        
+        edit_text = (
+            f"✏️ Редактирование вопроса {new_current+1}:\n\n"
+            f"{question.question_text}\n\n"
+        )
+        edit_text += (
+            f"Текущий ответ: {data['answers'].get(str(question_id), 'Нет ответа')}"
+        )
+        
+        is_choice_based_question = False
+        if question.expected_format == AnswerFormat.CHOICE and question.choices:
+            keyboard = _build_choice_keyboard(
+                question.choices, 
+                "edit_choice", 
+                "↩️ Назад к обзору",
+                is_editing=True
             )
-            
-            is_choice_based_question = False
-            if question.expected_format == AnswerFormat.CHOICE and question.choices:
-                keyboard = _build_choice_keyboard(
-                    question.choices, 
-                    "edit_choice", 
-                    "↩️ Назад к обзору",
-                    is_editing=True
-                )
-                edit_text += ""
-                is_choice_based_question = True
-            else:
-                edit_text += "\n\nОтправьте новый ответ:"
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="↩️ Назад к обзору", callback_data="cancel_edit")]
-                ])
+            edit_text += ""
+            is_choice_based_question = True
+        else:
+            edit_text += "\n\nОтправьте новый ответ:"
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="↩️ Назад к обзору", callback_data="cancel_edit")]
+            ])
 
-            try:
-                if is_choice_based_question:
-                    await callback.message.edit_text(edit_text, reply_markup=keyboard)
-                else:
-                    await callback.message.answer(edit_text, reply_markup=keyboard)
-            
-            except Exception as edit_error:
-                logger.warning(f'Could not edit message: {str(edit_error)}')
+        try:
+            if is_choice_based_question:
+                await callback.message.edit_text(edit_text, reply_markup=keyboard)
+            else:
                 await callback.message.answer(edit_text, reply_markup=keyboard)
-            
-            await callback.answer()
+        
+        except Exception as edit_error:
+            logger.warning(f'Could not edit message: {str(edit_error)}')
+            await callback.message.answer(edit_text, reply_markup=keyboard)
+        
+        await callback.answer()
     except Exception as e:
         logger.error(f"Edit error: {str(e)}")
         await handle_db_error(callback.message)
@@ -809,19 +816,18 @@ async def handle_edit_answer(message: Message, state: FSMContext):
                 application_id=data['application_id']
         )
         
-        with Session() as db:
-            question = db.query(BotQuestion).get(question_id)
-            if question.expected_format == AnswerFormat.FILE and not message.document:
-                await message.answer(msg_templates.FILE_EXPECTED)
-                return
-                
-            answer_content = await _process_answer_content(message, question)
-            if not answer_content:
-                return
+        question = (await questionnaire_cache.get(data['vacancy_id'])).get(question_id)
+        if question.expected_format == AnswerFormat.FILE and not message.document:
+            await message.answer(msg_templates.FILE_EXPECTED)
+            return
+            
+        answer_content = await _process_answer_content(message, question)
+        if not answer_content:
+            return
 
-            await _update_answer(state, data, question_id, answer_content)
-            await handle_review(message, state)
-            await state.set_state(CandidateStates.review)
+        await _update_answer(state, data, question_id, answer_content)
+        await handle_review(message, state)
+        await state.set_state(CandidateStates.review)
 
     except Exception as e:
         logger.error(f"Edit answer error: {str(e)}")
@@ -836,16 +842,15 @@ async def handle_edit_choice(callback: CallbackQuery, state: FSMContext):
         data = await _get_current_interaction_data(state)
         question_id = data['questions'][data['current_question']]
         
-        with Session() as db:
-            question = db.query(BotQuestion).get(question_id)
-            if not question or not question.choices:
-                await callback.answer("❌ Неверный вариант")
-                return
+        question = (await questionnaire_cache.get(data['vacancy_id'])).get(question_id)
+        if not question or not question.choices:
+            await callback.answer("❌ Неверный вариант")
+            return
 
-            selected_choice = question.choices[choice_idx]
-            await _update_answer(state, data, question_id, selected_choice)
-            await handle_review(callback.message, state)
-            await callback.answer()
+        selected_choice = question.choices[choice_idx]
+        await _update_answer(state, data, question_id, selected_choice)
+        await handle_review(callback.message, state)
+        await callback.answer()
     except Exception as e:
         logger.error(f"Edit choice error: {str(e)}")
         await handle_db_error(callback.message)
@@ -866,105 +871,45 @@ async def handle_submission(callback: CallbackQuery, state: FSMContext):
     '''Обработчик отправки заполненной формы'''
     try:
         data = await _get_current_interaction_data(state)
+        await interaction_buffer.flush(data['application_id'])
         
-        with Session() as db:
-            application = db.query(Application).get(data['application_id'])
+        async with AsyncSession() as db:
+            application = await db.get(Application, data['application_id'])
             if application.status != ApplicationStatus.ACTIVE:
                 await callback.answer(msg_templates.FORM_ALREADY_SUBMITTED)
                 return
 
             application.status = ApplicationStatus.REVIEW
-            interaction = db.query(BotInteraction).filter_by(
+            interaction = await db.scalar(select(BotInteraction).filter_by(
                 application_id=data['application_id']
-            ).first()
+            ).limit(1))
             interaction.state = InteractionState.COMPLETED
-            interaction.completed_at = datetime.now(timezone.utc)
+            # Скрининг читает ответы из БД, поэтому записываем их из состояния FSM: последний ответ
+            # мог попасть в буфер другого процесса (src/webhook.py) и еще не быть записан
+            if data['answers']:
+                interaction.answers = data['answers']
+            interaction.completed_at = _utcnow()
+            interaction.last_active = interaction.completed_at
+            # Скрининг в GigaChat выполняет воркер очереди, отправка анкеты его не ждет
+            enqueue_screening_job(
+                db,
+                candidate_id=data.get('candidate_id', -1),
+                application_id=data['application_id'],
+                vacancy_id=data.get('vacancy_id', -1)
+            )
                  
-            db.commit()
- 
-        await callback.message.answer(msg_templates.ON_FORM_SUBMIT)
-        
-        vacancy_id=data.get('vacancy_id', -1)
-        application_id=data.get('application_id', -1),
-        # Собираем ответы кандидата
-        formatted_answers = build_json(
-            application_id=application_id,
-            vacancy_id=vacancy_id
-        )
-        # Отправляем запросы в GigaChat
-        await handle_proceed_to_llm(
-            candidate_id=data.get('candidate_id', -1),
-            application_id=application_id,
-            vacancy_id=vacancy_id,
-            answers=formatted_answers
-        )
+            await db.commit()
+        notify_screening_jobs()
         
-        await state.clear()
         await callback.answer()
+        await callback.message.answer(msg_templates.ON_FORM_SUBMIT)
+        await state.clear()
 
     except Exception as e:
         logger.error(f"Submit error: {str(e)}")
         await handle_db_error(callback.message, "Ошибка отправки анкеты")
 
 
-# --------------------------
-#  Handle LLM request
-# --------------------------
-async def handle_proceed_to_llm(
-    candidate_id: int,
-    application_id: int,
-    vacancy_id: int,
-    answers: str
-):
-    '''Отправить ответы кандидата в GigaChat и уведомить о результатах HR-специалистов'''
-    # Инициализируем скрининг с Telegam бота
-    tg_screening = TelegramScreening()
-    # Отправляем ответы кандидата на оценку в GigaChat
-    telegram_screening_score = await tg_screening.screen_answers(
-        candidate_responses_json=answers,
-        vacancy_id=vacancy_id
-    )
-    try:
-        analysis_score = int(telegram_screening_score)
-    except (ValueError, TypeError):
-        telegram_screening_score = 0
-        
-    try:
-        with Session() as db:
-            # Сохраняем результаты обработки нейросетью
-            analysis_result = AnalysisResult(
-                candidate_id=candidate_id,
-                application_id=application_id,
-                gigachat_score=telegram_screening_score,
-                # TODO:
-                # - Решение должно зависеть от оценки GigaChat
-                final_decision="approve" if analysis_score > 30 else "reject",
-                processed_at=datetime.now(timezone.utc)
-            )
-            db.add(analysis_result)
-            db.flush()
-            
-            decision = analysis_result.final_decision
-            
-            # Создаем уведомления для HR
-            notification = HrNotification(
-                candidate_id=candidate_id,
-                application_id=application_id,
-                vacancy_id=vacancy_id,
-                analysis_score=analysis_score,
-                final_decision=decision,           
-                status="new",
-                sent_at=datetime.now(timezone.utc)
-            )
-            db.add(notification)
-            
-            db.commit()
-            
-    except Exception as e:
-        logger.error(f'Error occured in handle_proceed_to_llm: {str(e)}')
-        raise
-        
-
 # --------------------------
 #  Handle NO-OP
 # --------------------------
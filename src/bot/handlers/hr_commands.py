@@ -2,7 +2,6 @@ import logging
 import src.bot.utils.message_templates as msg_templates
 from src.gigachat_module.utils.formatters import candidate_answers_formatter
 
-from aiogram import Bot
 from aiogram import Router, F
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
@@ -12,7 +11,8 @@ from aiogram.types import (
     InlineKeyboardButton, InlineKeyboardMarkup
 )
 from datetime import datetime
-from sqlalchemy import or_
+from typing import Optional, List
+from sqlalchemy import or_, case, select
 
 from src.database.session import Session
 from src.database.models import (
@@ -22,6 +22,8 @@ from src.database.models import (
 
 from src.bot.utils.bot_answers_json_builder import build_json
 from src.bot.utils.error_handlers import handle_db_error
+from src.bot.utils.pagination import KeysetPage, SortKey, paginate, build_pagination_row
+from src.bot.utils.outbound_dispatcher import outbound_dispatcher, SendPriority
 
 
 logger = logging.getLogger(__name__)
@@ -49,65 +51,79 @@ def get_status_display(status: str) -> str:
     return status_map.get(status, f"Неизвестный ({status})")
 
 
-def _build_notifications_keyboard(notifications, source_menu: str, page: int = 0, items_per_page: int = 10):
-    # Все решения сортируются по уменьшению оценки GigaChat
-    with Session() as db:
-        # Словарь типа: {application_id: gigachat_score (resume score)}
-        resume_scores = {
-            r.application_id: r.gigachat_score 
-            for r in db.query(Resume).filter(
-                Resume.application_id.in_(
-                    [n.application_id for n in notifications if n.application_id]
-                )
-            ).all()
-        }
-    
-    sorted_notifications = sorted(
-        notifications,
-        key=lambda notif: (
-            {"processing": 0, "new": 1, "approved": 2, "declined": 3}.get(notif.status, 4),
-            # Объединенная оценка по резюме + по ответам
-            -((notif.analysis_score or 0) * 1 + (resume_scores.get(notif.application_id, 0) * 1))
-            )
+# Порядок статусов в списке решений: сначала взятые в работу, затем новые, затем архив
+NOTIFICATION_STATUS_RANK = {"processing": 0, "new": 1, "approved": 2, "declined": 3}
+
+NOTIFICATIONS_PER_PAGE = 10
+
+
+def _get_menu_statuses(menu_type: str, archive_type: Optional[str] = None) -> Optional[List[str]]:
+    '''Статусы решений, которые показываются в выбранном меню (None - неизвестное меню)'''
+    match menu_type:
+        case 'n':
+            return ['new']
+        case 'p':
+            return ['processing']
+        case 'a':
+            if archive_type in ('approved', 'declined'):
+                return [archive_type]
+            return ['approved', 'declined']
+    return None
+
+
+def _get_notifications_page(db, statuses: List[str], token: Optional[str] = None) -> KeysetPage:
+    '''
+    Получить одну страницу решений одним запросом
+
+    Решения сортируются по статусу, объединенной оценке (по резюме + по ответам, хранится в
+    HrNotification.combined_score) и id, страница выбирается по keyset токену. В меню с одним
+    статусом порядок совпадает с индексом ix_hr_notifications_status_combined_score, и страница
+    читается прямо из него; общий архив (два статуса) сортируется по вычисляемому рангу статуса
+
+    Returns:
+        KeysetPage: Строки страницы (id, status, vacancy_title, combined_score)
+    '''
+    stmt = select(
+        HrNotification.id,
+        HrNotification.status,
+        Vacancy.title.label('vacancy_title'),
+        HrNotification.combined_score
+    ).join(
+        Vacancy, Vacancy.id == HrNotification.vacancy_id
+    ).where(
+        HrNotification.status.in_(statuses)
     )
 
-    total_pages = (len(sorted_notifications) + items_per_page - 1) // items_per_page
-    page_notifications = sorted_notifications[page*items_per_page:(page+1)*items_per_page]
-    
+    keys = []
+    if len(statuses) > 1:
+        status_rank = case(NOTIFICATION_STATUS_RANK, value=HrNotification.status, else_=4)
+        stmt = stmt.add_columns(status_rank.label('status_rank'))
+        keys.append(SortKey(status_rank, 'status_rank'))
+    keys += [
+        SortKey(HrNotification.combined_score, 'combined_score', descending=True),
+        SortKey(HrNotification.id, 'id')
+    ]
+    return paginate(db, stmt, keys, token=token, page_size=NOTIFICATIONS_PER_PAGE)
+
+
+def _build_notifications_keyboard(page: KeysetPage, source_menu: str):
+    # Все решения сортируются по уменьшению оценки GigaChat (см. _get_notifications_page)
     keyboard = []
-    with Session() as db:
-        for notification in page_notifications:
-            vacancy = db.query(Vacancy).get(notification.vacancy_id)
-            resume_score = resume_scores.get(notification.application_id, 0)
-            vacancy_title = vacancy.title
-            btn_text = (
-                f"{vacancy_title[:15]} | "
-                f"Оценка: {notification.analysis_score + resume_score} | "
-                f"{get_status_display(notification.status)}"
+    for row in page.items:
+        btn_text = (
+            f"{row.vacancy_title[:15]} | "
+            f"Оценка: {row.combined_score} | "
+            f"{get_status_display(row.status)}"
+        )
+        keyboard.append([
+            InlineKeyboardButton(
+                text=btn_text,
+                callback_data=f"notification_detail_{row.id}_{source_menu}"
             )
-            keyboard.append([
-                InlineKeyboardButton(
-                    text=btn_text,
-                    callback_data=f"notification_detail_{notification.id}_{source_menu}"
-                )
-            ])
+        ])
     
-    if total_pages > 1:
-        pagination = []
-        if page > 0:
-            pagination.append(InlineKeyboardButton(
-                text="◀️", 
-                callback_data=f"notifications_page_{source_menu}_{page-1}"
-            ))
-        pagination.append(InlineKeyboardButton(
-            text=f"{page+1}/{total_pages}", 
-            callback_data="noop"
-        ))
-        if page < total_pages - 1:
-            pagination.append(InlineKeyboardButton(
-                text="▶️", 
-                callback_data=f"notifications_page_{source_menu}_{page+1}"
-            ))
+    pagination = build_pagination_row(page, f"notifications_page_{source_menu}_")
+    if pagination:
         keyboard.append(pagination)
     
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
@@ -154,9 +170,9 @@ async def _get_reviews_selection(message: Message, user=None):
                 )
                 return
             
-            all_notifications = db.query(HrNotification).all()
+            has_notifications = db.query(db.query(HrNotification.id).exists()).scalar()
             
-            if not all_notifications:
+            if not has_notifications:
                 await message.answer(msg_templates.EMPTY_REVIEWS)
                 return
             
@@ -187,45 +203,30 @@ async def _get_reviews_selection(message: Message, user=None):
 @hr_commands_router.callback_query(F.data.startswith("notifications_page_"))
 async def _handle_notifications_pagination(callback: CallbackQuery):
     try:
+        # notifications_page_<меню>[_<архив>]_<токен страницы>
         parts = callback.data.split("_")
         menu_type = parts[2]
-        page = int(parts[3])
+        token = parts[-1]
 
         if len(parts) > 4:
-            archive_type = parts[4]
+            archive_type = parts[3]
             full_menu_type = f"{menu_type}_{archive_type}"
         else:
             archive_type = None
             full_menu_type = menu_type
         
+        statuses = _get_menu_statuses(menu_type, archive_type)
+        if statuses is None:
+            await callback.answer("Invalid menu type")
+            return
+        
         with Session() as db:
-            if menu_type == 'n':
-                notifications = db.query(HrNotification).filter(
-                    HrNotification.status == 'new'
-                ).join(Vacancy).all()
-            elif menu_type == 'p':
-                notifications = db.query(HrNotification).filter(
-                    HrNotification.status == 'processing'
-                ).join(Vacancy).all()
-            elif menu_type == 'a':
-                if archive_type == 'approved':
-                    notifications = db.query(HrNotification).filter(
-                        HrNotification.status == 'approved'
-                    ).join(Vacancy).all()
-                elif archive_type == 'declined':
-                    notifications = db.query(HrNotification).filter(
-                        HrNotification.status == 'declined'
-                    ).join(Vacancy).all()
-                else:
-                    notifications = db.query(HrNotification).filter(
-                        HrNotification.status.in_(['approved', 'declined'])
-                    ).join(Vacancy).all()
+            page = _get_notifications_page(db, statuses, token)
             
             await callback.message.edit_reply_markup(
                 reply_markup=_build_notifications_keyboard(
-                    notifications=notifications, 
-                    source_menu=full_menu_type,
-                    page=page
+                    page,
+                    source_menu=full_menu_type
                 )
             )
         await callback.answer()
@@ -250,37 +251,23 @@ async def _get_notifications_by_status(callback: CallbackQuery):
             match menu_type:
                 case 'n':
                     text = msg_templates.NEW_REVIEWS
-                    notifications = db.query(HrNotification).filter_by(
-                        status='new'
-                        ).join(Vacancy).all()
                 case 'p':
                     text = msg_templates.PROCESSING_REVIEWS
-                    notifications = db.query(HrNotification).filter_by(
-                        status='processing'
-                        ).join(Vacancy).all()
                 case 'a':
                     if archive_type == 'approved':
                         text = msg_templates.ARCHIVE_APPROVED
-                        notifications = db.query(HrNotification).filter_by(
-                            status='approved'
-                        ).join(Vacancy).all()
                     elif archive_type == 'declined':
                         text = msg_templates.ARCHIVE_DECLINED
-                        notifications = db.query(HrNotification).filter_by(
-                            status='declined'
-                        ).join(Vacancy).all()
                     else:
                         text = msg_templates.ARCHIVE_REVIEWS
-                        notifications = db.query(HrNotification).filter(
-                            HrNotification.status.in_(['approved', 'declined'])
-                        ).join(Vacancy).all()
                 case _:
                     await callback.answer("Недопустипый тип меню")
                     return
+            page = _get_notifications_page(db, _get_menu_statuses(menu_type, archive_type))
             await callback.message.answer(
                 text,
                 reply_markup=_build_notifications_keyboard(
-                    notifications,
+                    page,
                     source_menu=f"{menu_type}_{archive_type}" if archive_type else menu_type
                 )
             )
@@ -508,8 +495,7 @@ async def _approve_candidate(callback: CallbackQuery):
             
             db.commit()
             
-            await _notify_candidate(
-                bot=callback.bot,
+            _notify_candidate(
                 telegram_id=candidate_telegram_id,
                 decision=ACCEPT_DECISION
             )         
@@ -547,8 +533,7 @@ async def _decline_candidate(callback: CallbackQuery):
             
             db.commit()
             
-            await _notify_candidate(
-                bot=callback.bot,
+            _notify_candidate(
                 telegram_id=candidate_telegram_id,
                 decision=DECLINE_DECISION
             )
@@ -559,22 +544,23 @@ async def _decline_candidate(callback: CallbackQuery):
         await handle_db_error(callback.message)
 
 
-async def _notify_candidate(
-    bot: Bot,
+def _notify_candidate(
     telegram_id: int, 
     decision: bool
 ):
-    '''Уведомить кандидата о результах проверки HR-специалистом'''
+    '''Уведомить кандидата о результах проверки HR-специалистом (через очередь исходящих сообщений)'''
     try:
         if decision:
-            await bot.send_message(
+            outbound_dispatcher.send_message(
                 chat_id=telegram_id,
-                text=msg_templates.TO_ACCEPTED_CANDIDATE
+                text=msg_templates.TO_ACCEPTED_CANDIDATE,
+                priority=SendPriority.NOTIFICATION
             )
         else:
-            await bot.send_message(
+            outbound_dispatcher.send_message(
                 chat_id=telegram_id,
-                text=msg_templates.TO_DECLINED_CANDIDATE
+                text=msg_templates.TO_DECLINED_CANDIDATE,
+                priority=SendPriority.NOTIFICATION
             )
     except Exception as e:
         logger.error(f'Error while notifying candidate: {str(e)}')
@@ -609,39 +595,25 @@ async def _back_to_list(callback: CallbackQuery):
         with Session() as db:
             match menu_type:
                 case 'n':
-                    notifications = db.query(HrNotification).filter_by(
-                        status='new'
-                    ).join(Vacancy).all()
                     text = msg_templates.NEW_REVIEWS
                 case 'p':
-                    notifications = db.query(HrNotification).filter_by(
-                        status='processing'
-                    ).join(Vacancy).all()
                     text = msg_templates.PROCESSING_REVIEWS
                 case 'a':
                     if archive_type == 'approved':
                         text = msg_templates.ARCHIVE_APPROVED
-                        notifications = db.query(HrNotification).filter(
-                            HrNotification.status == 'approved'
-                        ).join(Vacancy).all()
                     elif archive_type == 'declined':
                         text = msg_templates.ARCHIVE_DECLINED
-                        notifications = db.query(HrNotification).filter(
-                            HrNotification.status == 'declined'
-                        ).join(Vacancy).all()
                     else:
                         text = msg_templates.ARCHIVE_REVIEWS
-                        notifications = db.query(HrNotification).filter(
-                            HrNotification.status.in_(['approved', 'declined'])
-                        ).join(Vacancy).all()
                 case _:
                     await callback.answer("Invalid menu type")
                     return
             
+            page = _get_notifications_page(db, _get_menu_statuses(menu_type, archive_type))
             await callback.message.edit_text(
                 text,
                 reply_markup=_build_notifications_keyboard(
-                    notifications, 
+                    page,
                     source_menu=full_menu_type
                 )
             )
@@ -11,6 +11,7 @@ from sqlalchemy.exc import IntegrityError
 from src.database.session import Session
 from src.database.models import RegistrationToken, HrSpecialist
 from src.bot.config import ADMIN_CHANNEL_ID
+from src.bot.utils.outbound_dispatcher import outbound_dispatcher, SendPriority
 
 
 hr_registration_router = Router()
@@ -134,12 +135,13 @@ async def process_full_name(message: Message, state: FSMContext):
         parse_mode="Markdown"
     )
             
-    await message.bot.send_message(
-        ADMIN_CHANNEL_ID,
-        msg_templates.hr_registered_notification_message(
+    outbound_dispatcher.send_message(
+        chat_id=ADMIN_CHANNEL_ID,
+        text=msg_templates.hr_registered_notification_message(
             hr_full_name=hr_full_name,
             telegram_id=hr_telegram_id
         ),
+        priority=SendPriority.NOTIFICATION,
         parse_mode="MarkdownV2"
     )
             
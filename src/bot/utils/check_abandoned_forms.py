@@ -1,56 +1,128 @@
+import os
 import asyncio
 import logging
 
-from aiogram import Bot
+from typing import Awaitable, Callable, Dict, Optional
 from datetime import timedelta, timezone, datetime
+from dotenv import load_dotenv
+from sqlalchemy import select, update
 
-from src.bot.utils.schedule_form_reminder import schedule_form_reminder
+from src.bot.utils.schedule_form_reminder import schedule_form_reminders
 
-from src.database.session import Session
+from src.database.session import AsyncSession
+from src.database.utils.interaction_buffer import interaction_buffer
 from src.database.models import BotInteraction, Candidate
 from src.database.models.bot_interaction import InteractionState
 
 
 logger = logging.getLogger(__name__)
+load_dotenv()
 
 
-async def check_abandoned_forms(bot: Bot, delay_minutes: int = 30):
+# Сколько анкет приостанавливается одной транзакцией при проверке
+ABANDONED_FORMS_BATCH_SIZE = int(os.getenv("ABANDONED_FORMS_BATCH_SIZE", "5000"))
+
+
+def _pause_abandoned_statement(threshold_time: datetime, batch_size: int):
+    '''
+    Один запрос на пачку: приостанавливаем неактивные анкеты и сразу получаем Telegram ID кандидатов
+        
+        WITH paused AS (
+            UPDATE bot_interactions SET state = 'PAUSED'
+            WHERE id IN (SELECT id ... WHERE state = 'STARTED' AND last_active < :threshold LIMIT :batch FOR UPDATE SKIP LOCKED)
+            RETURNING application_id, candidate_id
+        )
+        SELECT paused.application_id, candidates.telegram_id FROM paused LEFT JOIN candidates ...
+    
+    Подзапрос идет по индексу (state, last_active), SKIP LOCKED не дает двум проверкам
+    (или проверке и обработчику кандидата) ждать друг друга на одних и тех же строках.
+    '''
+    stale_ids = select(BotInteraction.id).where(
+        BotInteraction.state == InteractionState.STARTED,
+        BotInteraction.last_active < threshold_time
+    ).limit(batch_size).with_for_update(skip_locked=True).scalar_subquery()
+    
+    paused = update(BotInteraction).where(
+        BotInteraction.id.in_(stale_ids)
+    ).values(
+        state=InteractionState.PAUSED,
+        # Явно оставляем last_active как есть, иначе сработает onupdate колонки
+        last_active=BotInteraction.last_active
+    ).returning(
+        BotInteraction.application_id,
+        BotInteraction.candidate_id
+    ).cte('paused')
+    
+    return select(
+        paused.c.application_id,
+        Candidate.telegram_id
+    ).select_from(paused).outerjoin(
+        Candidate, Candidate.id == paused.c.candidate_id
+    )
+
+
+async def pause_abandoned_forms(threshold_time: datetime, batch_size: int = ABANDONED_FORMS_BATCH_SIZE) -> Dict[int, int]:
+    '''
+    Приостановить все анкеты, неактивные с threshold_time
+    
+    Args:
+        threshold_time (datetime): Граница неактивности (naive UTC, как в last_active)
+        batch_size (int): Размер пачки на одну транзакцию
+    
+    Returns:
+        Dict[int, int]: Telegram ID кандидата -> ID отклика для напоминания
+            (по одному напоминанию на кандидата, даже если брошено несколько анкет)
+    '''
+    reminders: Dict[int, int] = {}
+    paused_total = 0
+    while True:
+        async with AsyncSession() as db:
+            rows = (await db.execute(_pause_abandoned_statement(threshold_time, batch_size))).all()
+            await db.commit()
+        
+        paused_total += len(rows)
+        for application_id, telegram_id in rows:
+            if not telegram_id:
+                continue
+            try:
+                reminders[int(telegram_id)] = application_id
+            except ValueError:
+                logger.warning(f'Invalid telegram_id {telegram_id} for application {application_id}')
+        
+        if len(rows) < batch_size:
+            break
+    
+    if paused_total:
+        logger.info(f'Paused {paused_total} abandoned forms, {len(reminders)} reminders to send')
+    return reminders
+
+
+async def check_abandoned_forms(
+    delay_minutes: int = 30,
+    ensure_leader: Optional[Callable[[], Awaitable[None]]] = None
+):
     '''
     Периодическая проверка на неактивность анкет и отправка уведомлений
+    
+    ensure_leader вызывается перед каждой проверкой и останавливает задачу (LeadershipLost),
+    если процесс больше не лидер
     '''
     INACTIVITY_THRESHOLD = timedelta(minutes=delay_minutes)
     
     while True:
+        if ensure_leader is not None:
+            await ensure_leader()
         try:
-            with Session() as db:
-                # Ищем BotInteraction, которые все ещё активны, но не были обновлены долгое время
-                threshold_time = datetime.now(timezone.utc) - INACTIVITY_THRESHOLD
-                abandoned_interactions = db.query(BotInteraction).filter(
-                    BotInteraction.state == InteractionState.STARTED,
-                    BotInteraction.last_active < threshold_time
-                ).all()
-                
-                for interaction in abandoned_interactions:
-                    # Останавливаем сессию прохождения
-                    interaction.state = InteractionState.PAUSED
-                    db.commit()
-                    
-                    candidate = db.query(Candidate).filter_by(
-                        id=interaction.candidate_id
-                    ).first()
-                    
-                    if candidate and candidate.telegram_id:
-                        user_id = int(candidate.telegram_id)
-                        # Планируем напоминание
-                        await schedule_form_reminder(
-                            bot=bot,
-                            user_id=user_id,
-                            application_id=interaction.application_id,
-                            delay_seconds=(1)   
-                        )
+            # Отметки активности копятся в буфере, перед проверкой записываем их в БД
+            await interaction_buffer.flush()
+            # Ищем BotInteraction, которые все ещё активны, но не были обновлены долгое время,
+            # и останавливаем сессию прохождения
+            threshold_time = datetime.now(timezone.utc).replace(tzinfo=None) - INACTIVITY_THRESHOLD
+            reminders = await pause_abandoned_forms(threshold_time)
+            # Напоминания отправит form_reminders_processing_task с учетом лимитов Telegram
+            await schedule_form_reminders(reminders, delay_seconds=0)
         except Exception as e:
             logger.error(f'Error checking for abandoned forms: {str(e)}')
         
-        # Проверяем анкеты каждые 15 минут 
+        # Проверяем анкеты каждые 15 минут
         await asyncio.sleep(60 * 15)
-    
\ No newline at end of file
@@ -0,0 +1,282 @@
+import os
+import heapq
+import asyncio
+import logging
+import itertools
+
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from aiogram import Bot
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError
+from dotenv import load_dotenv
+
+from src.gigachat_module.utils.rate_limiter import TokenBucket
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+'''
+    Очередь исходящих сообщений Telegram бота
+
+    Bot API ограничивает бота примерно 30 сообщениями в секунду на всех получателей и
+    одним сообщением в секунду в один чат, при превышении отвечая 429 (TelegramRetryAfter).
+    Все сообщения, которые бот отправляет не в ответ на действие пользователя (напоминания,
+    решения HR, уведомления админов), ставятся в очередь OutboundDispatcher и отправляются
+    в порядке приоритета, не быстрее этих ограничений и с повтором после RetryAfter.
+
+    Ответы обработчиков в диалоге (message.answer, edit_text и т.п.) идут в обход очереди,
+    чтобы не ждать рассылок, но учитываются в общем лимите через middleware сессии бота.
+'''
+
+
+# Общий лимит исходящих сообщений бота в секунду (с запасом от лимита Telegram)
+OUTBOUND_MESSAGES_PER_SECOND = float(os.getenv("OUTBOUND_MESSAGES_PER_SECOND", "28"))
+# Минимальный интервал между сообщениями из очереди в один чат (в секундах)
+OUTBOUND_CHAT_INTERVAL_SECONDS = float(os.getenv("OUTBOUND_CHAT_INTERVAL_SECONDS", "1"))
+# Сколько запросов к Bot API из очереди выполняется одновременно
+OUTBOUND_MAX_IN_FLIGHT = int(os.getenv("OUTBOUND_MAX_IN_FLIGHT", "30"))
+# Максимальное количество попыток при сетевых ошибках и ошибках сервера Telegram
+OUTBOUND_MAX_ATTEMPTS = int(os.getenv("OUTBOUND_MAX_ATTEMPTS", "5"))
+# Сколько секунд при остановке процесса дается на отправку оставшихся в очереди сообщений
+OUTBOUND_DRAIN_TIMEOUT_SECONDS = float(os.getenv("OUTBOUND_DRAIN_TIMEOUT_SECONDS", "10"))
+
+# Запросы, которые выполняет сам диспетчер, middleware пропускает без учета в лимите
+_dispatching: ContextVar[bool] = ContextVar('outbound_dispatching', default=False)
+
+
+class SendPriority(IntEnum):
+    '''Приоритет сообщения в очереди: меньше - раньше'''
+    # Ответы в диалоге с пользователем
+    INTERACTIVE = 0
+    # Уведомления по действию пользователя (решение HR, уведомления админов)
+    NOTIFICATION = 1
+    # Массовые рассылки (напоминания о брошенных анкетах)
+    BULK = 2
+
+
+@dataclass(order=True)
+class _OutboundMessage:
+    priority: int
+    seq: int
+    chat_id: Any = field(compare=False)
+    method: TelegramMethod = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class OutboundDispatcher:
+    """
+    Очередь исходящих сообщений бота с учетом ограничений Bot API
+
+    Methods:
+        attach(bot):
+            Подключить бота: диспетчер отправляет через него сообщения и учитывает его ответы в диалогах
+        set_rate(rate):
+            Изменить общий лимит сообщений в секунду
+        send_message(chat_id, text, priority, **kwargs):
+            Поставить сообщение в очередь
+        enqueue(method, priority):
+            Поставить в очередь произвольный метод Bot API с chat_id
+        pending(priority=None):
+            Количество сообщений в очереди (всех или одного приоритета)
+        run():
+            Цикл отправки, запускается отдельной задачей
+        drain(timeout):
+            Отправить оставшиеся в очереди сообщения при остановке процесса
+    """
+    def __init__(
+        self,
+        rate: float = OUTBOUND_MESSAGES_PER_SECOND,
+        chat_interval: float = OUTBOUND_CHAT_INTERVAL_SECONDS,
+        max_in_flight: int = OUTBOUND_MAX_IN_FLIGHT,
+        max_attempts: int = OUTBOUND_MAX_ATTEMPTS
+    ):
+        self.bot: Optional[Bot] = None
+        self.chat_interval = chat_interval
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_attempts = max(1, max_attempts)
+        # capacity=1: сообщения идут равномерно, без всплеска после простоя или паузы по 429
+        self._bucket = TokenBucket(rate, capacity=1)
+        # Куча готовых к отправке сообщений (по приоритету и порядку постановки)
+        self._ready: List[_OutboundMessage] = []
+        # Куча отложенных сообщений: (время, когда можно отправлять, сообщение)
+        self._delayed: List[Tuple[float, _OutboundMessage]] = []
+        # Время, раньше которого нельзя писать в чат (ключ - chat_id строкой: в БД Telegram ID хранятся строками)
+        self._chat_ready_at: Dict[Any, float] = {}
+        self._pending_by_priority: Dict[int, int] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        # Устанавливается, когда в очереди не остается неотправленных сообщений
+        self._idle = asyncio.Event()
+
+    def attach(self, bot: Bot) -> None:
+        self.bot = bot
+        bot.session.middleware(self._count_direct_request)
+
+    def set_rate(self, rate: float) -> None:
+        '''Изменить общий лимит (например, поделить лимит бота между несколькими процессами)'''
+        self._bucket.rate = rate
+
+    def pending(self, priority: Optional[SendPriority] = None) -> int:
+        if priority is None:
+            return sum(self._pending_by_priority.values())
+        return self._pending_by_priority.get(int(priority), 0)
+
+    def send_message(
+        self,
+        chat_id: Any,
+        text: str,
+        priority: SendPriority = SendPriority.NOTIFICATION,
+        **kwargs
+    ) -> asyncio.Future:
+        '''
+        Поставить сообщение в очередь
+
+        Returns:
+            asyncio.Future: Результат отправки (Message). Ждать его не обязательно:
+                ошибки отправки логируются диспетчером
+        '''
+        return self.enqueue(SendMessage(chat_id=chat_id, text=text, **kwargs), priority=priority)
+
+    def enqueue(self, method: TelegramMethod, priority: SendPriority = SendPriority.NOTIFICATION) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Помечаем исключение полученным, чтобы неожидаемые Future не засоряли лог
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        message = _OutboundMessage(
+            priority=int(priority),
+            seq=next(self._seq),
+            chat_id=str(getattr(method, 'chat_id', None)),
+            method=method,
+            future=future
+        )
+        self._pending_by_priority[message.priority] = self._pending_by_priority.get(message.priority, 0) + 1
+        heapq.heappush(self._ready, message)
+        self._wakeup.set()
+        return future
+
+    async def _count_direct_request(self, make_request, bot: Bot, method: TelegramMethod):
+        '''Middleware сессии бота: запросы обработчиков в чаты расходуют общий лимит, но не ждут его'''
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is not None and not _dispatching.get():
+            self._bucket.consume()
+            self._mark_chat(str(chat_id), asyncio.get_running_loop().time())
+        return await make_request(bot, method)
+
+    def _mark_chat(self, chat_id: Any, now: float) -> None:
+        self._chat_ready_at[chat_id] = max(self._chat_ready_at.get(chat_id, 0.0), now + self.chat_interval)
+        if len(self._chat_ready_at) > 10000:
+            self._chat_ready_at = {chat: ready_at for chat, ready_at in self._chat_ready_at.items() if ready_at > now}
+
+    def _delay(self, message: _OutboundMessage, until: float) -> None:
+        heapq.heappush(self._delayed, (until, message))
+        self._wakeup.set()
+
+    def _finish(self, message: _OutboundMessage) -> None:
+        self._pending_by_priority[message.priority] -= 1
+        if not self.pending():
+            self._idle.set()
+
+    async def _send(self, message: _OutboundMessage) -> None:
+        _dispatching.set(True)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await self.bot(message.method)
+        except TelegramRetryAfter as e:
+            # 429 может относиться ко всему боту, поэтому приостанавливаем всю очередь
+            logger.warning(f'Telegram asked to retry after {e.retry_after}s, chat {message.chat_id}')
+            self._bucket.pause(e.retry_after)
+            self._delay(message, loop.time() + e.retry_after)
+            return
+        except (TelegramNetworkError, TelegramServerError) as e:
+            message.attempts += 1
+            if message.attempts < self.max_attempts:
+                self._delay(message, loop.time() + 2 ** message.attempts)
+                return
+            logger.error(f'Failed to send message to chat {message.chat_id} after {message.attempts} attempts: {str(e)}')
+            self._finish(message)
+            message.future.set_exception(e)
+            return
+        except Exception as e:
+            logger.error(f'Error sending message to chat {message.chat_id}: {str(e)}')
+            self._finish(message)
+            message.future.set_exception(e)
+            return
+        self._finish(message)
+        if not message.future.done():
+            message.future.set_result(result)
+
+    def _release_delayed(self, now: float) -> None:
+        while self._delayed and self._delayed[0][0] <= now:
+            heapq.heappush(self._ready, heapq.heappop(self._delayed)[1])
+
+    async def run(self) -> None:
+        if self.bot is None:
+            raise RuntimeError('OutboundDispatcher.attach(bot) must be called before run()')
+        loop = asyncio.get_running_loop()
+        in_flight = set()
+        while True:
+            try:
+                self._wakeup.clear()
+                now = loop.time()
+                self._release_delayed(now)
+
+                if not self._ready or len(in_flight) >= self.max_in_flight:
+                    timeout = self._delayed[0][0] - now if self._delayed else None
+                    waiters = set(in_flight) if len(in_flight) >= self.max_in_flight else set()
+                    wakeup = asyncio.create_task(self._wakeup.wait())
+                    try:
+                        await asyncio.wait(waiters | {wakeup}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        wakeup.cancel()
+                    continue
+
+                message = heapq.heappop(self._ready)
+                chat_ready_at = self._chat_ready_at.get(message.chat_id, 0.0)
+                if chat_ready_at > now:
+                    # В этот чат недавно писали: откладываем, не задерживая сообщения в другие чаты
+                    heapq.heappush(self._delayed, (chat_ready_at, message))
+                    continue
+
+                try:
+                    await self._bucket.acquire()
+                except asyncio.CancelledError:
+                    # Сообщение уже снято с очереди: возвращаем его, чтобы оно не потерялось при остановке
+                    heapq.heappush(self._ready, message)
+                    raise
+                self._mark_chat(message.chat_id, loop.time())
+                task = asyncio.create_task(self._send(message))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            except Exception as e:
+                logger.error(f'Error in outbound dispatcher: {str(e)}', exc_info=True)
+                await asyncio.sleep(1)
+
+    async def drain(self, timeout: float = OUTBOUND_DRAIN_TIMEOUT_SECONDS) -> None:
+        '''
+        Отправить оставшиеся в очереди сообщения (уведомления HR, решения по кандидатам)
+        при остановке процесса, соблюдая те же лимиты, что и run()
+
+        Вызывается после остановки задачи run(), но до закрытия сессии бота. Ждет не дольше
+        timeout секунд: сообщения, которые не успели отправить (например, отложенные по
+        RetryAfter дольше timeout), логируются и теряются.
+        '''
+        if self.bot is None or not self.pending():
+            return
+        self._idle.clear()
+        sending = asyncio.create_task(self.run())
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f'{self.pending()} outbound messages were not sent before shutdown')
+        finally:
+            sending.cancel()
+            await asyncio.gather(sending, return_exceptions=True)
+
+
+# Общая на процесс очередь исходящих сообщений
+outbound_dispatcher = OutboundDispatcher()
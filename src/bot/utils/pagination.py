@@ -0,0 +1,263 @@
+import string
+
+from typing import Any, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from aiogram.types import InlineKeyboardButton
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.sql import Select
+
+
+'''
+    Keyset-пагинация списков бота
+
+    Вместо OFFSET страница выбирается условием "строки после последнего ключа предыдущей
+    страницы", поэтому стоимость страницы не зависит от ее номера и размера таблицы.
+    Ключ граничной строки, номер страницы и общее количество записей кодируются в короткий
+    токен, который передается в callback_data кнопок навигации.
+
+    Колонки ключа сортировки должны быть NOT NULL (для nullable колонки задается null_value -
+    значение, которым заменяется NULL), а последний ключ - уникальным (обычно id), иначе часть
+    строк с одинаковым ключом может пропасть между страницами.
+'''
+
+
+# Ограничение Telegram на длину callback_data
+CALLBACK_DATA_MAX_BYTES = 64
+
+_DIGITS = string.digits + string.ascii_lowercase
+_EPOCH = datetime(1970, 1, 1)
+_FORWARD = 'n'
+_BACKWARD = 'p'
+# Метки значений ключа в токене: не цифры base-36 и не '-', чтобы не спутать значение с числом
+_NULL_TAG = '~'
+_DATETIME_TAG = '@'
+
+
+@dataclass(frozen=True)
+class SortKey:
+    '''
+    Ключ сортировки списка
+
+    Fields:
+        expression: Колонка или SQL выражение для ORDER BY и условия keyset
+        attribute (str): Имя атрибута строки результата (или ORM объекта), где лежит значение ключа
+        descending (bool): Сортировка по убыванию
+        null_value: Значение вместо NULL для nullable колонки (сравнение с NULL в SQL не
+            выполняется, и такие строки выпадали бы из страниц)
+    '''
+    expression: Any
+    attribute: str
+    descending: bool = False
+    null_value: Any = None
+
+    @property
+    def sort_expression(self):
+        '''Выражение для ORDER BY и условия keyset'''
+        if self.null_value is None:
+            return self.expression
+        return func.coalesce(self.expression, self.null_value)
+
+    def value_of(self, item) -> Any:
+        value = getattr(item, self.attribute)
+        return self.null_value if value is None else value
+
+
+@dataclass
+class KeysetPage:
+    '''
+    Страница списка
+
+    Fields:
+        items (list): Строки страницы
+        page (int): Номер страницы (с нуля)
+        total (int): Общее количество записей в списке
+        next_token (str): Токен следующей страницы или None
+        prev_token (str): Токен предыдущей страницы или None
+    '''
+    items: List[Any]
+    page: int
+    total: int
+    next_token: Optional[str]
+    prev_token: Optional[str]
+    page_size: int
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, (self.total + self.page_size - 1) // self.page_size)
+
+
+def _encode_int(value: int) -> str:
+    if value < 0:
+        return '-' + _encode_int(-value)
+    encoded = ''
+    while True:
+        value, remainder = divmod(value, 36)
+        encoded = _DIGITS[remainder] + encoded
+        if not value:
+            return encoded
+
+
+def _encode_value(value: Any) -> str:
+    if value is None:
+        return _NULL_TAG
+    if isinstance(value, datetime):
+        return _DATETIME_TAG + _encode_int((value.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1))
+    if isinstance(value, int):
+        return _encode_int(int(value))
+    raise ValueError(f'Unsupported keyset value type: {type(value).__name__}')
+
+
+def _decode_value(encoded: str) -> Any:
+    if encoded == _NULL_TAG:
+        return None
+    if encoded.startswith(_DATETIME_TAG):
+        return _EPOCH + timedelta(microseconds=int(encoded[1:], 36))
+    return int(encoded, 36)
+
+
+def encode_token(direction: str, page: int, total: int, values: Sequence[Any]) -> str:
+    '''Токен страницы: <направление><номер>.<всего>:<значения ключа через точку>'''
+    return (
+        f'{direction}{_encode_int(page)}.{_encode_int(total)}:'
+        + '.'.join(_encode_value(value) for value in values)
+    )
+
+
+def decode_token(token: str) -> Tuple[str, int, int, List[Any]]:
+    '''
+    Разобрать токен страницы
+
+    Raises:
+        ValueError: Если токен поврежден
+    '''
+    header, _, values = token.partition(':')
+    direction = header[:1]
+    if direction not in (_FORWARD, _BACKWARD) or '.' not in header:
+        raise ValueError(f'Invalid page token: {token}')
+    page, total = header[1:].split('.', 1)
+    return direction, int(page, 36), int(total, 36), [_decode_value(value) for value in values.split('.')]
+
+
+def _keyset_condition(keys: Sequence[SortKey], values: Sequence[Any], forward: bool):
+    '''Условие "строка идет после (или до) строки с ключом values" в порядке сортировки keys'''
+    if len(keys) != len(values):
+        raise ValueError('Page token does not match the sort keys')
+    clauses = []
+    for i, key in enumerate(keys):
+        after = forward != key.descending
+        expression = key.sort_expression
+        comparison = expression > values[i] if after else expression < values[i]
+        clauses.append(and_(*(keys[j].sort_expression == values[j] for j in range(i)), comparison))
+    return or_(*clauses)
+
+
+def _order_by(keys: Sequence[SortKey], forward: bool) -> list:
+    return [
+        key.sort_expression.desc() if key.descending == forward else key.sort_expression.asc()
+        for key in keys
+    ]
+
+
+def paginate(
+    db,
+    stmt: Select,
+    keys: Sequence[SortKey],
+    token: Optional[str] = None,
+    page_size: int = 10,
+    scalars: bool = False
+) -> KeysetPage:
+    '''
+    Получить страницу списка по токену
+
+    Загружается page_size + 1 строка: лишняя строка только показывает, есть ли следующая
+    страница. Общее количество записей считается один раз, при открытии первой страницы,
+    и дальше переносится в токенах.
+
+    Args:
+        db (Session): Сессия БД
+        stmt (Select): Запрос списка без ORDER BY / LIMIT
+        keys (Sequence[SortKey]): Ключи сортировки, значения которых есть в строках результата
+        token (str): Токен страницы из callback_data, None - первая страница
+        page_size (int): Размер страницы
+        scalars (bool): Запрос возвращает ORM объекты (select(Model)), а не строки
+
+    Returns:
+        KeysetPage: Страница списка с токенами соседних страниц
+
+    Raises:
+        ValueError: Если токен поврежден
+    '''
+    if token:
+        direction, page, total, values = decode_token(token)
+    else:
+        direction, page, total, values = _FORWARD, 0, None, None
+    forward = direction == _FORWARD
+
+    if total is None:
+        total = db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+
+    query = stmt
+    if values is not None:
+        query = query.where(_keyset_condition(keys, values, forward))
+    result = db.execute(query.order_by(*_order_by(keys, forward)).limit(page_size + 1))
+    items = list(result.scalars() if scalars else result)
+
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if forward:
+        has_next, has_prev = has_more, values is not None
+    else:
+        # Шли назад от страницы, которая идет следом
+        items.reverse()
+        has_next, has_prev = True, has_more
+        if not has_prev:
+            page = 0
+
+    def key_values(item) -> List[Any]:
+        return [key.value_of(item) for key in keys]
+
+    return KeysetPage(
+        items=items,
+        page=page,
+        total=total,
+        next_token=encode_token(_FORWARD, page + 1, total, key_values(items[-1])) if has_next and items else None,
+        prev_token=encode_token(_BACKWARD, page - 1, total, key_values(items[0])) if has_prev and items else None,
+        page_size=page_size
+    )
+
+
+def page_callback_data(prefix: str, token: str) -> str:
+    '''
+    callback_data кнопки навигации
+
+    Raises:
+        ValueError: Если callback_data не помещается в ограничение Telegram
+    '''
+    callback_data = f'{prefix}{token}'
+    if len(callback_data.encode('utf-8')) > CALLBACK_DATA_MAX_BYTES:
+        raise ValueError(f'callback_data is longer than {CALLBACK_DATA_MAX_BYTES} bytes: {callback_data}')
+    return callback_data
+
+
+def build_pagination_row(page: KeysetPage, callback_prefix: str) -> List[InlineKeyboardButton]:
+    '''Ряд кнопок навигации (◀️ n/N ▶️), пустой список - если страница одна'''
+    if not page.next_token and not page.prev_token:
+        return []
+
+    pagination = []
+    if page.prev_token:
+        pagination.append(InlineKeyboardButton(
+            text="◀️",
+            callback_data=page_callback_data(callback_prefix, page.prev_token)
+        ))
+    pagination.append(InlineKeyboardButton(
+        text=f"{page.page+1}/{page.total_pages}",
+        callback_data="noop"
+    ))
+    if page.next_token:
+        pagination.append(InlineKeyboardButton(
+            text="▶️",
+            callback_data=page_callback_data(callback_prefix, page.next_token)
+        ))
+    return pagination
@@ -1,21 +1,74 @@
+import os
 import asyncio
 import logging
 import src.bot.utils.message_templates as msg_templates
 
-from aiogram import Bot
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
 
-from src.database.session import Session
-from src.database.models import BotInteraction
+from src.bot.utils.outbound_dispatcher import outbound_dispatcher, SendPriority
+from src.database.session import AsyncSession
+from src.database.models import BotInteraction, FormReminder
 from src.database.models.bot_interaction import InteractionState
 
 
 logger = logging.getLogger(__name__)
+load_dotenv()
 
 
-active_reminders = {}
+# Сколько наступивших напоминаний забирается из таблицы за один запрос
+FORM_REMINDER_BATCH_SIZE = int(os.getenv("FORM_REMINDER_BATCH_SIZE", "200"))
+# Максимальный интервал между проверками таблицы напоминаний (в секундах)
+FORM_REMINDER_POLL_SECONDS = int(os.getenv("FORM_REMINDER_POLL_SECONDS", "30"))
+
+_SCHEDULE_CHUNK_SIZE = 1000
+
+# Будит цикл напоминаний, когда этот же процесс запланировал новое напоминание
+form_reminders_wakeup = asyncio.Event()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def schedule_form_reminders(reminders: Dict[int, int], delay_seconds: int = 1800) -> None:
+    '''
+    Запланировать напоминания пачкой (одним INSERT ... ON CONFLICT)
+    
+    У пользователя может быть только одно напоминание: новое заменяет запланированное ранее.
+    
+    Args:
+        reminders (Dict[int, int]): Telegram ID пользователя -> ID отклика
+        delay_seconds (int): Через сколько секунд отправить напоминания
+    '''
+    if not reminders:
+        return
+    now = _utcnow()
+    due_at = now + timedelta(seconds=delay_seconds)
+    rows = [
+        {'user_id': user_id, 'application_id': application_id, 'due_at': due_at, 'created_at': now}
+        for user_id, application_id in reminders.items()
+    ]
+    async with AsyncSession() as db:
+        # Пачками, чтобы не упереться в ограничение PostgreSQL на количество параметров запроса
+        for i in range(0, len(rows), _SCHEDULE_CHUNK_SIZE):
+            stmt = insert(FormReminder).values(rows[i:i + _SCHEDULE_CHUNK_SIZE])
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[FormReminder.user_id],
+                set_={
+                    'application_id': stmt.excluded.application_id,
+                    'due_at': stmt.excluded.due_at,
+                    'created_at': stmt.excluded.created_at
+                }
+            ))
+        await db.commit()
+    form_reminders_wakeup.set()
+
 
 async def schedule_form_reminder(
-    bot: Bot,
     user_id: int,
     application_id: int,
     delay_seconds: int = 1800
@@ -23,42 +76,99 @@ async def schedule_form_reminder(
     '''
     Запланировать напоминание для пользователя, который прекратил заполнение анкеты кандидата
     
+    Напоминание сохраняется в таблицу form_reminders и переживает перезапуск бота,
+    отправляет его form_reminders_processing_task.
+    
     Args:
-        bot (Bot): Экземпляр бота, для отправки сообщения
         user_id (int): Telegram ID пользователя, получателя напоминания
         application_id (int): ID отклика, по которому происходило заполнение анкеты
         delay_seconds (int): Время ожидания (в секундах) для отправки напоминания (default: 30 минут) 
     '''
-    # Отменяем все существующие напоминания для данного пользователя
-    if user_id in active_reminders:
-        active_reminders[user_id].cancel()
+    await schedule_form_reminders({user_id: application_id}, delay_seconds=delay_seconds)
+    logger.info(f'Scheduled form reminder for user {user_id} in {delay_seconds} seconds')
+
+
+async def _still_paused(application_ids: List[int]) -> Set[int]:
+    '''ID откликов, анкеты которых все еще на паузе (кандидат мог вернуться к анкете, пока ждал напоминания)'''
+    async with AsyncSession() as db:
+        return set(await db.scalars(select(BotInteraction.application_id).where(
+            BotInteraction.application_id.in_(application_ids),
+            BotInteraction.state == InteractionState.PAUSED
+        )))
+
+
+async def _claim_due_reminders(limit: int) -> List[Tuple[int, int]]:
+    '''
+    Забрать до limit наступивших напоминаний
     
-    # Создаем новое напоминание         
-    async def send_reminder():
+    Строки удаляются в момент выборки (DELETE ... RETURNING), SKIP LOCKED не дает
+    двум процессам забрать одно и то же напоминание.
+    '''
+    due_ids = select(FormReminder.id).where(
+        FormReminder.due_at <= _utcnow()
+    ).order_by(FormReminder.due_at).limit(limit).with_for_update(skip_locked=True).scalar_subquery()
+    async with AsyncSession() as db:
+        rows = (await db.execute(
+            delete(FormReminder).where(
+                FormReminder.id.in_(due_ids)
+            ).returning(FormReminder.user_id, FormReminder.application_id)
+        )).all()
+        await db.commit()
+    return [(user_id, application_id) for user_id, application_id in rows]
+
+
+async def _next_due_at() -> Optional[datetime]:
+    async with AsyncSession() as db:
+        return await db.scalar(select(func.min(FormReminder.due_at)))
+
+
+async def form_reminders_processing_task(
+    batch_size: int = FORM_REMINDER_BATCH_SIZE,
+    poll_seconds: int = FORM_REMINDER_POLL_SECONDS
+) -> None:
+    '''
+    Цикл отправки запланированных напоминаний (один на процесс)
+    
+    Забирает наступившие напоминания пачками и ставит их в очередь исходящих сообщений
+    с низким приоритетом, после чего спит до ближайшего запланированного напоминания
+    (но не дольше poll_seconds) или до планирования нового напоминания этим процессом.
+    Новая пачка забирается, только когда очередь отправила предыдущую, поэтому при
+    падении процесса теряется не больше одной забранной пачки.
+    
+    Args:
+        batch_size (int): Сколько напоминаний забирать за один запрос
+        poll_seconds (int): Максимальный интервал между проверками таблицы
+    '''
+    while True:
         try:
-            await asyncio.sleep(delay=delay_seconds)
+            # Сбрасываем сигнал до выборки, чтобы не пропустить напоминание, запланированное во время нее
+            form_reminders_wakeup.clear()
+            if outbound_dispatcher.pending(SendPriority.BULK) < batch_size:
+                reminders = await _claim_due_reminders(batch_size)
+                if reminders:
+                    paused = await _still_paused([application_id for _, application_id in reminders])
+                    for user_id, application_id in reminders:
+                        if application_id in paused:
+                            outbound_dispatcher.send_message(
+                                chat_id=user_id,
+                                text=msg_templates.CANDIDATE_FORM_REMINDER,
+                                priority=SendPriority.BULK,
+                                parse_mode="Markdown"
+                            )
+                    logger.info(f'Queued {len(paused)} form reminders')
             
-            with Session() as db:
-                interaction = db.query(BotInteraction).filter_by(
-                    application_id=application_id
-                ).first()
-                
-                # Отправлять напоминание будем только для приостановивших прохождение кандидатов
-                if interaction and interaction.state == InteractionState.PAUSED:
-                    await bot.send_message(
-                        chat_id=user_id,
-                        text=msg_templates.CANDIDATE_FORM_REMINDER,
-                        parse_mode="Markdown"
-                    )
-                    logger.info(f'Sent form reminder to candidate {user_id} for application {application_id}')
+            if outbound_dispatcher.pending(SendPriority.BULK) >= batch_size:
+                # Отправка не успевает за таблицей, ждем очередь, а не таблицу
+                timeout = 1
+            else:
+                next_due_at = await _next_due_at()
+                timeout = poll_seconds if next_due_at is None else (next_due_at - _utcnow()).total_seconds()
+                timeout = min(max(timeout, 1), poll_seconds)
+            
+            try:
+                await asyncio.wait_for(form_reminders_wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
         except Exception as e:
-            logger.error(f'Error sending reminder: {str(e)}')
-        finally:
-            if user_id in active_reminders:
-                del active_reminders[user_id]
-    
-    # Создаем запись о напоминании                
-    reminder_task = asyncio.create_task(send_reminder())
-    active_reminders[user_id] = reminder_task
-    
-    logger.info(f'Scheduled form reminder for user {user_id} in {delay_seconds} seconds')
\ No newline at end of file
+            logger.error(f'Error in form_reminders_processing_task: {str(e)}', exc_info=True)
+            await asyncio.sleep(poll_seconds)
@@ -0,0 +1,44 @@
+"""feature: combined_score on hr_notifications with the list order index
+
+Revision ID: 4d2a9e6b1f38
+Revises: 7b4e2f9a0c51
+Create Date: 2025-05-28 10:12:44.318027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d2a9e6b1f38'
+down_revision: Union[str, None] = '7b4e2f9a0c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hr_notifications', sa.Column('combined_score', sa.Integer(), server_default='0', nullable=False))
+    # Заполняем оценку для уже созданных решений
+    op.execute(
+        """
+        UPDATE hr_notifications AS n
+        SET combined_score = coalesce(n.analysis_score, 0) + coalesce(
+            (SELECT r.gigachat_score FROM resumes AS r WHERE r.application_id = n.application_id), 0
+        )
+        """
+    )
+    op.create_index(
+        'ix_hr_notifications_status_combined_score',
+        'hr_notifications',
+        ['status', sa.text('combined_score DESC'), 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hr_notifications_status_combined_score', table_name='hr_notifications')
+    op.drop_column('hr_notifications', 'combined_score')
@@ -0,0 +1,53 @@
+"""feature: unique index on skills.skill_name
+
+Revision ID: a91d4f6c2e38
+Revises: 5b2e9c1d7a40
+Create Date: 2025-05-21 10:42:17.093518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d4f6c2e38'
+down_revision: Union[str, None] = '5b2e9c1d7a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Названия навыков хранятся без лишних пробелов (см. normalize_skill_name)
+    op.execute("""
+        UPDATE skills
+        SET skill_name = left(btrim(regexp_replace(skill_name, '\\s+', ' ', 'g')), 100)
+        WHERE skill_name IS NOT NULL
+    """)
+    # Дубли навыков схлопываем в запись с минимальным ID
+    op.execute("""
+        WITH duplicates AS (
+            SELECT id, min(id) OVER (PARTITION BY skill_name) AS keep_id
+            FROM skills
+            WHERE skill_name IS NOT NULL
+        )
+        UPDATE candidate_skills
+        SET skill_id = duplicates.keep_id
+        FROM duplicates
+        WHERE candidate_skills.skill_id = duplicates.id
+          AND duplicates.id <> duplicates.keep_id
+    """)
+    op.execute("""
+        DELETE FROM skills
+        USING skills AS kept
+        WHERE skills.skill_name = kept.skill_name
+          AND skills.id > kept.id
+    """)
+    op.create_index(op.f('ix_skills_skill_name'), 'skills', ['skill_name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_skills_skill_name'), table_name='skills')
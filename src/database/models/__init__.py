@@ -17,6 +17,8 @@ from .candidate_skill import CandidateSkill
 from .hr_specialist import HrSpecialist
 from .registration_token import RegistrationToken
 from .vacancy import Vacancy
+from .screening_job import ScreeningJob
+from .form_reminder import FormReminder
 # from .candidate_answer import CandidateAnswer
 
 
@@ -42,4 +44,6 @@ __all__ = [
     "HrSpecialist",
     "RegistrationToken",
     "Vacancy",
+    "ScreeningJob",
+    "FormReminder",
 ]
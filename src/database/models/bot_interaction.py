@@ -5,7 +5,8 @@ from sqlalchemy import (
     Enum,
     DateTime,
     JSON,
-    Boolean
+    Boolean,
+    Index
 )
 from sqlalchemy.orm import relationship
 from src.database.session import Base
@@ -38,6 +39,9 @@ class BotInteraction(Base):
         completed_at (datetime): Время завершения интерактива
     """
     __tablename__ = 'bot_interactions'
+    __table_args__ = (
+        Index('ix_bot_interactions_state_last_active', 'state', 'last_active'),
+    )
     
     id = Column(Integer, primary_key=True)
     candidate_id = Column(Integer, ForeignKey('candidates.id'))
@@ -0,0 +1,30 @@
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    BigInteger,
+    DateTime
+)
+from sqlalchemy.orm import relationship
+from src.database.session import Base
+
+
+class FormReminder(Base):
+    """
+    Модель запланированного напоминания о незаполненной анкете кандидата
+    
+    Fields:
+        user_id (int): Telegram ID получателя (у пользователя не больше одного напоминания)
+        application_id (int): FK на отклик, по которому приостановлено заполнение анкеты
+        due_at (datetime): Время, когда напоминание нужно отправить
+        created_at (datetime): Время планирования напоминания
+    """
+    __tablename__ = 'form_reminders'
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(BigInteger, nullable=False, unique=True)
+    application_id = Column(Integer, ForeignKey('applications.id'), nullable=False)
+    due_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
+    
+    application = relationship("Application")
@@ -3,7 +3,9 @@ from sqlalchemy import (
     ForeignKey,
     String,
     Integer, 
-    DateTime
+    DateTime,
+    Index,
+    text
 )
 from sqlalchemy.orm import relationship
 from src.database.session import Base
@@ -29,22 +31,28 @@ class HrNotification(Base):
         application_id (int): FK на отклик
         channel (str): Канал связи с HR-специалистом
         analysis_score (int): Оценка GigaChat по ответам с Telegram
+        combined_score (int): Сумма оценок GigaChat по ответам и по резюме (сортировка списка решений)
         final_decision (str): Решение по отклику от GigaChat (approve/reject)
         sent_at (datetime): Время отправления сообщения
         status (str): Статус отработки по кандидату HR'ом
     """
     __tablename__ = 'hr_notifications'
+    __table_args__ = (
+        # Порядок списка решений HR: статус, оценка по убыванию, id
+        Index('ix_hr_notifications_status_combined_score', 'status', text('combined_score DESC'), 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     candidate_id = Column(Integer, ForeignKey('candidates.id'))
     hr_specialist_id = Column(Integer, ForeignKey('hr_specialists.id'), nullable=True)
     vacancy_id = Column(Integer, ForeignKey('vacancies.id'))
-    application_id = Column(Integer, ForeignKey('applications.id'))
+    application_id = Column(Integer, ForeignKey('applications.id'), index=True)
     channel = Column(String(20), server_default='telegram')
     analysis_score = Column(Integer)
+    combined_score = Column(Integer, nullable=False, server_default='0')
     final_decision = Column(String(20))
     sent_at = Column(DateTime, default=datetime.now(timezone.utc))
-    status = Column(String(20), server_default='new')
+    status = Column(String(20), server_default='new', index=True)
     
     candidate = relationship("Candidate", back_populates="notifications")
     vacancy = relationship("Vacancy", back_populates="notifications")
@@ -0,0 +1,54 @@
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    Enum,
+    Text,
+    DateTime,
+    Index
+)
+from sqlalchemy.orm import relationship
+from src.database.session import Base
+from enum import Enum as PyEnum
+
+
+class ScreeningJobStatus(PyEnum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+class ScreeningJob(Base):
+    """
+    Модель задачи на скрининг ответов кандидата в GigaChat
+    
+    Fields:
+        candidate_id (int): FK на соискателя по вакансии
+        application_id (int): FK на отклик (на один отклик - одна задача)
+        vacancy_id (int): FK на вакансию
+        status (enum): Статус задачи
+        attempts (int): Количество взятых в работу попыток
+        run_after (datetime): Время, раньше которого задачу нельзя брать в работу
+        locked_at (datetime): Время взятия задачи в работу воркером
+        last_error (str): Текст последней ошибки обработки
+        created_at (datetime): Время постановки задачи в очередь
+        finished_at (datetime): Время завершения обработки задачи
+    """
+    __tablename__ = 'screening_jobs'
+    __table_args__ = (
+        Index('ix_screening_jobs_status_run_after', 'status', 'run_after'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey('candidates.id'))
+    application_id = Column(Integer, ForeignKey('applications.id'), nullable=False, unique=True)
+    vacancy_id = Column(Integer, ForeignKey('vacancies.id'))
+    status = Column(Enum(ScreeningJobStatus), nullable=False, default=ScreeningJobStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    
+    application = relationship("Application")
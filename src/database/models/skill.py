@@ -12,12 +12,12 @@ class Skill(Base):
     Модель навыка
     
     Fields:
-        skill_name (str): Название навыка
+        skill_name (str): Название навыка (уникальное, без лишних пробелов)
     """
     __tablename__ = 'skills'
     
     id = Column(Integer, primary_key=True)
-    skill_name = Column(String(100))
+    skill_name = Column(String(100), unique=True, index=True)
     
     candidate_skills = relationship("CandidateSkill", back_populates="skill")
     
\ No newline at end of file
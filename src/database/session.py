@@ -2,24 +2,41 @@ import os
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 
 load_dotenv()
 
 DB_DRIVER = os.environ.get('DB_DRIVER')
+# Драйвер для асинхронного движка, которым пользуются обработчики бота
+ASYNC_DB_DRIVER = os.environ.get('ASYNC_DB_DRIVER', 'postgresql+asyncpg')
 DB_USER = os.environ.get('DB_USER')
 DB_NAME = os.environ.get('DB_NAME')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
 DB_HOST = os.environ.get('DB_HOST')
 
+# Размер пула соединений каждого движка и допустимое превышение при пиковой нагрузке
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+
 DB_URL = f'{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}'
+ASYNC_DB_URL = f'{ASYNC_DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}'
 
 
 engine = create_engine(
     DB_URL,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    echo=False
+)
+
+# Асинхронный движок: запросы из обработчиков не блокируют event loop бота
+async_engine = create_async_engine(
+    ASYNC_DB_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
     echo=False
 )
 
@@ -30,4 +47,11 @@ Session = sessionmaker(
     bind=engine
 )
 
-from .models import *
\ No newline at end of file
+# Объекты остаются доступными после commit(): ленивой подгрузки в асинхронной сессии нет
+AsyncSession = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine
+)
+
+from .models import *
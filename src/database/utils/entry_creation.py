@@ -1,38 +1,87 @@
+import os
 import logging
 
-from typing import List, Optional, Any
-from datetime import datetime, timezone, date
+from typing import List, Optional, Any, Dict, Set, Tuple
+from datetime import datetime, timezone, date, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session as SqlAlchemySession
 
 from src.database.session import Session
 from src.database.models import (
     Candidate, Application, CandidateSkill, DesiredPosition,
     DesiredPositionEmployment, DesiredPositionSchedule, Education,
-    EmploymentType, Resume, Skill, WorkExperience, WorkSchedule
+    EmploymentType, Resume, WorkExperience, WorkSchedule
 )
 from src.database.models.application import ApplicationStatus
-from src.database.utils.generate_application_token import set_application_token
+from src.database.utils.skill_cache import skill_cache, normalize_skill_name
+from src.database.utils.generate_application_token import (
+    set_application_token, generate_application_token
+)
 
 from src.gigachat_module.parser import ResumeData
 
 
 logger = logging.getLogger(__name__)
+load_dotenv()
+
+# Количество резюме, сохраняемых в БД одной транзакцией
+INSERT_BATCH_SIZE = int(os.getenv("RESUME_INSERT_BATCH_SIZE", "50"))
+# Срок жизни токена идентификации кандидата, как в set_application_token
+APPLICATION_TOKEN_EXPIRY_DAYS = 31
 
 
-async def create_candidates_entries(resumes: List[Optional[ResumeData]]) -> Optional[List[int]]:
+async def create_candidates_entries(
+    resumes: List[Optional[ResumeData]],
+    batch_size: int = INSERT_BATCH_SIZE
+) -> Optional[List[int]]:
     '''Создать записи в базе данных для списка кандидатов, по данным с резюме'''
     try:
         ids = []
-        with Session() as db:
-            for resume_data in filter(None, resumes):
-                resume_id = await _process_single_resume(db, resume_data)
-                if resume_id:
-                    ids.append(resume_id)
-            return ids
+        resumes = list(filter(None, resumes))
+        batch_size = max(1, batch_size)
+        for start in range(0, len(resumes), batch_size):
+            resume_ids = await create_candidates_entries_batch(resumes[start:start + batch_size])
+            ids.extend(filter(None, resume_ids))
+        return ids
     except Exception as e:
         logger.error(f'Error in create_candidate_entry: {str(e)}')
 
 
+async def create_candidates_entries_batch(resumes: List[ResumeData]) -> List[Optional[int]]:
+    '''
+    Создать записи в базе данных для пачки резюме одной транзакцией
+    
+    Строки каждой таблицы пишутся одним многострочным INSERT ... RETURNING,
+    поэтому количество обращений к БД не зависит от размера пачки.
+    
+    Returns:
+        List[Optional[int]]: ID созданных резюме в порядке входных данных
+    (None - резюме уже есть в базе по этой вакансии или пачку не удалось сохранить)
+    '''
+    if not resumes:
+        return []
+    try:
+        with Session() as db:
+            resume_ids = _insert_resumes_batch(db, resumes)
+            db.commit()
+            return resume_ids
+    except Exception as e:
+        # Одно проблемное резюме не должно терять всю пачку - сохраняем резюме по одному
+        logger.error(f'Error in create_candidates_entries_batch, falling back to single inserts: {str(e)}')
+        return [await create_candidate_entry(resume_data) for resume_data in resumes]
+
+
+async def create_candidate_entry(resume_data: ResumeData) -> Optional[int]:
+    '''Создать записи в базе данных для одного кандидата, по данным с резюме'''
+    try:
+        with Session() as db:
+            return await _process_single_resume(db, resume_data)
+    except Exception as e:
+        logger.error(f'Error in create_candidate_entry for {resume_data.link}: {str(e)}')
+        return None
+
+
 async def _process_single_resume(db: SqlAlchemySession, resume_data: ResumeData) -> int:
     '''Процессинг единичного резюме с созданием всех необходимых моделей'''
     candidate = _create_candidate(db, resume_data)
@@ -188,8 +237,9 @@ def _handle_employment_data(
 
 async def _process_skills(db: SqlAlchemySession, skills: List[str], resume_id: int) -> None:
     '''Создание и наполнение CandidateSkills модели'''
+    skill_ids = skill_cache.resolve(skills)
     for skill in skills:
-        skill_id = await _create_or_match_skill(skill)
+        skill_id = skill_ids.get(normalize_skill_name(skill))
         if skill_id:
             db.add(CandidateSkill(
                 resume_id=resume_id,
@@ -214,26 +264,180 @@ def _process_experiences(db: SqlAlchemySession, experiences: List[Any], resume_i
     db.add_all(work_experiences)
 
 
-async def _create_or_match_skill(skill: Optional[str]) -> Optional[int]:
-    '''Найти существующий Skill в базе данных или создать новый вид'''
-    if not skill:
-        return None
+def _insert_returning_ids(db: SqlAlchemySession, model, rows: List[Dict[str, Any]]) -> List[int]:
+    '''Многострочный INSERT с возвратом ID в порядке переданных строк'''
+    if not rows:
+        return []
+    result = db.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows
+    )
+    return list(result.scalars())
+
+
+def _find_existing_resumes(db: SqlAlchemySession, resumes: List[ResumeData]) -> Set[Tuple[str, int]]:
+    '''Найти уже сохраненные пары (ссылка на резюме, ID вакансии) одним запросом'''
+    links = {resume_data.link for resume_data in resumes}
+    rows = db.execute(
+        select(Resume.resume_link, Application.vacancy_id)
+        .join(Application, Resume.application_id == Application.id)
+        .where(Resume.resume_link.in_(links))
+    ).all()
+    return {(link, vacancy_id) for link, vacancy_id in rows}
+
+
+def _generate_application_tokens(db: SqlAlchemySession, count: int) -> List[str]:
+    '''Сгенерировать уникальные токены идентификации, проверив их на совпадения одним запросом'''
+    tokens = [generate_application_token() for _ in range(count)]
+    while True:
+        taken = set(db.execute(
+            select(Application.auth_token).where(Application.auth_token.in_(tokens))
+        ).scalars())
+        duplicates = len(tokens) - len(set(tokens))
+        if not taken and not duplicates:
+            return tokens
+        unique_tokens = list(dict.fromkeys(token for token in tokens if token not in taken))
+        tokens = unique_tokens + [generate_application_token() for _ in range(count - len(unique_tokens))]
+
+
+def _insert_resumes_batch(db: SqlAlchemySession, resumes: List[ResumeData]) -> List[Optional[int]]:
+    '''Пакетный аналог _process_single_resume, без commit'''
+    now = datetime.now(timezone.utc)
     
-    try:
-        with Session() as db:
-            skill_entry = db.query(Skill).filter(Skill.skill_name == skill).first()
-            
-            if skill_entry:
-                return skill_entry.id
-            
-            new_skill = Skill(skill_name=skill)
-            db.add(new_skill)
-            db.flush()
-            return new_skill.id
-        
-    except Exception as e:
-        logger.error(f'Error in _create_or_match_skill: {e}')
-        return None
+    # Дубли отбрасываем до вставки, чтобы не создавать лишних кандидатов и откликов
+    seen = _find_existing_resumes(db, resumes)
+    new_positions = []
+    for position, resume_data in enumerate(resumes):
+        key = (resume_data.link, resume_data.vacancy_id)
+        if key not in seen:
+            seen.add(key)
+            new_positions.append(position)
+    batch = [resumes[position] for position in new_positions]
+    if not batch:
+        return [None] * len(resumes)
+    
+    candidate_ids = _insert_returning_ids(db, Candidate, [
+        {
+            'full_name': resume_data.name,
+            'birth_date': resume_data.birthdate,
+            'age': resume_data.age,
+            'city': resume_data.address,
+            'citizenship': resume_data.citizenship,
+            'relocation_ready': resume_data.ready_to_relocate,
+            'created_at': now,
+            'updated_at': now
+        }
+        for resume_data in batch
+    ])
+    
+    tokens = _generate_application_tokens(db, len(batch))
+    token_expiry = now + timedelta(days=APPLICATION_TOKEN_EXPIRY_DAYS)
+    application_ids = _insert_returning_ids(db, Application, [
+        {
+            'candidate_id': candidate_id,
+            'vacancy_id': resume_data.vacancy_id,
+            'status': ApplicationStatus.ACTIVE,
+            'application_date': now,
+            'auth_token': token,
+            'token_expiry': token_expiry
+        }
+        for resume_data, candidate_id, token in zip(batch, candidate_ids, tokens)
+    ])
+    # TODO: Переделать
+    for resume_data, token in zip(batch, tokens):
+        logger.warning(f'Готовый для отправки кандидату - {resume_data.name} токен: {token}')
+    
+    resume_ids = _insert_returning_ids(db, Resume, [
+        {
+            'candidate_id': candidate_id,
+            'application_id': application_id,
+            'resume_link': resume_data.link,
+            'created_at': now,
+            'updated_at': now
+        }
+        for resume_data, candidate_id, application_id in zip(batch, candidate_ids, application_ids)
+    ])
+    
+    with_position = [
+        (resume_data, resume_id) for resume_data, resume_id in zip(batch, resume_ids)
+        if resume_data.position and resume_data.salary
+    ]
+    desired_position_ids = _insert_returning_ids(db, DesiredPosition, [
+        {
+            'resume_id': resume_id,
+            'position': resume_data.position,
+            'salary': resume_data.salary
+        }
+        for resume_data, resume_id in with_position
+    ])
+    desired_position_by_resume = {
+        resume_id: desired_position_id
+        for (_, resume_id), desired_position_id in zip(with_position, desired_position_ids)
+    }
+    
+    with_employment = [
+        (resume_data, resume_id) for resume_data, resume_id in zip(batch, resume_ids)
+        if resume_data.employment
+    ]
+    employment_ids = _insert_returning_ids(db, EmploymentType, [
+        {'type': resume_data.employment.employment_type} for resume_data, _ in with_employment
+    ])
+    schedule_ids = _insert_returning_ids(db, WorkSchedule, [
+        {'schedule': resume_data.employment.work_schedule} for resume_data, _ in with_employment
+    ])
+    position_employments = []
+    position_schedules = []
+    for (_, resume_id), employment_id, schedule_id in zip(with_employment, employment_ids, schedule_ids):
+        desired_position_id = desired_position_by_resume.get(resume_id)
+        if desired_position_id:
+            position_employments.append({
+                'employment_type_id': employment_id,
+                'desired_position_id': desired_position_id
+            })
+            position_schedules.append({
+                'schedule_id': schedule_id,
+                'desired_position_id': desired_position_id
+            })
+    if position_employments:
+        db.execute(insert(DesiredPositionEmployment), position_employments)
+        db.execute(insert(DesiredPositionSchedule), position_schedules)
+    
+    # Навыки всей пачки разрешаются одним запросом (или целиком из кэша)
+    skill_ids = skill_cache.resolve(
+        skill for resume_data in batch for skill in (resume_data.skills or [])
+    )
+    candidate_skills = [
+        {
+            'resume_id': resume_id,
+            'skill_id': skill_ids[skill_name],
+            'proficiency': 'НАЧАЛЬНЫЙ'
+        }
+        for resume_data, resume_id in zip(batch, resume_ids)
+        for skill_name in map(normalize_skill_name, resume_data.skills or [])
+        if skill_name in skill_ids
+    ]
+    if candidate_skills:
+        db.execute(insert(CandidateSkill), candidate_skills)
+    
+    work_experiences = [
+        {
+            'resume_id': resume_id,
+            'company': exp.company,
+            'position': exp.position,
+            'description': exp.description,
+            'start_date': _parse_ym_date(exp.period[0]) if exp.period else None,
+            'end_date': _parse_ym_date(exp.period[1]) if exp.period else None
+        }
+        for resume_data, resume_id in zip(batch, resume_ids)
+        for exp in (resume_data.experiences or [])
+    ]
+    if work_experiences:
+        db.execute(insert(WorkExperience), work_experiences)
+    
+    result: List[Optional[int]] = [None] * len(resumes)
+    for position, resume_id in zip(new_positions, resume_ids):
+        result[position] = resume_id
+    return result
 
 
 def _parse_ym_date(ym_str: Optional[str]) -> Optional[date]:
@@ -2,9 +2,10 @@ import logging
 
 from typing import Optional
 from datetime import datetime, timezone
+from sqlalchemy import func
 
 from src.database.session import Session
-from src.database.models import Resume
+from src.database.models import HrNotification, Resume
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,13 @@ async def update_candidate_entry_resume_score(resume_id: int, score: int) -> Opt
             resume.gigachat_score = score
             resume.analysis_status = 'completed'
             resume.update_at = datetime.now(timezone.utc)
+            db.flush()
+            
+            # Пересчитываем общую оценку в уже созданных решениях по отклику
+            db.query(HrNotification).filter_by(application_id=resume.application_id).update(
+                {HrNotification.combined_score: func.coalesce(HrNotification.analysis_score, 0) + score},
+                synchronize_session=False
+            )
             
             db.commit()
 
@@ -0,0 +1,179 @@
+import os
+import asyncio
+import logging
+
+from typing import Dict, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from sqlalchemy import update, bindparam, or_
+
+from src.database.session import AsyncSession
+from src.database.models import BotInteraction
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+# Как часто (в секундах) накопленные изменения анкет записываются в БД.
+# Это же максимальное отставание last_active в БД от реальной активности кандидата
+INTERACTION_FLUSH_SECONDS = float(os.getenv("INTERACTION_FLUSH_SECONDS", "5"))
+
+_interactions = BotInteraction.__table__
+
+# Снимок применяется, только если он не старше записанного в БД: при нескольких процессах
+# (src/webhook.py) у каждого свой буфер, и более старый снимок из другого процесса, записанный
+# позже, не должен перезаписать более новые ответы или итог анкеты (например, отправку)
+_IS_NOT_NEWER_IN_DB = or_(
+    _interactions.c.last_active.is_(None),
+    _interactions.c.last_active <= bindparam('b_last_active')
+)
+
+# Обновления с ответами и обновления только отметки активности пишутся двумя executemany
+_UPDATE_ANSWERS = update(_interactions).where(
+    _interactions.c.application_id == bindparam('b_application_id'),
+    _IS_NOT_NEWER_IN_DB
+).values(
+    answers=bindparam('b_answers'),
+    current_question_id=bindparam('b_current_question_id'),
+    last_active=bindparam('b_last_active')
+)
+_UPDATE_LAST_ACTIVE = update(_interactions).where(
+    _interactions.c.application_id == bindparam('b_application_id'),
+    _IS_NOT_NEWER_IN_DB
+).values(
+    last_active=bindparam('b_last_active')
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class _PendingInteraction:
+    last_active: datetime
+    answers: Optional[dict] = None
+    current_question_id: Optional[int] = None
+
+    def merge(self, newer: '_PendingInteraction') -> None:
+        self.last_active = max(self.last_active, newer.last_active)
+        if newer.answers is not None:
+            self.answers = {**(self.answers or {}), **newer.answers}
+            self.current_question_id = newer.current_question_id
+
+
+class InteractionWriteBuffer:
+    """
+    Буфер отложенной записи ответов кандидатов и отметок активности (BotInteraction)
+
+    Обработчики анкеты не ходят в БД на каждый ответ: изменения копятся в памяти по
+    application_id (ответы объединяются, last_active берется последний) и раз в
+    INTERACTION_FLUSH_SECONDS записываются пачкой UPDATE. Обработчики, которые сами
+    меняют BotInteraction или читают из нее ответы, сначала вызывают flush(application_id),
+    чтобы их запись не разошлась с буфером.
+
+    flush(application_id) записывает только буфер своего процесса. При нескольких процессах
+    (src/webhook.py) последний ответ мог попасть в буфер другого процесса, поэтому отправка
+    и приостановка анкеты записывают ответы из состояния FSM (общего для всех процессов).
+
+    Methods:
+        touch(application_id):
+            Отметить активность кандидата
+        update_answers(application_id, answers, current_question_id):
+            Сохранить ответы и текущий вопрос
+        flush(application_id=None):
+            Записать в БД накопленные изменения (все или одной анкеты)
+        run():
+            Периодическая запись, запускается отдельной задачей
+    """
+    def __init__(self, flush_interval: float = INTERACTION_FLUSH_SECONDS):
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, _PendingInteraction] = {}
+        # Записи идут строго по очереди, иначе более старый снимок может перезаписать более новый
+        self._flush_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _add(self, application_id: int, change: _PendingInteraction) -> None:
+        pending = self._pending.get(application_id)
+        if pending is None:
+            self._pending[application_id] = change
+        else:
+            pending.merge(change)
+
+    def touch(self, application_id: int) -> None:
+        self._add(application_id, _PendingInteraction(last_active=_utcnow()))
+
+    def update_answers(self, application_id: int, answers: dict, current_question_id: Optional[int]) -> None:
+        self._add(application_id, _PendingInteraction(
+            last_active=_utcnow(),
+            answers=dict(answers),
+            current_question_id=current_question_id
+        ))
+
+    async def flush(self, application_id: Optional[int] = None) -> int:
+        """
+        Записать накопленные изменения в БД
+
+        Args:
+            application_id (Optional[int]): Записать только изменения этой анкеты
+
+        Returns:
+            int: Количество записанных анкет
+        """
+        async with self._flush_lock:
+            if application_id is None:
+                batch, self._pending = self._pending, {}
+            elif application_id in self._pending:
+                batch = {application_id: self._pending.pop(application_id)}
+            else:
+                return 0
+            if not batch:
+                return 0
+
+            with_answers = [
+                {
+                    'b_application_id': app_id,
+                    'b_answers': pending.answers,
+                    'b_current_question_id': pending.current_question_id,
+                    'b_last_active': pending.last_active
+                }
+                for app_id, pending in batch.items() if pending.answers is not None
+            ]
+            last_active_only = [
+                {'b_application_id': app_id, 'b_last_active': pending.last_active}
+                for app_id, pending in batch.items() if pending.answers is None
+            ]
+            try:
+                async with AsyncSession() as db:
+                    if with_answers:
+                        await db.execute(_UPDATE_ANSWERS, with_answers)
+                    if last_active_only:
+                        await db.execute(_UPDATE_LAST_ACTIVE, last_active_only)
+                    await db.commit()
+            except Exception:
+                # Возвращаем изменения в буфер, поверх них ложатся пришедшие за время записи
+                for app_id, pending in batch.items():
+                    newer = self._pending.get(app_id)
+                    if newer is not None:
+                        pending.merge(newer)
+                    self._pending[app_id] = pending
+                raise
+            return len(batch)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                flushed = await self.flush()
+                if flushed:
+                    logger.debug(f'Flushed {flushed} bot interactions')
+            except Exception as e:
+                logger.error(f'Error flushing bot interactions: {str(e)}')
+
+
+# Общий на процесс буфер записи анкет
+interaction_buffer = InteractionWriteBuffer()
@@ -0,0 +1,160 @@
+import os
+import asyncio
+import hashlib
+import logging
+
+from typing import Awaitable, Callable, Optional
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.database.session import ASYNC_DB_URL
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+# Как часто лидер проверяет соединение, на котором держит блокировку (в секундах)
+LEADER_HEARTBEAT_SECONDS = float(os.getenv("LEADER_HEARTBEAT_SECONDS", "10"))
+# Как часто остальные процессы пытаются стать лидером (в секундах)
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "15"))
+
+# Отдельный движок без пула: соединение лидера занято все время лидерства,
+# а при потере лидерства должно закрываться, а не возвращаться в пул
+_election_engine = create_async_engine(ASYNC_DB_URL, poolclass=NullPool)
+
+
+class LeadershipLost(Exception):
+    '''Процесс больше не лидер: задача должна остановиться, не выполняя следующую итерацию'''
+
+
+def advisory_lock_key(name: str) -> int:
+    '''Стабильный 64-битный ключ advisory lock по имени задачи (одинаковый во всех процессах и на всех машинах)'''
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+class LeaderElection:
+    """
+    Выбор лидера для задачи, которая должна работать в одном экземпляре на всю систему
+    
+    Лидер - процесс, которому удалось взять сессионный advisory lock PostgreSQL
+    (pg_try_advisory_lock) с ключом задачи. Блокировка живет, пока открыто соединение:
+    если процесс лидера упал или потерял связь с БД, PostgreSQL снимает ее сам, и задачу
+    подхватывает следующий процесс, пытающийся взять блокировку раз в retry_seconds.
+    Лидер раз в heartbeat_seconds проверяет соединение и, если оно оборвалось, останавливает задачу.
+    
+    Это не исключает одновременной работы задачи на двух процессах: PostgreSQL может снять
+    блокировку (и отдать ее другому процессу) сразу после очередной проверки, а старый лидер
+    узнает об этом только на следующей - в худшем случае через 2 * heartbeat_seconds. Поэтому
+    задача перед побочными эффектами каждой итерации вызывает ensure_leader() (сужает окно до
+    времени одной итерации), а сами итерации должны переживать повторное выполнение.
+    
+    Methods:
+        run(job):
+            Запускать job, пока этот процесс - лидер, и бороться за лидерство в остальное время
+        ensure_leader():
+            Проверить соединение с блокировкой прямо сейчас, LeadershipLost, если лидерство потеряно
+    """
+    def __init__(
+        self,
+        name: str,
+        heartbeat_seconds: float = LEADER_HEARTBEAT_SECONDS,
+        retry_seconds: float = LEADER_RETRY_SECONDS
+    ):
+        self.name = name
+        self.key = advisory_lock_key(name)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self._conn: Optional[AsyncConnection] = None
+        # Запросы проверки соединения лидера из heartbeat и ensure_leader не должны идти одновременно
+        self._conn_lock = asyncio.Lock()
+    
+    async def _try_acquire(self) -> Optional[AsyncConnection]:
+        '''Соединение с взятой блокировкой или None, если лидер уже есть'''
+        conn = await _election_engine.connect()
+        try:
+            # Без транзакции: соединение лидера не должно часами висеть в состоянии idle in transaction
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {'key': self.key})
+        except BaseException:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return None
+        return conn
+    
+    async def _check(self, conn: AsyncConnection) -> None:
+        # Пока сессия жива, сессионная блокировка остается у нее
+        async with self._conn_lock:
+            await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.heartbeat_seconds)
+    
+    async def _heartbeat(self, conn: AsyncConnection) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            await self._check(conn)
+    
+    async def ensure_leader(self) -> None:
+        '''Убедиться, что блокировка все еще у этого процесса, иначе LeadershipLost'''
+        if not self.is_leader or self._conn is None:
+            raise LeadershipLost(f'Not a leader for {self.name}')
+        try:
+            await self._check(self._conn)
+        except Exception as e:
+            raise LeadershipLost(f'Lost leadership for {self.name}: {str(e)}') from e
+    
+    async def _release(self, conn: AsyncConnection) -> None:
+        # Сессионная блокировка снимается вместе с закрытием соединения
+        try:
+            await conn.close()
+        except Exception as e:
+            logger.warning(f'Error closing leader connection for {self.name}: {str(e)}')
+    
+    async def run(self, job: Callable[['LeaderElection'], Awaitable[None]]) -> None:
+        '''
+        Args:
+            job (Callable[[LeaderElection], Awaitable[None]]): Фабрика корутины задачи, вызывается
+                при каждом получении лидерства; получает этот объект, чтобы вызывать ensure_leader()
+        '''
+        while True:
+            try:
+                conn = await self._try_acquire()
+            except Exception as e:
+                logger.error(f'Error acquiring leadership for {self.name}: {str(e)}')
+                conn = None
+            if conn is None:
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            
+            self.is_leader = True
+            self._conn = conn
+            logger.info(f'Became leader for {self.name}')
+            job_task = asyncio.create_task(job(self))
+            heartbeat = asyncio.create_task(self._heartbeat(conn))
+            try:
+                done, _ = await asyncio.wait({job_task, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+                if heartbeat in done:
+                    logger.error(f'Lost leadership for {self.name}: {str(heartbeat.exception())}')
+                elif job_task.exception() is not None:
+                    logger.error(f'Leader job {self.name} failed: {str(job_task.exception())}')
+                else:
+                    # Задача завершилась штатно, бороться за лидерство больше не нужно
+                    return
+            finally:
+                self.is_leader = False
+                self._conn = None
+                for task in (job_task, heartbeat):
+                    task.cancel()
+                await asyncio.gather(job_task, heartbeat, return_exceptions=True)
+                await self._release(conn)
+            
+            # Даем другим процессам шанс подхватить задачу
+            await asyncio.sleep(self.retry_seconds)
+
+
+def run_as_leader(name: str, job: Callable[[LeaderElection], Awaitable[None]]) -> Awaitable[None]:
+    '''Корутина, которая запускает job только в процессе-лидере для задачи name'''
+    return LeaderElection(name).run(job)
@@ -0,0 +1,123 @@
+import os
+import time
+import logging
+
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from src.database.session import AsyncSession
+from src.database.models import BotQuestion
+from src.database.models.bot_question import AnswerFormat
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+# Время жизни анкеты в кэше (в секундах). Правки вопросов в этом процессе сбрасывают кэш сразу,
+# TTL ограничивает устаревание, если вопросы поменяли в обход бота или в другом процессе
+QUESTIONNAIRE_CACHE_TTL_SECONDS = float(os.getenv("QUESTIONNAIRE_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass(frozen=True, slots=True)
+class QuestionRecord:
+    '''Неизменяемая копия BotQuestion, поля совпадают с моделью'''
+    id: int
+    vacancy_id: int
+    order: Optional[int]
+    question_text: Optional[str]
+    expected_format: AnswerFormat
+    choices: Optional[Tuple[str, ...]]
+    is_for_screening: Optional[bool]
+    screening_criteria: Optional[str]
+
+    @classmethod
+    def from_model(cls, question: BotQuestion) -> 'QuestionRecord':
+        return cls(
+            id=question.id,
+            vacancy_id=question.vacancy_id,
+            order=question.order,
+            question_text=question.question_text,
+            expected_format=question.expected_format,
+            choices=tuple(question.choices) if question.choices else None,
+            is_for_screening=question.is_for_screening,
+            screening_criteria=question.screening_criteria
+        )
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Questionnaire:
+    '''Анкета вакансии: вопросы в порядке BotQuestion.order и индекс по ID вопроса'''
+    vacancy_id: int
+    questions: Tuple[QuestionRecord, ...]
+    by_id: Mapping[int, QuestionRecord]
+    loaded_at: float
+
+    def get(self, question_id: int) -> Optional[QuestionRecord]:
+        return self.by_id.get(question_id)
+
+
+class QuestionnaireCache:
+    """
+    Кэш анкет вакансий для сценария кандидата
+
+    Анкета загружается одним запросом при первом обращении и дальше отдается из памяти,
+    поэтому ответ кандидата не требует обращения к БД за вопросом.
+    Обработчики, которые меняют вопросы вакансии, вызывают invalidate(vacancy_id).
+
+    Methods:
+        get(vacancy_id):
+            Получить анкету вакансии
+        invalidate(vacancy_id=None):
+            Сбросить анкету вакансии (или все анкеты)
+    """
+    def __init__(self, ttl: float = QUESTIONNAIRE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._questionnaires: Dict[int, Questionnaire] = {}
+        # Поколения кэша и анкет: загрузка, начатая до invalidate(), не попадет в кэш
+        self._epoch = 0
+        self._generations: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._questionnaires)
+
+    async def get(self, vacancy_id: int) -> Questionnaire:
+        questionnaire = self._questionnaires.get(vacancy_id)
+        if questionnaire is not None and time.monotonic() - questionnaire.loaded_at < self.ttl:
+            self.hits += 1
+            return questionnaire
+
+        self.misses += 1
+        generation = (self._epoch, self._generations.get(vacancy_id, 0))
+        async with AsyncSession() as db:
+            questions = (await db.scalars(select(BotQuestion).filter(
+                BotQuestion.vacancy_id == vacancy_id
+            ).order_by(BotQuestion.order))).all()
+
+        records = tuple(QuestionRecord.from_model(question) for question in questions)
+        questionnaire = Questionnaire(
+            vacancy_id=vacancy_id,
+            questions=records,
+            by_id=MappingProxyType({record.id: record for record in records}),
+            loaded_at=time.monotonic()
+        )
+        if (self._epoch, self._generations.get(vacancy_id, 0)) == generation:
+            self._questionnaires[vacancy_id] = questionnaire
+        return questionnaire
+
+    def invalidate(self, vacancy_id: Optional[int] = None) -> None:
+        if vacancy_id is None:
+            self._epoch += 1
+            self._questionnaires.clear()
+            return
+        self._generations[vacancy_id] = self._generations.get(vacancy_id, 0) + 1
+        self._questionnaires.pop(vacancy_id, None)
+
+
+# Общий на процесс кэш анкет
+questionnaire_cache = QuestionnaireCache()
@@ -0,0 +1,114 @@
+import logging
+
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select, text
+
+from src.database.session import Session
+from src.database.models import Skill
+
+
+logger = logging.getLogger(__name__)
+
+
+# Длина Skill.skill_name
+SKILL_NAME_MAX_LENGTH = 100
+
+# Один запрос на всю пачку: вставляем отсутствующие навыки и возвращаем ID и новых, и существующих.
+# Основной SELECT не видит строк, вставленных в CTE, поэтому пересечения в UNION ALL нет
+_RESOLVE_SKILLS_SQL = text("""
+    WITH input AS (
+        SELECT DISTINCT unnest(CAST(:skill_names AS text[])) AS skill_name
+    ),
+    inserted AS (
+        INSERT INTO skills (skill_name)
+        SELECT skill_name FROM input
+        ON CONFLICT (skill_name) DO NOTHING
+        RETURNING id, skill_name
+    )
+    SELECT id, skill_name FROM inserted
+    UNION ALL
+    SELECT skills.id, skills.skill_name
+    FROM skills JOIN input ON skills.skill_name = input.skill_name
+""")
+
+
+def normalize_skill_name(skill_name: Optional[str]) -> Optional[str]:
+    '''Привести название навыка к виду, в котором оно хранится в БД: без лишних пробелов и не длиннее колонки'''
+    if not skill_name:
+        return None
+    normalized = ' '.join(skill_name.split())[:SKILL_NAME_MAX_LENGTH]
+    return normalized or None
+
+
+class SkillCache:
+    """
+    Кэш справочника навыков: нормализованное название -> ID в таблице skills
+
+    Кэш прогревается при старте бота. Навыки, которых нет в кэше, разрешаются одним
+    запросом INSERT ... ON CONFLICT DO NOTHING RETURNING на всю пачку, в отдельной
+    короткой транзакции: справочник не зависит от того, сохранится ли резюме,
+    а в кэш попадают только закоммиченные ID.
+
+    Methods:
+        warm_up():
+            Загрузить весь справочник навыков в кэш
+        resolve(skill_names):
+            Получить ID навыков по названиям, создав недостающие
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def warm_up(self) -> None:
+        with Session() as db:
+            self._ids.update(
+                (skill_name, skill_id)
+                for skill_id, skill_name in db.execute(select(Skill.id, Skill.skill_name))
+                if skill_name
+            )
+        logger.info(f'Skill cache warmed up with {len(self._ids)} skills')
+
+    def resolve(self, skill_names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """
+        Получить ID навыков по названиям
+
+        Args:
+            skill_names (Iterable[Optional[str]]): Названия навыков (как есть, из резюме)
+
+        Returns:
+            Dict[str, int]: Нормализованное название -> ID навыка
+        """
+        names = {name for name in map(normalize_skill_name, skill_names) if name}
+        resolved = {name: self._ids[name] for name in names if name in self._ids}
+        missing = names - resolved.keys()
+        self.hits += len(resolved)
+        self.misses += len(missing)
+        if not missing:
+            return resolved
+
+        with Session() as db:
+            rows = db.execute(_RESOLVE_SKILLS_SQL, {'skill_names': sorted(missing)}).all()
+            found = {skill_name: skill_id for skill_id, skill_name in rows}
+            not_found = missing - found.keys()
+            if not_found:
+                # Навык вставила параллельная транзакция, закоммитившаяся после начала нашего запроса:
+                # ON CONFLICT его пропустил, а снимок запроса его еще не видел
+                found.update(
+                    (skill_name, skill_id)
+                    for skill_id, skill_name in db.execute(
+                        select(Skill.id, Skill.skill_name).where(Skill.skill_name.in_(not_found))
+                    )
+                )
+            db.commit()
+
+        self._ids.update(found)
+        resolved.update(found)
+        return resolved
+
+
+# Общий на процесс кэш справочника навыков
+skill_cache = SkillCache()
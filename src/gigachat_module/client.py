@@ -1,16 +1,78 @@
 import os
+import time
+import random
+import httpx
+import asyncio
+import logging
 
+from typing import Callable, Optional, List, AsyncIterator
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage, AIMessage
 from langchain_gigachat.chat_models import GigaChat
+from gigachat.exceptions import ResponseError
+
+from src.gigachat_module.utils.response_cache import LLMResponseCache, response_cache
+from src.gigachat_module.utils.rate_limiter import TokenBucket, AdaptiveConcurrencyLimiter
 
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 
 SCOPE = os.getenv("GIGACHAT_SCOPE", "GIGACHAT_API_PERS")
 AUTH_KEY = os.getenv("GIGACHAT_AUTH_KEY")
 MODEL = os.getenv("GIGACHAT_MODEL","")
 CERTIFICATE_BUNDLE_FILE = os.getenv("CA_BUNDLE_FILE","")
+# Адреса API и OAuth GigaChat (по умолчанию - адреса Сбера из библиотеки gigachat),
+# переопределяются, например, для локального фейкового сервера tests/fake_gigachat_server.py
+BASE_URL = os.getenv("GIGACHAT_BASE_URL")
+AUTH_URL = os.getenv("GIGACHAT_AUTH_URL")
+# Максимальное количество одновременных запросов к GigaChat в рамках одного процесса
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GIGACHAT_MAX_CONCURRENT_REQUESTS", "5"))
+# Размер пула клиентов GigaChat (по умолчанию - по одному клиенту на одновременный запрос)
+POOL_SIZE = int(os.getenv("GIGACHAT_POOL_SIZE", str(MAX_CONCURRENT_REQUESTS)))
+# За сколько секунд до истечения OAuth токена его нужно обновить
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("GIGACHAT_TOKEN_REFRESH_MARGIN_SECONDS", "120"))
+# Ограничение частоты запросов к GigaChat в рамках одного процесса
+REQUESTS_PER_SECOND = float(os.getenv("GIGACHAT_REQUESTS_PER_SECOND", "5"))
+# Нижняя граница адаптивного лимита одновременных запросов
+MIN_CONCURRENT_REQUESTS = int(os.getenv("GIGACHAT_MIN_CONCURRENT_REQUESTS", "1"))
+# Время ответа GigaChat (в секундах), при котором лимит одновременных запросов может расти
+LATENCY_TARGET_SECONDS = float(os.getenv("GIGACHAT_LATENCY_TARGET_SECONDS", "5"))
+# Повторные попытки при ответах 429/5xx
+MAX_RETRIES = int(os.getenv("GIGACHAT_MAX_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("GIGACHAT_RETRY_BACKOFF_SECONDS", "1"))
+
+
+# Таймауты и сетевые ошибки повторяются так же, как 429/5xx: клиент gigachat работает на httpx
+# и выбрасывает его исключения (TimeoutException - подкласс TransportError), а не asyncio.TimeoutError
+_RETRYABLE_NETWORK_ERRORS = (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)
+
+
+def _get_retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    '''
+    Определить паузу перед повторной попыткой запроса к GigaChat
+    
+    Returns:
+        Optional[float]: Пауза в секундах, или None - если ошибку повторять не нужно
+    '''
+    if isinstance(error, ResponseError) and len(error.args) > 1:
+        # ResponseError(url, status_code, content, headers)
+        status_code = error.args[1]
+        if status_code != 429 and not 500 <= status_code < 600:
+            return None
+        headers = error.args[3] if len(error.args) > 3 else None
+        retry_after = headers.get('retry-after') if headers else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    elif not isinstance(error, _RETRYABLE_NETWORK_ERRORS):
+        return None
+    # Экспоненциальная пауза со случайным разбросом, чтобы повторы не шли одной волной
+    return RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
 
 
 def get_gigachat_client() -> GigaChat:
@@ -24,12 +86,19 @@ def get_gigachat_client() -> GigaChat:
         if not AUTH_KEY:
             raise ValueError("GigaChat credentials not found in environmental variables.")
         
+        endpoints = {}
+        if BASE_URL:
+            endpoints['base_url'] = BASE_URL
+        if AUTH_URL:
+            endpoints['auth_url'] = AUTH_URL
+        
         giga =  GigaChat(
             credentials=AUTH_KEY,
             model=MODEL,
             scope=SCOPE,
             verify_ssl_certs=False,
             # ca_bundle_file="russian_trusted_root_ca.cer",
+            **endpoints
         )
         
         return giga
@@ -37,4 +106,221 @@ def get_gigachat_client() -> GigaChat:
     except Exception as e:
         print(f'Error initializing GigaChat client: {e}')
         raise
-    
\ No newline at end of file
+
+
+def is_integer_content(content) -> bool:
+    '''Ответ GigaChat - целое число (оценка по одному критерию)'''
+    try:
+        int(content)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+# Приватные атрибуты клиента gigachat, через которые пул выдает клиентам общий токен.
+# Публичного API для этого нет, поэтому версия gigachat закреплена в requirements.txt
+_TOKEN_API_ATTRIBUTES = ('_reset_token', 'aget_token', '_access_token')
+
+
+def _token_api_client(giga: GigaChat):
+    '''
+    Клиент библиотеки gigachat внутри GigaChat из langchain_gigachat, которому пул выдает общий токен
+
+    Все обращения к приватному API gigachat идут через эту функцию: если после обновления
+    библиотеки атрибуты переименуют, ошибка будет одна и понятная, а не AttributeError в запросах
+    '''
+    api_client = getattr(giga, '_client', None)
+    if api_client is None:
+        missing = ['_client']
+    else:
+        missing = [name for name in _TOKEN_API_ATTRIBUTES if not hasattr(api_client, name)]
+    if missing:
+        raise RuntimeError(
+            f'Installed gigachat version does not provide {", ".join(missing)} (tested with gigachat==0.1.43)'
+        )
+    return api_client
+
+
+class GigaChatClientPool:
+    """
+    Общий на процесс пул долгоживущих GigaChat клиентов
+
+    Клиенты создаются один раз и переиспользуются между запросами, вместе с их
+    HTTP соединениями. OAuth токен общий для всех клиентов пула и обновляется
+    заранее, за refresh_margin секунд до истечения, а не после ошибки авторизации.
+    Размер пула ограничивает количество одновременных запросов к GigaChat.
+    Ответы на уже встречавшиеся промпты берутся из кэша, без обращения к GigaChat.
+    Запросы проходят через ограничитель частоты (requests_per_second) и адаптивный
+    лимит одновременных запросов: при ответах 429/5xx лимит снижается и запрос
+    повторяется с паузой, при нормальном времени ответа лимит снова растет до size.
+
+    Args:
+        size (int): Количество клиентов в пуле
+        refresh_margin (int): Запас времени (в секундах) до истечения токена, при котором он обновляется
+        cache (LLMResponseCache): Кэш ответов GigaChat (default: общий на процесс кэш, None - без кэша)
+        requests_per_second (float): Максимальная частота запросов к GigaChat
+        max_retries (int): Количество повторных попыток при ответах 429/5xx
+
+    Methods:
+        client():
+            Асинхронный контекстный менеджер, выдающий свободный клиент из пула
+        ainvoke(messages):
+            Отправить сообщения в GigaChat через свободный клиент пула
+        warm_up():
+            Заранее получить OAuth токен, чтобы не тратить на это время первого запроса
+        set_limits(requests_per_second, max_concurrent):
+            Изменить ограничения частоты и одновременных запросов
+    """
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        refresh_margin: int = TOKEN_REFRESH_MARGIN_SECONDS,
+        cache: Optional[LLMResponseCache] = response_cache,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        max_retries: int = MAX_RETRIES
+    ):
+        self.size = max(1, size)
+        self.refresh_margin = refresh_margin
+        self.cache = cache
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(rate=requests_per_second)
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            min_limit=MIN_CONCURRENT_REQUESTS,
+            max_limit=self.size,
+            latency_target=LATENCY_TARGET_SECONDS
+        )
+        self._clients: Optional[asyncio.Queue] = None
+        self._token = None
+        self._token_lock = asyncio.Lock()
+        # Выключается, если установленная версия gigachat не поддерживает выдачу токена клиенту
+        self._shared_token = True
+
+    def _ensure_clients(self) -> asyncio.Queue:
+        # Клиенты создаются лениво, при первом обращении к пулу
+        if self._clients is None:
+            clients = asyncio.Queue()
+            for _ in range(self.size):
+                clients.put_nowait(get_gigachat_client())
+            self._clients = clients
+        return self._clients
+
+    def _is_token_fresh(self) -> bool:
+        if self._token is None:
+            return False
+        # expires_at хранится в миллисекундах
+        return self._token.expires_at / 1000 - time.time() > self.refresh_margin
+
+    async def _ensure_fresh_token(self, giga: GigaChat) -> None:
+        '''Обновить общий токен пула, если он скоро истечет, и выдать его клиенту'''
+        if not self._shared_token:
+            return
+        try:
+            api_client = _token_api_client(giga)
+        except RuntimeError as e:
+            # Без общего токена каждый клиент пула получает свой токен сам, как без пула
+            logger.error(f'{str(e)}, sharing OAuth token between pool clients is disabled')
+            self._shared_token = False
+            return
+        try:
+            if not self._is_token_fresh():
+                async with self._token_lock:
+                    # Токен мог обновить другой запрос, пока мы ждали блокировку
+                    if not self._is_token_fresh():
+                        api_client._reset_token()
+                        self._token = await api_client.aget_token()
+            if api_client._access_token is not self._token:
+                api_client._access_token = self._token
+        except Exception as e:
+            # Клиент GigaChat сам получит токен при запросе, если не получилось сделать это заранее
+            logger.warning(f'Failed to refresh GigaChat token ahead of time: {str(e)}')
+
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[GigaChat]:
+        """
+        Взять свободный клиент из пула на время запроса
+
+        Example:
+            async with gigachat_pool.client() as giga:
+                response = await giga.ainvoke(messages)
+        """
+        clients = self._ensure_clients()
+        giga = await clients.get()
+        try:
+            await self._ensure_fresh_token(giga)
+            yield giga
+        finally:
+            clients.put_nowait(giga)
+
+    async def ainvoke(
+        self,
+        messages: List[BaseMessage],
+        use_cache: bool = True,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> BaseMessage:
+        """
+        Отправить сообщения в GigaChat через свободный клиент пула
+
+        Args:
+            messages (List[BaseMessage]): Сообщения для модели
+            use_cache (bool): Использовать ли кэш ответов (default=True)
+            validate (Callable[[str], bool]): Проверка ответа перед записью в кэш: ответ, который
+                вызывающий код не сможет разобрать, не кэшируется, чтобы не возвращать его повторно
+
+        Returns:
+            BaseMessage: Ответ GigaChat
+        """
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key = self.cache.make_key(MODEL, messages)
+            cached_content = await self.cache.aget(cache_key)
+            if cached_content is not None:
+                return AIMessage(content=cached_content)
+
+        response = await self._ainvoke_with_retries(messages)
+
+        if cache_key is not None and response.content and (validate is None or validate(response.content)):
+            await self.cache.aset(cache_key, response.content)
+        return response
+
+    async def _ainvoke_with_retries(self, messages: List[BaseMessage]) -> BaseMessage:
+        attempt = 0
+        while True:
+            async with self.concurrency_limiter.slot():
+                await self.rate_limiter.acquire()
+                started_at = time.monotonic()
+                try:
+                    async with self.client() as giga:
+                        response = await giga.ainvoke(messages)
+                    self.concurrency_limiter.record(time.monotonic() - started_at)
+                    return response
+                except Exception as e:
+                    delay = _get_retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    # GigaChat перегружен - снижаем лимит и притормаживаем все запросы процесса
+                    self.concurrency_limiter.record(time.monotonic() - started_at, overloaded=True)
+                    self.concurrency_limiter.pause(delay)
+                    if attempt >= self.max_retries:
+                        raise
+                    logger.warning(
+                        f'GigaChat is overloaded ({str(e)}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s'
+                    )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def set_limits(self, requests_per_second: float, max_concurrent: int) -> None:
+        '''Изменить ограничения пула (например, поделить лимиты GigaChat между несколькими процессами)'''
+        self.rate_limiter.rate = max(requests_per_second, 0.001)
+        self.rate_limiter.capacity = max(requests_per_second, 1)
+        limiter = self.concurrency_limiter
+        limiter.max_limit = max(limiter.min_limit, max_concurrent)
+        limiter.limit = min(limiter.limit, limiter.max_limit)
+
+    async def warm_up(self) -> None:
+        '''Получить OAuth токен заранее, до первого запроса к GigaChat'''
+        async with self.client():
+            pass
+
+
+# Общий на процесс пул клиентов GigaChat
+gigachat_pool = GigaChatClientPool()
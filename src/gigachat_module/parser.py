@@ -3,13 +3,18 @@ import re
 import logging
 import asyncio
 import aiohttp
+import multiprocessing
 
 from datetime import date
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional, List, Union, Tuple
 
+from src.gigachat_module.utils.html_cache import ResumeHtmlCache, html_cache
+from src.gigachat_module.utils.fetcher import ResumeFetcher
+
 
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -33,6 +38,12 @@ COOKIES = {
     "hhtoken": os.getenv("HH_TOKEN")
 }
 
+# Количество процессов для разбора HTML страниц резюме (0 - разбирать в текущем процессе)
+PARSE_PROCESSES = int(os.getenv("RESUME_PARSE_PROCESSES", str(min(4, os.cpu_count() or 1))))
+_parse_executor: Optional[ProcessPoolExecutor] = None
+# Движок разбора HTML страниц резюме: bs4 (BeautifulSoup) или lxml (быстрый разбор с тем же результатом)
+PARSER_ENGINE = os.getenv("RESUME_PARSER_ENGINE", "bs4").lower()
+
 
 @dataclass
 class EmploymentInfo:
@@ -103,19 +114,51 @@ class ResumeData:
 
 async def _fetch_html(
     url: str,
-    session: aiohttp.ClientSession
-) -> Optional[str]:
+    fetcher: ResumeFetcher,
+    cache: Optional[ResumeHtmlCache] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    '''
+    Скачать HTML страницы резюме
+    
+    При наличии кэша отправляется условный запрос (If-None-Match / If-Modified-Since),
+    и на ответ 304 страница берется из кэша без повторной загрузки.
+    
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (HTML страницы, хэш содержимого - если кэш включен)
+    '''
+    entry = await cache.alookup(url) if cache else None
+    headers = dict(HEADERS)
+    if entry:
+        headers.update(cache.conditional_headers(entry))
+    
     try:
-        async with session.get(
+        response = await fetcher.fetch(
             url=url, 
-            headers=HEADERS,
+            headers=headers,
             cookies=COOKIES
-        ) as response:
-            response.raise_for_status()
-            return await response.text()
+        )
+        if response.status == 304 and entry:
+            html = await cache.aload_html(entry.content_hash)
+            if html is not None:
+                return html, entry.content_hash
+            # Страница пропала из кэша - скачиваем ее заново, без условных заголовков
+            return await _fetch_html(url, fetcher)
+        
+        if response.status >= 400:
+            logger.error(f'Error fetching resume from {url}. Status: {response.status}')
+            return None, None
+        if not cache:
+            return response.text, None
+        content_hash = await cache.astore(
+            url,
+            response.text,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return response.text, content_hash
     except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f'Error fetching resume from {url}. Message: {e}')
-        return None
+        return None, None
 
 
 def _parse_russian_date(date_str: str) -> Optional[date]:
@@ -337,69 +380,133 @@ def _extract_employment_info(soup: BeautifulSoup) -> Optional[EmploymentInfo]:
         return None
     
 
+def _parse_html(html: str, url: str, vacancy_id: int) -> ResumeData:
+    '''
+    Разобрать HTML страницы резюме выбранным в RESUME_PARSER_ENGINE движком
+    
+    Синхронная функция верхнего уровня, чтобы ее можно было выполнять в пуле процессов:
+    принимает сырой HTML и возвращает picklable ResumeData
+    '''
+    if PARSER_ENGINE == 'lxml':
+        from src.gigachat_module.parser_lxml import parse_html_lxml
+        return parse_html_lxml(html, url, vacancy_id)
+    return _parse_html_bs4(html, url, vacancy_id)
+
+
+def _parse_html_bs4(html: str, url: str, vacancy_id: int) -> ResumeData:
+    soup = BeautifulSoup(html, "html.parser")
+
+    link = url
+    birthday_tag = soup.find('span', {'data-qa': 'resume-personal-birthday'})
+    birthdate = _parse_russian_date(birthday_tag.text) if birthday_tag else None
+    name = _extract_text(soup, "h2[data-qa='resume-personal-name']", "ФИО не указано")
+    address = _extract_text(soup, "span[data-qa='resume-personal-address']", "Адрес не указан")
+    citizenship = _extract_citizenship(soup)
+    ready_to_relocate = _extract_relocation_info(soup)
+    job_search_status_text = _extract_text(soup, "span[data-qa='job-search-status']", "Статус не указан")
+    job_search_status = job_search_status_text.replace('\xa0', ' ') if job_search_status_text else None
+    age = _extract_age(soup)
+    position = _extract_text(soup, "span[data-qa='resume-block-title-position']", "Должность не указана")
+    salary = _extract_salary(soup)
+    experiences = _extract_experiences(soup)
+    skills = _extract_skills(soup)
+    employment = _extract_employment_info(soup)
+    
+    return ResumeData(
+        link=link,
+        vacancy_id=vacancy_id,
+        name=name,
+        age=age,
+        birthdate=birthdate,
+        address=address,
+        citizenship=citizenship,
+        ready_to_relocate=ready_to_relocate,
+        job_search_status=job_search_status,
+        position=position,
+        salary=salary,
+        experiences=experiences,
+        skills=skills,
+        employment=employment
+    )
+
+
+def _get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    '''Пул процессов для разбора страниц, создается при первом обращении (None - разбор в текущем процессе)'''
+    global _parse_executor
+    if _parse_executor is None and PARSE_PROCESSES > 0:
+        # spawn: дочерние процессы не наследуют потоки и event loop бота
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=PARSE_PROCESSES,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _parse_executor
+
+
+async def _run_parse_html(html: str, url: str, vacancy_id: int) -> ResumeData:
+    executor = _get_parse_executor()
+    if executor is None:
+        return _parse_html(html, url, vacancy_id)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_html, html, url, vacancy_id)
+
+
+def shutdown_parse_executor() -> None:
+    '''Остановить пул процессов разбора страниц'''
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
+
+
 async def parse_resume(
     url: str,
     vacancy_id: int,
-    session: Optional[aiohttp.ClientSession] = None
+    fetcher: Optional[ResumeFetcher] = None,
+    cache: Optional[ResumeHtmlCache] = html_cache
 ) -> Optional[ResumeData]:
-    close_session = False
-    if session is None:
-        session = aiohttp.ClientSession()
-        close_session = True
+    close_fetcher = False
+    if fetcher is None:
+        fetcher = ResumeFetcher()
+        await fetcher.open()
+        close_fetcher = True
         
     try:
-        html = await _fetch_html(url, session)
+        html, content_hash = await _fetch_html(url, fetcher, cache)
         if not html:
             logger.error(f'Error: Content was None after HTML fetch from {url}')
             return None
-        soup = BeautifulSoup(html, "html.parser")
-
-        link = url
-        birthday_tag = soup.find('span', {'data-qa': 'resume-personal-birthday'})
-        birthdate = _parse_russian_date(birthday_tag.text) if birthday_tag else None
-        name = _extract_text(soup, "h2[data-qa='resume-personal-name']", "ФИО не указано")
-        address = _extract_text(soup, "span[data-qa='resume-personal-address']", "Адрес не указан")
-        citizenship = _extract_citizenship(soup)
-        ready_to_relocate = _extract_relocation_info(soup)
-        job_search_status_text = _extract_text(soup, "span[data-qa='job-search-status']", "Статус не указан")
-        job_search_status = job_search_status_text.replace('\xa0', ' ') if job_search_status_text else None
-        age = _extract_age(soup)
-        position = _extract_text(soup, "span[data-qa='resume-block-title-position']", "Должность не указана")
-        salary = _extract_salary(soup)
-        experiences = _extract_experiences(soup)
-        skills = _extract_skills(soup)
-        employment = _extract_employment_info(soup)
         
-        return ResumeData(
-            link=link,
-            vacancy_id=vacancy_id,
-            name=name,
-            age=age,
-            birthdate=birthdate,
-            address=address,
-            citizenship=citizenship,
-            ready_to_relocate=ready_to_relocate,
-            job_search_status=job_search_status,
-            position=position,
-            salary=salary,
-            experiences=experiences,
-            skills=skills,
-            employment=employment
-        )
+        if content_hash:
+            # Страница не изменилась (304 или тот же хэш содержимого) - разбирать ее повторно не нужно
+            cached_resume_data = await cache.aload_parsed(content_hash)
+            if cached_resume_data is not None:
+                return replace(cached_resume_data, link=url, vacancy_id=vacancy_id)
+        
+        # Разбор страницы нагружает CPU, поэтому выполняется вне event loop
+        resume_data = await _run_parse_html(html, url, vacancy_id)
+        if content_hash:
+            await cache.astore_parsed(content_hash, resume_data)
+        return resume_data
         
     except Exception as e:
         logger.error(f'Error in get_resume: {str(e)}')
         return None
 
     finally:
-        if close_session and not session.closed:
-            await session.close()
+        if close_fetcher:
+            await fetcher.close()
             
             
 async def parse_multiple_resumes(resumes_data: List[Tuple[str, int]]) -> List[Optional[ResumeData]]:
-    async with aiohttp.ClientSession() as session:
+    '''
+    Разобрать пачку резюме
+    
+    Количество одновременных запросов к HH ограничено настройками ResumeFetcher,
+    результаты возвращаются в порядке входных данных
+    '''
+    async with ResumeFetcher() as fetcher:
         tasks = [
-            parse_resume(url, vacancy_id, session) 
+            parse_resume(url, vacancy_id, fetcher) 
             for url, vacancy_id in resumes_data
         ]
         return await asyncio.gather(*tasks, return_exceptions=True)
\ No newline at end of file
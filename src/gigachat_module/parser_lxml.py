@@ -0,0 +1,308 @@
+import re
+import logging
+import lxml.html
+
+from lxml import etree
+from lxml.html.defs import empty_tags
+from collections import Counter, defaultdict
+from typing import Optional, List, Dict
+
+from src.gigachat_module.parser import (
+    ResumeData, WorkExperienceInfo, EmploymentInfo,
+    _parse_russian_date, _parse_date_entry, _parse_html_bs4
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+'''
+    Быстрый разбор страницы резюме HH на lxml
+
+    Результат совпадает с разбором на BeautifulSoup (parser._parse_html_bs4), в том числе
+    в пограничных случаях: найденный тег BeautifulSoup всегда истинен, даже пустой, поэтому
+    здесь элемент считается найденным по проверке is not None, а сравнение class повторяет
+    правила BeautifulSoup (совпадение одного из классов или всей строки class целиком).
+
+    Вместо отдельного обхода дерева под каждое поле делается один проход, который
+    индексирует элементы по data-qa и нужным классам, и все поля берутся из индекса.
+
+    Отличия lxml от BeautifulSoup с html.parser, которые учитываются:
+        - get_text() у BeautifulSoup не включает строки внутри script, style и template,
+          поэтому перед индексацией текст внутри этих тегов удаляется из дерева;
+        - html.parser не исправляет вложенность тегов, а libxml2 закрывает, например, <p>
+          перед вложенным <div> или <ul>, и текст абзаца становится другим. Если дерево lxml
+          могло разойтись с деревом html.parser (libxml2 сообщил о несовпадающем закрывающем
+          теге или количество элементов не совпадает с количеством закрывающих тегов в
+          исходнике), страница разбирается на BeautifulSoup.
+'''
+
+
+# Предкомпилированные выражения для поиска внутри блока опыта работы
+_FIND_COMPANY = etree.XPath(
+    "descendant::div[normalize-space(@class)='bloko-text bloko-text_strong'][1]"
+)
+_FIND_PERIOD = etree.XPath(
+    "descendant::div[normalize-space(@class)="
+    "'bloko-column bloko-column_xs-4 bloko-column_s-2 bloko-column_m-2 bloko-column_l-2'][1]"
+)
+_FIND_POSITION = etree.XPath(
+    "descendant::div[@data-qa='resume-block-experience-position'][1]"
+)
+_FIND_DESCRIPTION = etree.XPath(
+    "descendant::div[@data-qa='resume-block-experience-description'][1]"
+)
+_FIND_EXPERIENCE_BLOCKS = etree.XPath(
+    "descendant::div[contains(concat(' ', normalize-space(@class), ' '), ' resume-block-item-gap ')]"
+)
+
+# Классы div, которые нужны разбору страницы
+_INDEXED_DIV_CLASSES = ('bloko-translate-guard', 'resume-block-container')
+
+# Теги, строки внутри которых BeautifulSoup не включает в текст элемента
+_HIDDEN_TEXT_TAGS = ('script', 'style', 'template')
+# Теги без закрывающего тега и теги, которые libxml2 добавляет в документ сам
+_UNCLOSED_TAGS = frozenset(empty_tags) | {'html', 'head', 'body'}
+# Содержимое script и style: html.parser не ищет в нем теги
+_RAW_TEXT_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+_END_TAG_RE = re.compile(r'</([a-zA-Z][^\s/>]*)\s*>')
+_SELF_CLOSING_TAG_RE = re.compile(r'<([a-zA-Z][^\s/>]*)(?:\s[^<>]*)?/>')
+
+
+class _PageIndex:
+    '''Индекс элементов страницы, собранный за один проход по дереву'''
+    __slots__ = ('data_qa', 'div_classes', 'paragraphs', 'closed_tags')
+
+    def __init__(self, root: lxml.html.HtmlElement):
+        self.data_qa: Dict[str, List[lxml.html.HtmlElement]] = defaultdict(list)
+        self.div_classes: Dict[str, List[lxml.html.HtmlElement]] = defaultdict(list)
+        self.paragraphs: List[lxml.html.HtmlElement] = []
+        # Сколько элементов каждого тега должно быть закрыто в исходнике
+        self.closed_tags: Counter = Counter()
+
+        for element in root.iter(tag=etree.Element):
+            tag = element.tag
+            if tag not in _UNCLOSED_TAGS:
+                self.closed_tags[tag] += 1
+            data_qa = element.get('data-qa')
+            if data_qa is not None:
+                self.data_qa[data_qa].append(element)
+            if tag == 'p':
+                self.paragraphs.append(element)
+            elif tag == 'div':
+                class_value = element.get('class')
+                if class_value:
+                    classes = class_value.split()
+                    for class_name in _INDEXED_DIV_CLASSES:
+                        if class_name in classes:
+                            self.div_classes[class_name].append(element)
+
+    def find(self, tag: str, data_qa: str) -> Optional[lxml.html.HtmlElement]:
+        for element in self.data_qa.get(data_qa, ()):
+            if element.tag == tag:
+                return element
+        return None
+
+
+def _drop_hidden_text(root: lxml.html.HtmlElement) -> None:
+    '''Удалить строки внутри script, style и template (текст после закрывающего тега остается)'''
+    for element in root.iter(*_HIDDEN_TEXT_TAGS):
+        element.text = None
+        for descendant in element.iterdescendants():
+            descendant.text = None
+            descendant.tail = None
+
+
+def _matches_html_parser_tree(html: str, parser: lxml.html.HTMLParser, index: _PageIndex) -> bool:
+    '''
+    Совпадает ли дерево lxml с деревом, которое построил бы html.parser
+
+    html.parser закрывает элемент только закрывающим тегом (или "/>"), поэтому в совпадающих
+    деревьях каждый элемент закрыт в исходнике явно. Элемент, который libxml2 закрыл сам,
+    или тег, который он не разобрал как тег (например, внутри textarea), нарушают равенство.
+    '''
+    if any(error.type_name == 'ERR_TAG_NAME_MISMATCH' for error in parser.error_log):
+        return False
+    source = _RAW_TEXT_RE.sub('', html)
+    closed_in_source = Counter(
+        tag.lower() for tag in _END_TAG_RE.findall(source) + _SELF_CLOSING_TAG_RE.findall(source)
+    )
+    # Закрывающие теги script и style удалены из исходника вместе с содержимым
+    skipped = _UNCLOSED_TAGS | {'script', 'style'}
+    for counter in (closed_in_source, index.closed_tags):
+        for tag in skipped.intersection(counter):
+            del counter[tag]
+    return closed_in_source == index.closed_tags
+
+
+def _text(element: lxml.html.HtmlElement) -> str:
+    '''Аналог Tag.text'''
+    return str(element.text_content())
+
+
+def _stripped_text(element: lxml.html.HtmlElement) -> str:
+    '''Аналог Tag.get_text(strip=True)'''
+    return ''.join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _extract_text(index: _PageIndex, tag: str, data_qa: str, default: str = "Не указано") -> str:
+    element = index.find(tag, data_qa)
+    return _text(element).strip() if element is not None else default
+
+
+def _extract_citizenship(index: _PageIndex) -> Optional[str]:
+    for p in index.paragraphs:
+        text = _stripped_text(p)
+        if text.startswith("Гражданство"):
+            return text.replace("Гражданство:", "").strip()
+    return None
+
+
+def _extract_relocation_info(index: _PageIndex) -> Optional[bool]:
+    guards = index.div_classes.get('bloko-translate-guard')
+    if not guards:
+        logger.error('Error in _extract_relocation_info: relocation block not found')
+        return None
+    relocation_info_p = next(guards[0].iterdescendants('p'), None)
+    if relocation_info_p is not None:
+        relocation_text = _stripped_text(relocation_info_p).lower()
+        if "не готов к переезду" in relocation_text or "не готова к переезду" in relocation_text:
+            return False
+        return True
+    return None
+
+
+def _extract_age(index: _PageIndex) -> Optional[int]:
+    element = index.find('span', 'resume-personal-age')
+    if element is None:
+        logger.error('Error in _extract_age: age element not found')
+        return None
+    age_text = _text(element).strip()
+    if age_text:
+        match = re.search(r'(\d+)', age_text)
+        return int(match.group(1)) if match else None
+    return None
+
+
+def _extract_salary(index: _PageIndex) -> Optional[int]:
+    salary_element = index.find('span', 'resume-block-salary')
+    if salary_element is not None:
+        digits = re.sub(r"[^\d]", "", _text(salary_element).strip())
+        return int(digits) if digits else None
+    return None
+
+
+def _clean(element: Optional[lxml.html.HtmlElement]) -> str:
+    if element is None:
+        return ""
+    return _text(element).strip().replace('\xa0', ' ').replace('\n', ' ')
+
+
+def _extract_experiences(index: _PageIndex) -> List[WorkExperienceInfo]:
+    experiences = []
+    experience_section = index.find('div', 'resume-block-experience')
+    if experience_section is None:
+        return experiences
+
+    for block in _FIND_EXPERIENCE_BLOCKS(experience_section):
+        period = next(iter(_FIND_PERIOD(block)), None)
+        experience = WorkExperienceInfo(
+            company=_clean(next(iter(_FIND_COMPANY(block)), None)),
+            position=_clean(next(iter(_FIND_POSITION(block)), None)),
+            period=_parse_date_entry(_text(period).strip().replace('\xa0', ' ')) if period is not None else "",
+            description=_clean(next(iter(_FIND_DESCRIPTION(block)), None))
+        )
+        # Проверка на дубли
+        if experience not in experiences:
+            experiences.append(experience)
+
+    return experiences
+
+
+def _extract_skills(index: _PageIndex) -> List[str]:
+    skills_section = index.find('div', 'skills-table')
+    if skills_section is None:
+        return []
+
+    skills = []
+    for span in skills_section.iterdescendants('span'):
+        text = _stripped_text(span)
+        if text:
+            skills.append(text)
+    return skills
+
+
+def _extract_employment_info(index: _PageIndex) -> Optional[EmploymentInfo]:
+    employment_type = None
+    work_schedule = None
+
+    for container in index.div_classes.get('resume-block-container', ()):
+        for p in container.iterdescendants('p'):
+            text = _stripped_text(p)
+            if "Занятость" in text:
+                employment_type = text.replace("Занятость:", "").strip()
+            elif "График работы" in text:
+                work_schedule = text.replace("График работы:", "").strip()
+
+    if employment_type is None or work_schedule is None:
+        return None
+
+    return EmploymentInfo(
+        employment_type=employment_type,
+        work_schedule=work_schedule
+    )
+
+
+def _safe(extractor, index: _PageIndex, default=None):
+    try:
+        return extractor(index)
+    except Exception as e:
+        logger.error(f'Error in {extractor.__name__}: {str(e)}')
+        return default
+
+
+def parse_html_lxml(html: str, url: str, vacancy_id: int) -> ResumeData:
+    '''
+    Разобрать HTML страницы резюме на lxml
+
+    Args:
+        html (str): HTML страницы резюме
+        url (str): Ссылка на резюме
+        vacancy_id (int): ID вакансии, по которой получен отклик
+
+    Returns:
+        ResumeData: Данные резюме, идентичные результату разбора на BeautifulSoup
+    '''
+    # Парсер на каждый разбор: журнал ошибок относится к последнему разбору, а разбор идет из нескольких потоков
+    parser = lxml.html.HTMLParser()
+    try:
+        root = lxml.html.document_fromstring(html, parser=parser)
+    except etree.ParserError:
+        # Пустой документ - поля получают значения по умолчанию, как и при разборе BeautifulSoup
+        root = lxml.html.document_fromstring('<html></html>')
+    index = _PageIndex(root)
+    if not _matches_html_parser_tree(html, parser, index):
+        logger.debug(f'lxml tree differs from html.parser for {url}, parsing with BeautifulSoup')
+        return _parse_html_bs4(html, url, vacancy_id)
+    _drop_hidden_text(root)
+
+    birthday_tag = index.find('span', 'resume-personal-birthday')
+    birthdate = _parse_russian_date(_text(birthday_tag)) if birthday_tag is not None else None
+    job_search_status_text = _extract_text(index, 'span', 'job-search-status', "Статус не указан")
+
+    return ResumeData(
+        link=url,
+        vacancy_id=vacancy_id,
+        name=_extract_text(index, 'h2', 'resume-personal-name', "ФИО не указано"),
+        age=_safe(_extract_age, index),
+        birthdate=birthdate,
+        address=_extract_text(index, 'span', 'resume-personal-address', "Адрес не указан"),
+        citizenship=_safe(_extract_citizenship, index),
+        ready_to_relocate=_safe(_extract_relocation_info, index),
+        job_search_status=job_search_status_text.replace('\xa0', ' ') if job_search_status_text else None,
+        position=_extract_text(index, 'span', 'resume-block-title-position', "Должность не указана"),
+        salary=_safe(_extract_salary, index),
+        experiences=_safe(_extract_experiences, index),
+        skills=_safe(_extract_skills, index),
+        employment=_safe(_extract_employment_info, index)
+    )
@@ -1,14 +1,24 @@
+import os
+import re
+import json
 import logging
+import asyncio
 import src.gigachat_module.utils.prompts as prompts
 
-from typing import Tuple, List
+from typing import Tuple, List, Dict, Optional
+from dotenv import load_dotenv
 
-from .client import get_gigachat_client
+from .client import GigaChatClientPool, gigachat_pool, is_integer_content
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.gigachat_module.parser import ResumeData
 
 
 logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+# Оценивать все критерии резюме одним запросом к GigaChat
+BATCHED_SCREENING = os.getenv("RESUME_SCREENING_BATCHED", "false").lower() in ("1", "true", "yes")
 
 '''
 TODO:
@@ -20,13 +30,27 @@ class ResumeScreening:
     """
     Скрининг резюме кандидата
     
+    Args:
+        concurrent (bool): Отправлять ли запросы по всем критериям одновременно (default=True).
+    При False критерии оцениваются последовательно, по одному запросу за раз
+        pool (GigaChatClientPool): Пул GigaChat клиентов (default: общий на процесс пул)
+        batched (bool): Оценивать ли все критерии одним запросом с JSON ответом (default: RESUME_SCREENING_BATCHED).
+    Критерии, баллы по которым не удалось разобрать из ответа, оцениваются отдельными запросами
+    
     Methods:
         screen_resume(resume_data):
             Проводит оценку резюме кандидата с помощью GigaChat
     """
-    def __init__(self):
-        # Инициализируем GigaChat клиент
-        self.giga = get_gigachat_client()
+    def __init__(
+        self,
+        concurrent: bool = True,
+        pool: Optional[GigaChatClientPool] = None,
+        batched: bool = BATCHED_SCREENING
+    ):
+        # Используем общий пул GigaChat клиентов
+        self.pool = pool or gigachat_pool
+        self.concurrent = concurrent
+        self.batched = batched
     
     def _calculate_intermediate_values(self, resume_data: ResumeData) -> Tuple[int, int]:
         age_score = 0
@@ -50,74 +74,192 @@ class ResumeScreening:
                 
         return age_score, salary_score
     
-    def _collect_tasks(self, resume_data: ResumeData) -> List[HumanMessage]:
-        tasks = []
+    def _collect_criteria(self, resume_data: ResumeData) -> List[Tuple[str, str, List[str]]]:
+        '''
+        Собрать критерии оценки резюме
+        
+        Returns:
+            List[Tuple[str, str, List[str]]]: Список (ключ критерия, текст критерия, части резюме для оценки)
+        '''
+        criteria = []
         resume_data_list = resume_data.to_list()
         try:
             if resume_data.experiences:
                 # 11 - индекс experience_summary в ResumeData.to_list() списке
                 experience_summary = resume_data_list[11]
-                tasks.append(
-                    HumanMessage(
-                        content=(
-                            f'{prompts.WORK_EXPERIENCE_CRITERIA}\n'
-                            f'{experience_summary}\n'
-                        )
-                    )
+                criteria.append(
+                    ('work_experience', prompts.WORK_EXPERIENCE_CRITERIA, [experience_summary])
                 )
                 if resume_data.skills:
                     # 10 - индекс skills_summary в ResumeData.to_list() списке
-                    skills_summary =resume_data_list[10]
-                    tasks.append(
-                        HumanMessage(
-                            content=(
-                                f'{prompts.CUSTOMER_FOCUS_CRITERIA}\n'
-                                f'{skills_summary}\n'
-                                f'{experience_summary}\n'
-                        )
-                    ))
-                    
-                    tasks.append(
-                        HumanMessage(
-                            content=(
-                                f'{prompts.COMPUTER_SKILLS_CRITERIA}\n'
-                                f'{skills_summary}\n'
-                                f'{experience_summary}\n'
-                        )
-                    ))
-                    
-                    tasks.append(
-                        HumanMessage(
-                            content=(
-                                f'{prompts.STRESS_RESISTANCE_CRITERIA}\n'
-                                f'{skills_summary}\n'
-                                f'{experience_summary}\n'
-                        )
-                    ))
+                    skills_summary = resume_data_list[10]
+                    criteria.append(
+                        ('customer_focus', prompts.CUSTOMER_FOCUS_CRITERIA, [skills_summary, experience_summary])
+                    )
+                    criteria.append(
+                        ('computer_skills', prompts.COMPUTER_SKILLS_CRITERIA, [skills_summary, experience_summary])
+                    )
+                    criteria.append(
+                        ('stress_resistance', prompts.STRESS_RESISTANCE_CRITERIA, [skills_summary, experience_summary])
+                    )
                     
             if resume_data.employment:
                 # 12 - индекс employment_summary в ResumeData.to_list() списке
                 employment_summary = resume_data_list[12]
-                tasks.append(
-                    HumanMessage(
-                        content=(
-                            f'{prompts.SHIFT_WORK_SCHEDULE_EXPERIENCE_CRITERIA}\n'
-                            f'{employment_summary}\n'            
-                    )
-                ))
+                criteria.append(
+                    ('shift_work', prompts.SHIFT_WORK_SCHEDULE_EXPERIENCE_CRITERIA, [employment_summary])
+                )
             
-            return tasks
+            return criteria
         except Exception as e:
-            logger.error(f'Failed to create tasks from ResumeData: {resume_data}. Error: {str(e)}')  
+            logger.error(f'Failed to collect criteria from ResumeData: {resume_data}. Error: {str(e)}')  
             return []
     
-    async def screen_resume(self, resume_data: ResumeData, job_requirements: str = None) -> int:
+    def _build_task(self, criteria_text: str, payload: List[str]) -> HumanMessage:
+        content = f'{criteria_text}\n' + ''.join(f'{part}\n' for part in payload)
+        return HumanMessage(content=content)
+    
+    def _build_batch_task(self, criteria: List[Tuple[str, str, List[str]]]) -> HumanMessage:
+        '''Собрать все критерии в один запрос, каждая часть резюме попадает в него один раз'''
+        sections = []
+        for _, _, payload in criteria:
+            for part in payload:
+                if part not in sections:
+                    sections.append(part)
+        
+        criteria_block = '\n'.join(f'[{key}] {criteria_text}' for key, criteria_text, _ in criteria)
+        resume_block = '\n'.join(sections)
+        return HumanMessage(
+            content=(
+                f'Критерии:\n{criteria_block}\n\n'
+                f'Резюме:\n{resume_block}\n'
+            )
+        )
+    
+    def _parse_batch_scores(self, content: str, keys: List[str]) -> Dict[str, int]:
+        '''Достать баллы по критериям из JSON ответа GigaChat, нераспознанные критерии пропускаются'''
+        if not isinstance(content, str):
+            return {}
+        # Модель может обернуть JSON в текст или markdown блок
+        match = re.search(r'\{.*\}', content, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            raw_scores = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(raw_scores, dict):
+            return {}
+        
+        scores = {}
+        for key in keys:
+            try:
+                scores[key] = int(raw_scores[key])
+            except (KeyError, ValueError, TypeError):
+                continue
+        return scores
+    
+    async def _screen_batched(
+        self,
+        system_message: SystemMessage,
+        criteria: List[Tuple[str, str, List[str]]],
+        raise_errors: bool = False
+    ) -> int:
+        '''
+        Оценить все критерии одним запросом к GigaChat
+        
+        Критерии, по которым не удалось разобрать баллы из ответа (в том числе после
+        ошибки пакетного запроса), оцениваются отдельными запросами, как в обычном режиме
+        '''
+        keys = [key for key, _, _ in criteria]
+        scores = {}
+        try:
+            response = await self.pool.ainvoke(
+                [
+                    SystemMessage(content=prompts.RESUME_BATCH_SYSTEM_MESSAGE),
+                    self._build_batch_task(criteria)
+                ],
+                # В кэш попадает только ответ с баллами по всем критериям
+                validate=lambda content: len(self._parse_batch_scores(content, keys)) == len(keys)
+            )
+            scores = self._parse_batch_scores(response.content, keys)
+        except Exception as e:
+            logger.error(f'Failed to invoke batched resume screening. Error: {str(e)}')
+        
+        fallback_criteria = [item for item in criteria if item[0] not in scores]
+        if fallback_criteria:
+            logger.warning(
+                f'Batched resume screening returned no scores for: '
+                f'{[key for key, _, _ in fallback_criteria]}, falling back to per-criterion requests'
+            )
+            fallback_tasks = [
+                self._build_task(criteria_text, payload) for _, criteria_text, payload in fallback_criteria
+            ]
+            return sum(scores.values()) + await self._screen_tasks(system_message, fallback_tasks, raise_errors)
+        return sum(scores.values())
+    
+    async def _invoke_task(self, system_message: SystemMessage, task_message: HumanMessage) -> int:
+        '''Отправить один критерий на оценку в GigaChat и получить баллы по нему'''
+        messages = [
+            system_message,
+            task_message
+        ]
+        # Размер пула ограничивает количество одновременных запросов к GigaChat
+        response = await self.pool.ainvoke(messages, validate=is_integer_content)
+        task_score = response.content
+        
+        try:
+            return int(task_score)
+        except (ValueError, TypeError):
+            return 0
+    
+    async def _screen_tasks(
+        self,
+        system_message: SystemMessage,
+        tasks: List[HumanMessage],
+        raise_errors: bool = False
+    ) -> int:
+        '''
+        Оценить критерии отдельными запросами и сложить баллы
+        
+        Критерии, по которым запрос не удался, без raise_errors пропускаются (0 баллов),
+        с raise_errors после опроса всех критериев пробрасывается первая ошибка
+        '''
+        score = 0
+        if self.concurrent:
+            # Все критерии уходят в GigaChat одновременно, баллы суммируются
+            # в порядке критериев из _collect_criteria
+            task_scores = await asyncio.gather(
+                *(self._invoke_task(system_message, task_message) for task_message in tasks),
+                return_exceptions=True
+            )
+            errors = []
+            for task_message, task_score in zip(tasks, task_scores):
+                if isinstance(task_score, Exception):
+                    logger.error(f'Failed to invoke task: {task_message}. Error: {str(task_score)}')
+                    errors.append(task_score)
+                    continue
+                score += task_score
+            if errors and raise_errors:
+                raise errors[0]
+        else:
+            for task_message in tasks:
+                score += await self._invoke_task(system_message, task_message)
+        return score
+    
+    async def screen_resume(
+        self,
+        resume_data: ResumeData,
+        job_requirements: str = None,
+        raise_errors: bool = False
+    ) -> int:
         """
         Провести оценку резюме кандидата с помощью GigaChat
         
         Args:
             resume_data (ResumeData): Обобщенная информация о резюме кандидата
             job_requirements (str): Специфические требования по вакансии
+            raise_errors (bool): Пробрасывать ли ошибки обращения к GigaChat вместо возврата частичной оценки (default=False)
             
         Returns:
             int: Оценка от GigaChat относительно резюме
@@ -129,24 +271,20 @@ class ResumeScreening:
         # Глобальный системный промпт
         system_message = SystemMessage(content=prompts.RESUME_SYSTEM_MESSAGE)
         
+        criteria = []
         try:
             age_score, salary_score = self._calculate_intermediate_values(resume_data=resume_data)
             global_score += age_score + salary_score
-            tasks = self._collect_tasks(resume_data=resume_data)
+            criteria = self._collect_criteria(resume_data=resume_data)
             
-            for task_message in tasks:
-                messages = [
-                    system_message,
-                    task_message
-                ]
-                response = await self.giga.ainvoke(messages)
-                task_score = response.content
-                
-                try:
-                    global_score += int(task_score)
-                except (ValueError, TypeError):
-                    pass
+            if self.batched and len(criteria) > 1:
+                global_score += await self._screen_batched(system_message, criteria, raise_errors)
+            else:
+                tasks = [self._build_task(criteria_text, payload) for _, criteria_text, payload in criteria]
+                global_score += await self._screen_tasks(system_message, tasks, raise_errors)
             return global_score     
         except Exception as e:
-            logger.error(f'Failed to invoke tasks: {tasks}. Error: {str(e)}')
+            logger.error(f'Failed to invoke tasks: {criteria}. Error: {str(e)}')
+            if raise_errors:
+                raise
             return global_score
\ No newline at end of file
@@ -1,10 +1,11 @@
+import asyncio
 import logging
 import src.gigachat_module.utils.prompts as prompts
 
-from typing import List
+from typing import List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
 
-from .client import get_gigachat_client
+from .client import GigaChatClientPool, gigachat_pool, is_integer_content
 from src.gigachat_module.utils.formatters import candidate_answers_formatter
 
 from src.database.session import Session
@@ -17,13 +18,16 @@ class TelegramScreening:
     """
     Скрининг ответов кандидата, полученных из Telegram бота
     
+    Args:
+        pool (GigaChatClientPool): Пул GigaChat клиентов (default: общий на процесс пул)
+    
     Methods:
         conduct_additional_screening(candidate_responses, screening_criterias):
             Проводит оценку кандидата по ответам из Telegram бота
     """
-    def __init__(self):
-        # Инициализируем GigaChat клиент
-        self.giga = get_gigachat_client()
+    def __init__(self, pool: Optional[GigaChatClientPool] = None):
+        # Используем общий пул GigaChat клиентов
+        self.pool = pool or gigachat_pool
         
     def _format_criteria(self, criteria):
         """
@@ -56,7 +60,14 @@ class TelegramScreening:
         self, 
         candidate_responses_json: str,
         vacancy_id: int,
+        raise_errors: bool = False
     ) -> List[HumanMessage]:
+        '''
+        Собрать задачи скрининга по вопросам вакансии
+
+        Без raise_errors ошибка чтения вопросов из БД дает пустой список задач (оценка 0),
+        с raise_errors пробрасывается, чтобы задача очереди скрининга ушла на повтор
+        '''
         tasks = []
 
         try:
@@ -85,13 +96,16 @@ class TelegramScreening:
             return tasks
         except Exception as e:
             logger.error(f'Failed to create tasks from candidate responses: {candidate_responses_json}. Error: {str(e)}')  
+            if raise_errors:
+                raise
             return []
     
     async def screen_answers(
         self, 
         candidate_responses_json: str,
         vacancy_id: int,
-        screening_criterias: str = None
+        screening_criterias: str = None,
+        raise_errors: bool = False
     ) -> str:
         """
         Провести дополнительную оценку кандидата по его ответам из Telegram бота
@@ -100,6 +114,7 @@ class TelegramScreening:
             candidate_responses (str): Обобщенные ответы кандидата в JSON формате
             vacancy_id (int): ID вакансии, по которой пройден опрос
             screening_criterias (str): Требования для скрининга
+            raise_errors (bool): Пробрасывать ли ошибки чтения вопросов и обращения к GigaChat вместо возврата частичной оценки (default=False)
             
         Returns:
             str: Финальная оценка от GigaChat по кандидату
@@ -112,15 +127,17 @@ class TelegramScreening:
         # Глобальный системный промпт
         system_message = SystemMessage(content=prompts.TELEGRAM_SYSTEM_MESSAGE)
         
+        tasks = []
         try:
-            tasks = self._collect_tasks(candidate_responses_json, vacancy_id)
+            # Вопросы читаются синхронной сессией, поэтому в потоке, чтобы не блокировать event loop
+            tasks = await asyncio.to_thread(self._collect_tasks, candidate_responses_json, vacancy_id, raise_errors)
             if len(tasks) > 0:
                 for task_message in tasks:
                     messages = [
                         system_message,
                         task_message
                     ]
-                    response = await self.giga.ainvoke(messages)
+                    response = await self.pool.ainvoke(messages, validate=is_integer_content)
                     task_score = response.content
                     
                     try:
@@ -133,4 +150,6 @@ class TelegramScreening:
         
         except Exception as e:
             logger.error(f'Failed to invoke telegram tasks: {tasks}. Error: {str(e)}')
+            if raise_errors:
+                raise
             return global_score
\ No newline at end of file
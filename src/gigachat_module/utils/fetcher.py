@@ -0,0 +1,152 @@
+import os
+import random
+import asyncio
+import logging
+import aiohttp
+
+from typing import Optional, Dict, Mapping
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+# Максимальное количество одновременных запросов на все хосты
+FETCH_CONCURRENCY = int(os.getenv("RESUME_FETCH_CONCURRENCY", "10"))
+# Максимальное количество одновременных соединений с одним хостом
+FETCH_LIMIT_PER_HOST = int(os.getenv("RESUME_FETCH_LIMIT_PER_HOST", "4"))
+# Таймаут одного запроса (в секундах)
+FETCH_TIMEOUT_SECONDS = float(os.getenv("RESUME_FETCH_TIMEOUT_SECONDS", "20"))
+# Повторные попытки при временных ошибках (429/5xx, обрыв соединения, таймаут)
+FETCH_MAX_RETRIES = int(os.getenv("RESUME_FETCH_MAX_RETRIES", "3"))
+FETCH_RETRY_BACKOFF_SECONDS = float(os.getenv("RESUME_FETCH_RETRY_BACKOFF_SECONDS", "1"))
+# Время жизни записей DNS кэша и простаивающих keep-alive соединений (в секундах)
+FETCH_DNS_CACHE_TTL_SECONDS = int(os.getenv("RESUME_FETCH_DNS_CACHE_TTL_SECONDS", "300"))
+FETCH_KEEPALIVE_TIMEOUT_SECONDS = float(os.getenv("RESUME_FETCH_KEEPALIVE_TIMEOUT_SECONDS", "30"))
+
+# Статусы ответа, при которых запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class FetchResponse:
+    status: int
+    text: str
+    headers: Mapping[str, str]
+
+
+class ResumeFetcher:
+    """
+    Загрузчик страниц с ограничением параллельности и повторными попытками
+
+    Все запросы идут через одну сессию с настроенным TCPConnector: keep-alive соединения
+    переиспользуются, DNS ответы кэшируются, количество соединений с одним хостом ограничено.
+    Общее количество одновременных запросов ограничено семафором. Временные ошибки
+    повторяются с экспоненциальной паузой со случайным разбросом (Retry-After учитывается).
+
+    Args:
+        concurrency (int): Максимальное количество одновременных запросов
+        limit_per_host (int): Максимальное количество соединений с одним хостом
+        timeout (float): Таймаут одного запроса в секундах
+        max_retries (int): Количество повторных попыток
+
+    Methods:
+        fetch(url, headers, cookies):
+            Загрузить страницу, возвращает FetchResponse
+
+    Example:
+        async with ResumeFetcher() as fetcher:
+            response = await fetcher.fetch(url)
+    """
+    def __init__(
+        self,
+        concurrency: int = FETCH_CONCURRENCY,
+        limit_per_host: int = FETCH_LIMIT_PER_HOST,
+        timeout: float = FETCH_TIMEOUT_SECONDS,
+        max_retries: int = FETCH_MAX_RETRIES
+    ):
+        self.concurrency = max(1, concurrency)
+        self.limit_per_host = max(1, limit_per_host)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'ResumeFetcher':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=FETCH_DNS_CACHE_TTL_SECONDS,
+            keepalive_timeout=FETCH_KEEPALIVE_TIMEOUT_SECONDS
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return FETCH_RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        cookies: Optional[Dict[str, str]] = None
+    ) -> FetchResponse:
+        """
+        Загрузить страницу с повторными попытками при временных ошибках
+
+        Returns:
+            FetchResponse: Статус, текст и заголовки последнего ответа
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: Если попытки закончились ошибкой соединения
+        """
+        if self._session is None:
+            raise RuntimeError('ResumeFetcher is not opened, use it as an async context manager')
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    async with self._session.get(url=url, headers=headers, cookies=cookies) as response:
+                        if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                            return FetchResponse(
+                                status=response.status,
+                                text=await response.text() if response.status != 304 else '',
+                                # Копия сохраняет регистронезависимый доступ к заголовкам
+                                headers=response.headers.copy()
+                            )
+                        delay = self._get_retry_delay(attempt, response.headers.get('Retry-After'))
+                        reason = f'status {response.status}'
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._get_retry_delay(attempt)
+                reason = str(e) or type(e).__name__
+
+            attempt += 1
+            logger.warning(f'Fetching {url} failed ({reason}), retry {attempt}/{self.max_retries} in {delay:.1f}s')
+            # Пауза вне семафора, чтобы ожидающий повтора запрос не занимал слот
+            await asyncio.sleep(delay)
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import pickle
+import asyncio
+import hashlib
+import logging
+import threading
+
+from typing import Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass, asdict
+from dotenv import load_dotenv
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+HTML_CACHE_ENABLED = os.getenv("RESUME_HTML_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+HTML_CACHE_DIR = os.getenv("RESUME_HTML_CACHE_DIR", "resume_html_cache")
+# Файлы кэша, к которым не обращались дольше этого срока, удаляются
+HTML_CACHE_MAX_AGE_DAYS = float(os.getenv("RESUME_HTML_CACHE_MAX_AGE_DAYS", "30"))
+# Максимальный размер кэша: сверх него удаляются файлы, к которым дольше всего не обращались
+HTML_CACHE_MAX_MB = float(os.getenv("RESUME_HTML_CACHE_MAX_MB", "500"))
+# Как часто (не чаще) проверять кэш на устаревшие файлы и превышение размера
+HTML_CACHE_PRUNE_INTERVAL_SECONDS = float(os.getenv("RESUME_HTML_CACHE_PRUNE_INTERVAL_SECONDS", "3600"))
+# Версия формата разобранных резюме: при изменении парсера старые результаты перестают использоваться
+PARSED_CACHE_VERSION = 1
+
+
+@dataclass
+class HtmlCacheEntry:
+    url: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class ResumeHtmlCache:
+    """
+    Дисковый кэш HTML страниц резюме HH
+
+    Для каждого URL хранятся ETag/Last-Modified последнего ответа и хэш содержимого,
+    сами страницы хранятся по хэшу содержимого (content-addressed), поэтому одинаковые
+    страницы не дублируются. Рядом со страницей сохраняется результат ее разбора,
+    чтобы не разбирать неизменившуюся страницу повторно.
+
+    Структура каталога:
+        index/<sha256(url)>.json - метаданные последнего ответа по URL
+        pages/<sha256(html)>.html - HTML страницы
+        parsed/<sha256(html)>.v<версия>.pickle - разобранное резюме
+
+    Каждое чтение обновляет время изменения файла, поэтому оно служит временем последнего
+    обращения. Не чаще раза в prune_interval при записи кэш очищается: удаляются файлы старше
+    max_age_seconds, а затем, пока кэш больше max_bytes, - самые давно использованные.
+    Если после очистки запись index ссылается на удаленную страницу, страница скачивается заново.
+
+    Обращения к диску синхронные, поэтому из асинхронного кода кэш вызывается через
+    методы с префиксом a (alookup, aload_html, astore, aload_parsed, astore_parsed),
+    которые выполняют их в отдельном потоке.
+
+    Args:
+        directory (str): Каталог кэша
+        max_age_seconds (float): Время жизни файла без обращений
+        max_bytes (int): Максимальный размер кэша
+        prune_interval (float): Минимальный интервал между очистками кэша (в секундах)
+
+    Methods:
+        lookup(url):
+            Получить метаданные последнего ответа по URL или None
+        conditional_headers(entry):
+            Заголовки условного запроса (If-None-Match / If-Modified-Since)
+        load_html(content_hash):
+            Получить HTML страницы по хэшу содержимого
+        store(url, html, etag, last_modified):
+            Сохранить страницу и метаданные ответа, возвращает хэш содержимого
+        load_parsed(content_hash) / store_parsed(content_hash, resume_data):
+            Получить / сохранить результат разбора страницы
+        prune():
+            Удалить устаревшие файлы и файлы сверх max_bytes
+    """
+    def __init__(
+        self,
+        directory: str = HTML_CACHE_DIR,
+        max_age_seconds: float = HTML_CACHE_MAX_AGE_DAYS * 86400,
+        max_bytes: int = int(HTML_CACHE_MAX_MB * 1024 * 1024),
+        prune_interval: float = HTML_CACHE_PRUNE_INTERVAL_SECONDS
+    ):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._pruned_at = 0.0
+        self._prune_lock = threading.Lock()
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.directory, 'index', f'{self._hash(url)}.json')
+
+    def _page_path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, 'pages', f'{content_hash}.html')
+
+    def _parsed_path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, 'parsed', f'{content_hash}.v{PARSED_CACHE_VERSION}.pickle')
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Пишем во временный файл и подменяем, чтобы не оставить в кэше недописанный файл
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def lookup(self, url: str) -> Optional[HtmlCacheEntry]:
+        try:
+            index_path = self._index_path(url)
+            with open(index_path, 'r', encoding='utf-8') as file:
+                entry = HtmlCacheEntry(**json.load(file))
+            self._touch(index_path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f'Error reading HTML cache entry for {url}: {str(e)}')
+            return None
+
+    def conditional_headers(self, entry: HtmlCacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def load_html(self, content_hash: str) -> Optional[str]:
+        try:
+            page_path = self._page_path(content_hash)
+            with open(page_path, 'r', encoding='utf-8') as file:
+                html = file.read()
+        except OSError:
+            return None
+        self._touch(page_path)
+        return html
+
+    def store(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> str:
+        content_hash = self._hash(html)
+        try:
+            page_path = self._page_path(content_hash)
+            if os.path.exists(page_path):
+                self._touch(page_path)
+            else:
+                self._write_atomic(page_path, html.encode('utf-8'))
+
+            entry = HtmlCacheEntry(
+                url=url,
+                content_hash=content_hash,
+                etag=etag,
+                last_modified=last_modified,
+                fetched_at=time.time()
+            )
+            self._write_atomic(
+                self._index_path(url),
+                json.dumps(asdict(entry), ensure_ascii=False).encode('utf-8')
+            )
+        except OSError as e:
+            logger.error(f'Error writing HTML cache entry for {url}: {str(e)}')
+        self._maybe_prune()
+        return content_hash
+
+    def load_parsed(self, content_hash: str) -> Optional[Any]:
+        try:
+            parsed_path = self._parsed_path(content_hash)
+            with open(parsed_path, 'rb') as file:
+                resume_data = pickle.load(file)
+            self._touch(parsed_path)
+            return resume_data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Поврежденный или несовместимый файл - страница будет разобрана заново
+            logger.warning(f'Error reading parsed resume from HTML cache: {str(e)}')
+            return None
+
+    def store_parsed(self, content_hash: str, resume_data: Any) -> None:
+        try:
+            self._write_atomic(self._parsed_path(content_hash), pickle.dumps(resume_data))
+        except (OSError, pickle.PicklingError) as e:
+            logger.error(f'Error writing parsed resume to HTML cache: {str(e)}')
+
+    def _list_files(self) -> List[Tuple[float, int, str]]:
+        '''Файлы кэша: (время последнего обращения, размер, путь)'''
+        files = []
+        for subdirectory in ('index', 'pages', 'parsed'):
+            try:
+                entries = os.scandir(os.path.join(self.directory, subdirectory))
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+                    except OSError:
+                        continue
+        return files
+
+    def prune(self) -> int:
+        '''Удалить устаревшие файлы и самые давно использованные сверх max_bytes, возвращает число удаленных файлов'''
+        expired_at = time.time() - self.max_age_seconds
+        total_bytes = 0
+        removed = 0
+        for accessed_at, size, path in sorted(self._list_files(), reverse=True):
+            # Файлы идут от недавно использованных к давно использованным
+            if accessed_at < expired_at or total_bytes + size > self.max_bytes:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f'Error removing {path} from HTML cache: {str(e)}')
+                continue
+            total_bytes += size
+        if removed:
+            logger.info(f'Pruned {removed} files from HTML cache, {total_bytes / 1024 / 1024:.1f} MB left')
+        return removed
+
+    def _maybe_prune(self) -> None:
+        if time.time() - self._pruned_at < self.prune_interval:
+            return
+        # Очисткой занимается один поток, остальные не ждут ее
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._pruned_at = time.time()
+            self.prune()
+        except Exception as e:
+            logger.error(f'Error pruning HTML cache: {str(e)}')
+        finally:
+            self._prune_lock.release()
+
+    async def alookup(self, url: str) -> Optional[HtmlCacheEntry]:
+        return await asyncio.to_thread(self.lookup, url)
+
+    async def aload_html(self, content_hash: str) -> Optional[str]:
+        return await asyncio.to_thread(self.load_html, content_hash)
+
+    async def astore(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> str:
+        return await asyncio.to_thread(self.store, url, html, etag, last_modified)
+
+    async def aload_parsed(self, content_hash: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.load_parsed, content_hash)
+
+    async def astore_parsed(self, content_hash: str, resume_data: Any) -> None:
+        await asyncio.to_thread(self.store_parsed, content_hash, resume_data)
+
+
+# Общий на процесс кэш страниц резюме (None, если кэш выключен)
+html_cache: Optional[ResumeHtmlCache] = ResumeHtmlCache() if HTML_CACHE_ENABLED else None
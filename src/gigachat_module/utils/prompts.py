@@ -27,4 +27,12 @@ SHIFT_WORK_SCHEDULE_EXPERIENCE_CRITERIA = "Критерий: Опыт работ
 '''Промпты, используемые для TelegramScreening'''
 TG_CUSTOMER_FOCUS_CRITERIA = "Оцени пример по клиентоориентированности: если он развернутый, конкретный, с описанием ситуации, действий кандидата и положительного результата — ставь 10; если пример поверхностный, слабо раскрыт или неполный — ставь 5; если примера нет, он не про клиента или не демонстрирует клиентоориентированность — ставь 0."
 TG_SOFTWARE_CRITERIA = "Оцени владение офисными программами: если перечислены только базовые программы без уверенного уровня или указано владею офисными программами без деталей — ставь 0; если упомянуты конкретные программы (например, Word, Excel, PowerPoint) с описанием уровня или задач — ставь 5; если перечислены несколько программ с уверенным уровнем, указаны продвинутые функции (например, сводные таблицы, макросы, Google Workspace, CRM-системы) и примеры использования — ставь 10."
-TG_STRESS_AT_CALLCENTER_CRITERIA = "Анализируй ответ на вопрос и оцени обоснование кандидата: если ответ общий, без объяснений или просто согласие/несогласие без аргументов — ставь 0; если приведено одно простое или поверхностное объяснение (например, из-за клиентов или нагрузки), но без раскрытия — ставь 5; если ответ развернутый, с конкретными причинами (например, эмоциональное выгорание, высокая нагрузка, конфликтные ситуации), логикой и пониманием специфики работы — ставь 10."
\ No newline at end of file
+TG_STRESS_AT_CALLCENTER_CRITERIA = "Анализируй ответ на вопрос и оцени обоснование кандидата: если ответ общий, без объяснений или просто согласие/несогласие без аргументов — ставь 0; если приведено одно простое или поверхностное объяснение (например, из-за клиентов или нагрузки), но без раскрытия — ставь 5; если ответ развернутый, с конкретными причинами (например, эмоциональное выгорание, высокая нагрузка, конфликтные ситуации), логикой и пониманием специфики работы — ставь 10."
+'''Промпты, используемые для пакетного режима ResumeScreening (все критерии в одном запросе)'''
+RESUME_BATCH_SYSTEM_MESSAGE = f"""
+Оцени резюме кандидата сразу по нескольким критериям, каждый критерий - отдельно и строго по его правилам.
+Каждый критерий помечен ключом в квадратных скобках, например [work_experience].
+В ответе верни только JSON объект, где ключ - ключ критерия, а значение - целое число баллов по этому критерию, например:
+{{"work_experience": 20, "customer_focus": 5}}
+Не добавляй в ответ никаких пояснений, только JSON
+"""
@@ -0,0 +1,146 @@
+import time
+import asyncio
+
+from typing import Optional, AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов по алгоритму token bucket
+
+    Бакет пополняется со скоростью rate токенов в секунду, но хранит не больше
+    capacity токенов. Каждый запрос забирает один токен; если токенов нет,
+    запрос ждет пополнения. Ожидающие обслуживаются в порядке очереди.
+
+    Args:
+        rate (float): Скорость пополнения (запросов в секунду)
+        capacity (float): Размер бакета - максимальный всплеск запросов (default: rate)
+
+    Methods:
+        acquire(tokens=1):
+            Дождаться и забрать токены из бакета
+        consume(tokens=1):
+            Забрать токены без ожидания: баланс может уйти в минус, тогда ожидающие acquire() ждут дольше
+        delay(tokens=1):
+            Через сколько секунд в бакете будут токены
+        pause(seconds):
+            Не выдавать токены ближайшие seconds секунд
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(capacity if capacity is not None else rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        return now
+
+    def delay(self, tokens: float = 1) -> float:
+        '''Через сколько секунд в бакете будут токены (с учетом паузы)'''
+        now = self._refill()
+        wait = 0.0 if self._tokens >= tokens else (tokens - self._tokens) / self.rate
+        return max(wait, self._paused_until - now)
+
+    def consume(self, tokens: float = 1) -> None:
+        '''Забрать токены без ожидания'''
+        self._refill()
+        self._tokens -= tokens
+
+    async def acquire(self, tokens: float = 1) -> None:
+        '''Дождаться и забрать токены из бакета'''
+        async with self._lock:
+            while (wait := self.delay(tokens)) > 0:
+                await asyncio.sleep(wait)
+            self._tokens -= tokens
+
+    def pause(self, seconds: float) -> None:
+        '''Не выдавать токены ближайшие seconds секунд (например, после 429)'''
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Адаптивный лимит одновременных запросов (AIMD)
+
+    Пока ответы приходят быстрее latency_target, лимит растет примерно на единицу
+    за каждые limit успешных запросов. При перегрузке (429/5xx) лимит уменьшается
+    в 1/backoff_factor раз, а новые запросы не выпускаются до окончания паузы.
+
+    Args:
+        min_limit (int): Минимальный лимит одновременных запросов
+        max_limit (int): Максимальный лимит одновременных запросов
+        latency_target (float): Время ответа (в секундах), которое считается нормальным
+        initial_limit (int): Начальный лимит (default: max_limit)
+        backoff_factor (float): Множитель лимита при перегрузке (default=0.5)
+
+    Methods:
+        slot():
+            Асинхронный контекстный менеджер, занимающий один слот под запрос
+        record(latency, overloaded):
+            Учесть результат запроса и пересчитать лимит
+        pause(seconds):
+            Приостановить выдачу новых слотов
+    """
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        initial_limit: Optional[int] = None,
+        backoff_factor: float = 0.5
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.backoff_factor = backoff_factor
+        self.limit = float(initial_limit if initial_limit is not None else self.max_limit)
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    async def _acquire(self) -> None:
+        async with self._condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    # Отпускаем блокировку на время паузы, чтобы слоты могли освобождаться
+                    self._condition.release()
+                    try:
+                        await asyncio.sleep(pause)
+                    finally:
+                        await self._condition.acquire()
+                    continue
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                await self._condition.wait()
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self._acquire()
+        try:
+            yield
+        finally:
+            await self._release()
+
+    def record(self, latency: float, overloaded: bool = False) -> None:
+        '''Пересчитать лимит по результату запроса'''
+        if overloaded:
+            self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+        elif latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def pause(self, seconds: float) -> None:
+        '''Не выдавать новые слоты ближайшие seconds секунд'''
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+
+from typing import Dict, Optional, List
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+
+CACHE_ENABLED = os.getenv("GIGACHAT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_PATH = os.getenv("GIGACHAT_CACHE_PATH", "gigachat_cache.sqlite3")
+CACHE_TTL_HOURS = float(os.getenv("GIGACHAT_CACHE_TTL_HOURS", "168"))
+CACHE_MAX_ENTRIES = int(os.getenv("GIGACHAT_CACHE_MAX_ENTRIES", "50000"))
+# Сколько отметок обращения (last_access) копится в памяти перед записью одной пачкой
+CACHE_ACCESS_BATCH_SIZE = int(os.getenv("GIGACHAT_CACHE_ACCESS_BATCH_SIZE", "100"))
+# Доля max_entries, которая освобождается за одно вытеснение: вытеснение идет редко и пачкой
+CACHE_EVICTION_FRACTION = 0.1
+
+
+class LLMResponseCache:
+    """
+    Персистентный кэш ответов GigaChat на базе SQLite
+
+    Ключ записи - SHA-256 хэш от (модель, сообщения промпта), поэтому повторная
+    отправка тех же критериев с тем же текстом резюме/ответов не расходует квоту GigaChat.
+    Записи старше ttl_seconds считаются устаревшими, при превышении max_entries
+    вытесняются записи, к которым дольше всего не обращались (LRU).
+
+    Обращения к SQLite синхронные, поэтому из асинхронного кода кэш вызывается через
+    aget/aset, которые выполняют их в отдельном потоке и не блокируют event loop.
+    Отметки обращения при попадании в кэш не пишутся на каждый get, а копятся и
+    записываются пачкой; вытеснение запускается, только когда записей больше max_entries.
+
+    Args:
+        path (str): Путь к файлу базы SQLite
+        ttl_seconds (float): Время жизни записи в секундах
+        max_entries (int): Максимальное количество записей в кэше
+
+    Methods:
+        make_key(model, messages):
+            Посчитать ключ кэша для промпта
+        get(key):
+            Получить сохраненный ответ или None
+        set(key, content):
+            Сохранить ответ в кэш
+        aget(key) / aset(key, content):
+            То же самое без блокировки event loop
+    """
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        ttl_seconds: float = CACHE_TTL_HOURS * 3600,
+        max_entries: int = CACHE_MAX_ENTRIES
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._connection: Optional[sqlite3.Connection] = None
+        # Соединение одно на процесс и используется из потоков asyncio.to_thread
+        self._lock = threading.Lock()
+        # Незаписанные отметки обращения: ключ -> время обращения
+        self._accessed: Dict[str, float] = {}
+        # Количество записей в кэше (считается при подключении, дальше ведется при вставках)
+        self._count = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL + NORMAL: запись в кэш не ждет fsync на каждый ответ
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "content TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)"
+            )
+            connection.commit()
+            self._count = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            self._connection = connection
+        return self._connection
+
+    def _write_accessed(self, connection: sqlite3.Connection) -> None:
+        if self._accessed:
+            connection.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        '''Вытеснить давно не использованные записи, если их больше max_entries'''
+        if self._count <= self.max_entries:
+            return
+        # Освобождаем место с запасом, чтобы не вытеснять на каждой следующей вставке
+        excess = self._count - self.max_entries + int(self.max_entries * CACHE_EVICTION_FRACTION)
+        self._write_accessed(connection)
+        connection.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        self._count = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, messages: List[BaseMessage]) -> str:
+        '''Посчитать ключ кэша по модели и содержимому (системного + пользовательского) сообщений'''
+        payload = json.dumps(
+            [model, [[message.type, message.content] for message in messages]],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._lock:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if not row:
+                    return None
+
+                content, created_at = row
+                now = time.time()
+                if now - created_at > self.ttl_seconds:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    connection.commit()
+                    self._count -= 1
+                    self._accessed.pop(key, None)
+                    return None
+
+                self._accessed[key] = now
+                if len(self._accessed) >= CACHE_ACCESS_BATCH_SIZE:
+                    self._write_accessed(connection)
+                    connection.commit()
+                return content
+        except sqlite3.Error as e:
+            logger.error(f'Error reading GigaChat response cache: {str(e)}')
+            return None
+
+    def set(self, key: str, content: str) -> None:
+        try:
+            with self._lock:
+                connection = self._connect()
+                now = time.time()
+                exists = connection.execute(
+                    "SELECT 1 FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, content, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, content, now, now)
+                )
+                self._accessed.pop(key, None)
+                if not exists:
+                    self._count += 1
+                self._evict(connection)
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f'Error writing GigaChat response cache: {str(e)}')
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, content: str) -> None:
+        await asyncio.to_thread(self.set, key, content)
+
+
+# Общий на процесс кэш ответов GigaChat (None, если кэш выключен)
+response_cache: Optional[LLMResponseCache] = LLMResponseCache() if CACHE_ENABLED else None
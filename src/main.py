@@ -1,12 +1,22 @@
 import asyncio
 import logging
 
+from typing import List
 from aiogram.types import BotCommand
 from dotenv import load_dotenv
 
 from src.bot.core.bot import bot, dp
 from src.bot.utils.check_abandoned_forms import check_abandoned_forms
+from src.bot.utils.schedule_form_reminder import form_reminders_processing_task
+from src.bot.utils.outbound_dispatcher import outbound_dispatcher
 from src.application_processing_tasks import resumes_processing_task
+from src.screening_processing_tasks import screening_jobs_processing_task
+from src.gigachat_module.client import gigachat_pool
+from src.gigachat_module.parser import shutdown_parse_executor
+from src.database.utils.skill_cache import skill_cache
+from src.database.session import async_engine
+from src.database.utils.interaction_buffer import interaction_buffer
+from src.database.utils.leader_election import run_as_leader
 
 
 logging.basicConfig(level=logging.WARNING)
@@ -15,49 +25,112 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 
-async def main() -> None:
+BOT_COMMANDS = [
+    # Production commands
+    BotCommand(command='/start', description='Запуск бота'),
+    BotCommand(command='/cancel', description='Отменить процесс заполнение анкеты (для соискателя по вакансии)'),
+    BotCommand(command='/get_reviews', description='Открыть панель HR (для HR-специалиста)'),
+    BotCommand(command='/register_hr', description='Регистрация (для HR-специалиста)'),
+    BotCommand(command='/list_vacancies', description='Просмотр вакансий в системе (для Админа)'),
+    BotCommand(command='/generate_token', description='Генерация токена регистрации (для Админа)'),
+    BotCommand(command='/delete_hr', description='Удаление HR-специалиста (для Админа)'),
+    BotCommand(command='/list_hr', description='Список зарегистрированых HR-специалистов (для Админа)'),
+     # [DEV MODE ONLY] commands
+    BotCommand(command='/clr_db', description='Очистить БД (DEV MODE ONLY)'),
+    BotCommand(command='/vacancies_test', description='Тест: Создание вакансий (DEV MODE ONLY)'),
+    BotCommand(command='/token_test', description='Тест: Регистрация клиента по токену + анкета (DEV MODE ONLY)'),
+    BotCommand(command='/notification_test', description='Тест: Меню с решениями для HR (DEV MODE ONLY)'),
+]
+
+
+async def warm_up() -> None:
+    '''Подготовка процесса к работе: кэши и токены, которые иначе загружались бы на первом запросе'''
+    # Получаем OAuth токен GigaChat заранее, чтобы первая анкета не ждала авторизацию
     try:
-        commands = [
-            # Production commands
-            BotCommand(command='/start', description='Запуск бота'),
-            BotCommand(command='/cancel', description='Отменить процесс заполнение анкеты (для соискателя по вакансии)'),
-            BotCommand(command='/get_reviews', description='Открыть панель HR (для HR-специалиста)'),
-            BotCommand(command='/register_hr', description='Регистрация (для HR-специалиста)'),
-            BotCommand(command='/list_vacancies', description='Просмотр вакансий в системе (для Админа)'),
-            BotCommand(command='/generate_token', description='Генерация токена регистрации (для Админа)'),
-            BotCommand(command='/delete_hr', description='Удаление HR-специалиста (для Админа)'),
-            BotCommand(command='/list_hr', description='Список зарегистрированых HR-специалистов (для Админа)'),
-             # [DEV MODE ONLY] commands
-            BotCommand(command='/clr_db', description='Очистить БД (DEV MODE ONLY)'),
-            BotCommand(command='/vacancies_test', description='Тест: Создание вакансий (DEV MODE ONLY)'),
-            BotCommand(command='/token_test', description='Тест: Регистрация клиента по токену + анкета (DEV MODE ONLY)'),
-            BotCommand(command='/notification_test', description='Тест: Меню с решениями для HR (DEV MODE ONLY)'),
-        ]
+        await gigachat_pool.warm_up()
+    except Exception as e:
+        logger.warning(f'GigaChat warm up failed: {e}')
+    # Загружаем справочник навыков, чтобы сохранение резюме не искало каждый навык в БД
+    try:
+        skill_cache.warm_up()
+    except Exception as e:
+        logger.warning(f'Skill cache warm up failed: {e}')
+
+
+def start_background_tasks() -> List[asyncio.Task]:
+    '''
+        Запуск фоновых корутин процесса:
+            - resume_processing: парсинг резюме HH по URL.
+            - check_abandoned_forms: проверка брошенных анкет и планирование напоминаний.
+            - form_reminders_processing: отправка запланированных напоминаний о брошенных анкетах.
+            - outbound_messages_sending: очередь исходящих сообщений с учетом лимитов Telegram.
+            - screening_jobs_processing: скрининг отправленных анкет GigaChat из очереди задач.
+            - interaction_buffer_flushing: пакетная запись ответов кандидатов и отметок активности.
         
+        resume_processing и check_abandoned_forms должны работать в одном процессе на всю систему:
+        их запускает только процесс, выбранный лидером (см. LeaderElection), остальные ждут его отказа.
+        Перед каждой итерацией они проверяют, что лидерство не потеряно (ensure_leader).
+        Остальные задачи разбирают общие очереди в БД через SKIP LOCKED или обслуживают только
+        свой процесс, поэтому работают в каждом.
+    '''
+    tasks = []
+    tasks.append(asyncio.create_task(run_as_leader(
+        'resumes_processing',
+        lambda election: resumes_processing_task(delay_hours=24, ensure_leader=election.ensure_leader)
+    )))
+    tasks.append(asyncio.create_task(run_as_leader(
+        'check_abandoned_forms',
+        lambda election: check_abandoned_forms(delay_minutes=30, ensure_leader=election.ensure_leader)
+    )))
+    tasks.append(asyncio.create_task(form_reminders_processing_task()))
+    tasks.append(asyncio.create_task(outbound_dispatcher.run()))
+    tasks.append(asyncio.create_task(screening_jobs_processing_task()))
+    tasks.append(asyncio.create_task(interaction_buffer.run()))
+    return tasks
+
+
+async def shutdown() -> None:
+    '''Освобождение ресурсов процесса при остановке'''
+    shutdown_parse_executor()
+    # Записываем ответы кандидатов, которые еще не попали в БД
+    try:
+        await interaction_buffer.flush()
+    except Exception as e:
+        logger.error(f'Error flushing bot interactions on shutdown: {str(e)}')
+    # Отправляем оставшиеся в очереди уведомления, пока сессия бота еще открыта
+    try:
+        await outbound_dispatcher.drain()
+    except Exception as e:
+        logger.error(f'Error sending outbound messages on shutdown: {str(e)}')
+    await async_engine.dispose()
+    await bot.session.close()
+    logger.info('Bot session closed.')
+
+
+async def main() -> None:
+    try:
         '''
             Сборка основных корутин приложения:
-                - resume_processing: парсинг резюме HH по URL.
                 - set_bot_commands: меню всплывающих команд Telegram бота.
                 - bot_task: основной цикл работы Telegram бота, запуск получения событий.
-                - check_abandoned_forms: проверка брошенных анкет и отправка напоминаний.
+                - фоновые задачи процесса (см. start_background_tasks).
                 - direct_prompts_to_gigachat: прямое общение с моделью GigaChat [DEV MODE ONLY]
         ''' 
-        resumes_processing = asyncio.create_task(resumes_processing_task(delay_hours=24))
-        set_bot_commands = asyncio.create_task(bot.set_my_commands(commands=commands))
+        await warm_up()
+        
+        set_bot_commands = asyncio.create_task(bot.set_my_commands(commands=BOT_COMMANDS))
         bot_task = asyncio.create_task(dp.start_polling(bot))
-        abandoned_forms_checks = asyncio.create_task(check_abandoned_forms(bot=bot, delay_minutes=30))
-
+        background_tasks = start_background_tasks()
+        
         await asyncio.gather(
-            resumes_processing,
             set_bot_commands,
             bot_task,
-            abandoned_forms_checks,
+            *background_tasks,
         )
     except Exception as e:
         logger.error(f'Error occured: {e}', exc_info=True)
     finally:
-        await bot.session.close()
-        logger.info('Bot session closed.')
+        await shutdown()
     
 if __name__ == "__main__":
     try:
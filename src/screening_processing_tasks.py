@@ -0,0 +1,282 @@
+import os
+import logging
+import asyncio
+
+from typing import List, NamedTuple
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from sqlalchemy import or_, and_
+
+from src.database.session import Session
+from src.database.models import AnalysisResult, HrNotification, Resume, ScreeningJob
+from src.database.models.screening_job import ScreeningJobStatus
+
+from src.bot.utils.bot_answers_json_builder import build_json
+from src.gigachat_module.telegram_screening import TelegramScreening
+
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# Количество анкет, одновременно находящихся на скрининге
+SCREENING_JOB_WORKERS = int(os.getenv("SCREENING_JOB_WORKERS", "4"))
+# Максимальное количество попыток обработки одной анкеты
+SCREENING_JOB_MAX_ATTEMPTS = int(os.getenv("SCREENING_JOB_MAX_ATTEMPTS", "5"))
+# Базовая пауза перед повторной попыткой, удваивается с каждой попыткой
+SCREENING_JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("SCREENING_JOB_RETRY_BACKOFF_SECONDS", "30"))
+# Через сколько секунд задача, взятая упавшим воркером, снова становится доступной
+SCREENING_JOB_LEASE_SECONDS = int(os.getenv("SCREENING_JOB_LEASE_SECONDS", "600"))
+# Как часто проверять очередь, если новых задач не поступало
+SCREENING_JOB_POLL_SECONDS = int(os.getenv("SCREENING_JOB_POLL_SECONDS", "5"))
+
+# Будит воркер сразу после постановки задачи в очередь этим же процессом
+screening_jobs_wakeup = asyncio.Event()
+
+# Скрининг опросников использует общий пул GigaChat клиентов,
+# поэтому один экземпляр обслуживает все задачи
+tg_screener = TelegramScreening()
+
+
+class _ClaimedJob(NamedTuple):
+    id: int
+    candidate_id: int
+    application_id: int
+    vacancy_id: int
+    attempts: int
+
+
+def _utcnow() -> datetime:
+    '''
+        Текущее время UTC без tzinfo: так время задач хранится в БД
+        (asyncpg не принимает aware datetime для колонок DateTime)
+    '''
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_screening_job(db, candidate_id: int, application_id: int, vacancy_id: int) -> ScreeningJob:
+    '''
+    Поставить анкету в очередь на скрининг GigaChat
+    
+    Задача добавляется в переданную сессию и сохраняется вместе с ее транзакцией,
+    поэтому смена статуса отклика и постановка в очередь происходят атомарно.
+    После commit() нужно вызвать notify_screening_jobs().
+    '''
+    now = _utcnow()
+    job = ScreeningJob(
+        candidate_id=candidate_id,
+        application_id=application_id,
+        vacancy_id=vacancy_id,
+        status=ScreeningJobStatus.PENDING,
+        attempts=0,
+        run_after=now,
+        created_at=now
+    )
+    db.add(job)
+    return job
+
+
+def notify_screening_jobs() -> None:
+    '''Разбудить воркер скрининга, не дожидаясь следующего опроса очереди'''
+    screening_jobs_wakeup.set()
+
+
+def _claim_jobs(limit: int) -> List[_ClaimedJob]:
+    '''Взять в работу до limit готовых задач, не блокируясь на задачах других воркеров'''
+    now = _utcnow()
+    lease_expired_at = now - timedelta(seconds=SCREENING_JOB_LEASE_SECONDS)
+    with Session() as db:
+        # Задачи с истекшей арендой, у которых не осталось попыток, больше не берутся в работу:
+        # иначе анкета, на которой падает воркер, обрабатывалась бы бесконечно
+        exhausted = db.query(ScreeningJob).filter(
+            ScreeningJob.status == ScreeningJobStatus.PROCESSING,
+            ScreeningJob.locked_at < lease_expired_at,
+            ScreeningJob.attempts >= SCREENING_JOB_MAX_ATTEMPTS
+        ).update(
+            {
+                ScreeningJob.status: ScreeningJobStatus.FAILED,
+                ScreeningJob.finished_at: now,
+                ScreeningJob.last_error: 'Lease expired on the last attempt'
+            },
+            synchronize_session=False
+        )
+        if exhausted:
+            logger.error(f'{exhausted} screening jobs failed: lease expired after {SCREENING_JOB_MAX_ATTEMPTS} attempts')
+        
+        jobs = db.query(ScreeningJob).filter(
+            or_(
+                and_(
+                    ScreeningJob.status == ScreeningJobStatus.PENDING,
+                    ScreeningJob.run_after <= now
+                ),
+                # Задачи, взятые воркером, который упал, не завершив обработку
+                and_(
+                    ScreeningJob.status == ScreeningJobStatus.PROCESSING,
+                    ScreeningJob.locked_at < lease_expired_at,
+                    ScreeningJob.attempts < SCREENING_JOB_MAX_ATTEMPTS
+                )
+            )
+        ).order_by(
+            ScreeningJob.run_after
+        ).limit(limit).with_for_update(skip_locked=True).all()
+        
+        claimed = []
+        for job in jobs:
+            job.status = ScreeningJobStatus.PROCESSING
+            job.locked_at = now
+            job.attempts += 1
+            claimed.append(_ClaimedJob(
+                id=job.id,
+                candidate_id=job.candidate_id,
+                application_id=job.application_id,
+                vacancy_id=job.vacancy_id,
+                attempts=job.attempts
+            ))
+        db.commit()
+        return claimed
+
+
+def _lock_own_job(db, job: _ClaimedJob):
+    '''Заблокировать задачу, если она все еще принадлежит этой попытке обработки'''
+    row = db.query(ScreeningJob).filter_by(id=job.id).with_for_update().first()
+    if not row or row.status != ScreeningJobStatus.PROCESSING or row.attempts != job.attempts:
+        # Аренда истекла, и задачу уже забрал другой воркер
+        return None
+    return row
+
+
+def _complete_job(job: _ClaimedJob, score: int) -> None:
+    '''Сохранить результат скрининга и уведомление для HR в одной транзакции с закрытием задачи'''
+    now = _utcnow()
+    with Session() as db:
+        row = _lock_own_job(db, job)
+        if row is None:
+            logger.warning(f'Screening job {job.id} was reclaimed, dropping result of attempt {job.attempts}')
+            return
+        
+        # Сохраняем результаты обработки нейросетью
+        analysis_result = AnalysisResult(
+            candidate_id=job.candidate_id,
+            application_id=job.application_id,
+            gigachat_score=score,
+            # TODO:
+            # - Решение должно зависеть от оценки GigaChat
+            final_decision="approve" if score > 30 else "reject",
+            processed_at=now
+        )
+        db.add(analysis_result)
+        
+        # Оценка по резюме для сортировки списка решений. Строка резюме блокируется, чтобы
+        # одновременное сохранение оценки резюме не прошло мимо создаваемого уведомления
+        resume_score = db.query(Resume.gigachat_score).filter_by(
+            application_id=job.application_id
+        ).with_for_update().scalar()
+        
+        # Создаем уведомления для HR
+        notification = HrNotification(
+            candidate_id=job.candidate_id,
+            application_id=job.application_id,
+            vacancy_id=job.vacancy_id,
+            analysis_score=score,
+            combined_score=score + (resume_score or 0),
+            final_decision=analysis_result.final_decision,
+            status="new",
+            sent_at=now
+        )
+        db.add(notification)
+        
+        row.status = ScreeningJobStatus.DONE
+        row.finished_at = now
+        row.last_error = None
+        db.commit()
+
+
+def _fail_job(job: _ClaimedJob, error: Exception) -> None:
+    '''Отложить задачу на повтор с экспоненциальной паузой или пометить ее как проваленную'''
+    now = _utcnow()
+    with Session() as db:
+        row = _lock_own_job(db, job)
+        if row is None:
+            return
+        
+        row.last_error = str(error)
+        if job.attempts >= SCREENING_JOB_MAX_ATTEMPTS:
+            row.status = ScreeningJobStatus.FAILED
+            row.finished_at = now
+            logger.error(f'Screening job {job.id} failed after {job.attempts} attempts: {str(error)}')
+        else:
+            row.status = ScreeningJobStatus.PENDING
+            row.run_after = now + timedelta(
+                seconds=SCREENING_JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            )
+        db.commit()
+
+
+async def _process_job(job: _ClaimedJob) -> None:
+    '''Отправить ответы кандидата в GigaChat и уведомить о результатах HR-специалистов'''
+    try:
+        # Собираем ответы кандидата
+        # Синхронные запросы к БД выполняются в потоке, чтобы не останавливать обработчики бота
+        answers = await asyncio.to_thread(
+            build_json,
+            application_id=job.application_id,
+            vacancy_id=job.vacancy_id
+        )
+        # Отправляем ответы кандидата на оценку в GigaChat
+        telegram_screening_score = await tg_screener.screen_answers(
+            candidate_responses_json=answers,
+            vacancy_id=job.vacancy_id,
+            raise_errors=True
+        )
+        try:
+            score = int(telegram_screening_score)
+        except (ValueError, TypeError):
+            score = 0
+        
+        await asyncio.to_thread(_complete_job, job, score)
+    except Exception as e:
+        logger.error(f'Error processing screening job {job.id}: {str(e)}')
+        try:
+            await asyncio.to_thread(_fail_job, job, e)
+        except Exception as e:
+            logger.error(f'Failed to reschedule screening job {job.id}: {str(e)}')
+
+
+async def screening_jobs_processing_task(
+    workers: int = SCREENING_JOB_WORKERS,
+    poll_seconds: int = SCREENING_JOB_POLL_SECONDS
+) -> None:
+    '''
+    Воркер очереди скрининга анкет
+    
+    Держит в работе до workers задач одновременно: как только одна задача
+    завершается, из очереди забирается следующая. Задачи переживают перезапуск
+    бота - незавершенные будут снова взяты в работу после истечения аренды.
+    
+    Args:
+        workers (int): Количество одновременно обрабатываемых задач
+        poll_seconds (int): Интервал опроса очереди при отсутствии новых задач
+    '''
+    workers = max(1, workers)
+    running = set()
+    while True:
+        try:
+            # Сбрасываем сигнал до выборки, чтобы не пропустить задачу, поставленную во время нее
+            screening_jobs_wakeup.clear()
+            free_slots = workers - len(running)
+            if free_slots > 0:
+                for job in await asyncio.to_thread(_claim_jobs, free_slots):
+                    running.add(asyncio.create_task(_process_job(job)))
+            
+            wakeup = asyncio.create_task(screening_jobs_wakeup.wait())
+            try:
+                done, _ = await asyncio.wait(
+                    running | {wakeup},
+                    timeout=poll_seconds,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                wakeup.cancel()
+            running -= done
+        except Exception as e:
+            logger.error(f'Error in screening_jobs_processing_task: {str(e)}', exc_info=True)
+            await asyncio.sleep(poll_seconds)
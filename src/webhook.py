@@ -0,0 +1,194 @@
+import os
+import time
+import signal
+import asyncio
+import logging
+import multiprocessing
+
+from typing import Dict
+from multiprocessing.connection import wait
+from aiohttp import web
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from dotenv import load_dotenv
+
+from src.main import BOT_COMMANDS, warm_up, start_background_tasks, shutdown
+from src.bot.core.bot import bot, dp
+from src.bot.utils.outbound_dispatcher import outbound_dispatcher, OUTBOUND_MESSAGES_PER_SECOND
+from src.database.utils.questionnaire_cache import questionnaire_cache
+from src.gigachat_module.client import gigachat_pool, REQUESTS_PER_SECOND
+
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+
+'''
+    Запуск Telegram бота в режиме webhook несколькими процессами
+    
+    Альтернатива src/main.py (long polling в одном процессе): Telegram сам присылает апдейты
+    на WEBHOOK_BASE_URL + WEBHOOK_PATH, а их обработка распределяется между WEBHOOK_WORKERS
+    процессами, которые слушают один порт (SO_REUSEPORT, балансирует ядро). Снаружи порт
+    закрывается локальным reverse proxy с TLS, например nginx:
+        
+        location /telegram/webhook {
+            proxy_pass http://127.0.0.1:8081;
+        }
+    
+    Состояния FSM хранятся в MongoStorage, а данные - в PostgreSQL, поэтому любой процесс может
+    обработать любой апдейт. Задачи, которые должны работать в одном экземпляре на всю систему
+    (resumes_processing_task, check_abandoned_forms), запускает только процесс-лидер (LeaderElection).
+    
+    Кэши и буферы в памяти у каждого процесса свои:
+        - interaction_buffer: ответы, пришедшие в разные процессы, записываются в БД каждым
+          процессом отдельно, поэтому отправка и приостановка анкеты записывают ответы из
+          состояния FSM, а устаревший снимок из буфера не перезаписывает более новые данные.
+        - questionnaire_cache: правка вопросов админом сбрасывает кэш только в том процессе,
+          который ее обработал, остальные видят старую анкету до истечения TTL. Поэтому в
+          режиме webhook TTL кэша анкет короче (WEBHOOK_QUESTIONNAIRE_CACHE_TTL_SECONDS).
+    
+    Лимиты внешних API заданы на всю систему, а соблюдаются каждым процессом отдельно, поэтому
+    делятся на количество процессов: OUTBOUND_MESSAGES_PER_SECOND бота Telegram, а также
+    GIGACHAT_REQUESTS_PER_SECOND и размер пула GigaChat (скрининг анкет идет в каждом процессе).
+    Лимит одновременных запросов к GigaChat не меньше одного на процесс, поэтому при
+    WEBHOOK_WORKERS больше GIGACHAT_POOL_SIZE всего одновременных запросов будет WEBHOOK_WORKERS.
+    
+    Запуск:
+        python -m src.webhook
+'''
+
+
+# Публичный адрес, на который Telegram отправляет апдейты (https://bot.example.com)
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+# Секрет из заголовка X-Telegram-Bot-Api-Secret-Token, отсекает запросы не от Telegram
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+# Локальный адрес, на который reverse proxy перенаправляет запросы
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8081"))
+# Количество процессов-обработчиков
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", str(os.cpu_count() or 1)))
+# Сколько запросов с апдейтами Telegram может держать открытыми одновременно (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+# Время жизни анкеты в кэше процесса-обработчика (в секундах): столько другие процессы
+# могут показывать кандидатам анкету без правок, сделанных админом
+WEBHOOK_QUESTIONNAIRE_CACHE_TTL_SECONDS = float(os.getenv("WEBHOOK_QUESTIONNAIRE_CACHE_TTL_SECONDS", "15"))
+
+
+async def _health(request: web.Request) -> web.Response:
+    return web.Response(text='ok')
+
+
+async def _serve_worker(index: int, workers: int) -> None:
+    '''Процесс-обработчик: HTTP сервер webhook и фоновые задачи процесса'''
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    # Лимит исходящих сообщений Telegram общий на бота, делим его между процессами
+    outbound_dispatcher.set_rate(OUTBOUND_MESSAGES_PER_SECOND / workers)
+    # Лимиты GigaChat тоже заданы на всю систему: каждый процесс скринит анкеты своим пулом
+    gigachat_pool.set_limits(REQUESTS_PER_SECOND / workers, max(1, gigachat_pool.size // workers))
+    # Сброс кэша анкет при правке вопросов не доходит до других процессов, ограничиваем устаревание
+    questionnaire_cache.ttl = WEBHOOK_QUESTIONNAIRE_CACHE_TTL_SECONDS
+    await warm_up()
+    
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET
+    ).register(app, path=WEBHOOK_PATH)
+    app.router.add_get('/health', _health)
+    setup_application(app, dp, bot=bot)
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    background_tasks = []
+    try:
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT, reuse_port=True).start()
+        background_tasks = start_background_tasks()
+        logger.info(f'Webhook worker {index} is listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}')
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await shutdown()
+
+
+def _run_worker(index: int, workers: int) -> None:
+    try:
+        asyncio.run(_serve_worker(index, workers))
+    except Exception as e:
+        logger.error(f'Webhook worker {index} crashed: {e}', exc_info=True)
+        raise
+
+
+async def _configure_webhook() -> None:
+    '''Зарегистрировать webhook и меню команд (один раз, до запуска процессов-обработчиков)'''
+    try:
+        await bot.set_webhook(
+            url=WEBHOOK_BASE_URL.rstrip('/') + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=dp.resolve_used_update_types(),
+            max_connections=WEBHOOK_MAX_CONNECTIONS
+        )
+        await bot.set_my_commands(commands=BOT_COMMANDS)
+    finally:
+        await bot.session.close()
+
+
+def main() -> None:
+    '''
+    Процесс-супервизор: регистрирует webhook, запускает WEBHOOK_WORKERS процессов-обработчиков
+    и перезапускает упавшие. По SIGINT/SIGTERM останавливает обработчики и завершается.
+    '''
+    if not WEBHOOK_BASE_URL:
+        raise RuntimeError('WEBHOOK_BASE_URL is not set')
+    workers_count = max(1, WEBHOOK_WORKERS)
+    asyncio.run(_configure_webhook())
+    
+    # spawn: каждый обработчик заново импортирует модули и создает свои подключения к БД, Mongo и Telegram
+    context = multiprocessing.get_context('spawn')
+    
+    def start_worker(index: int) -> multiprocessing.Process:
+        process = context.Process(target=_run_worker, args=(index, workers_count), name=f'webhook-worker-{index}')
+        process.start()
+        return process
+    
+    stopping = False
+    
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    workers: Dict[int, multiprocessing.Process] = {index: start_worker(index) for index in range(workers_count)}
+    try:
+        while not stopping:
+            wait([process.sentinel for process in workers.values()], timeout=1)
+            if stopping:
+                break
+            for index, process in list(workers.items()):
+                if not process.is_alive():
+                    logger.error(f'Webhook worker {index} exited with code {process.exitcode}, restarting')
+                    # Пауза, чтобы не перезапускать в цикле процесс, падающий на старте
+                    time.sleep(1)
+                    workers[index] = start_worker(index)
+    finally:
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+        for process in workers.values():
+            process.join(timeout=30)
+
+
+if __name__ == "__main__":
+    print('Power on (webhook mode)...')
+    main()
+    print("Turning off...")
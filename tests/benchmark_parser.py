@@ -0,0 +1,134 @@
+'''
+    Сравнение движков разбора резюме (bs4 / lxml) на сохраненных страницах HH
+
+    Запуск:
+        python -m tests.benchmark_parser [каталог со страницами *.html] [--repeat N]
+
+    По умолчанию берутся страницы из tests/fixtures/hh_resume_pages: разметка страниц резюме
+    HH (шапка и подвал приложения, JSON состояния в template, svg, скрипты) с вымышленными
+    данными кандидатов. Для каждой страницы проверяется, что оба движка возвращают одинаковый
+    ResumeData, затем выводится среднее время разбора страницы каждым движком и ускорение.
+    К страницам всегда добавляются встроенные пограничные страницы (EDGE_CASE_PAGES): пустые
+    теги, текст внутри script/style/template и вложенность, которую lxml исправляет иначе,
+    чем html.parser.
+'''
+import os
+import sys
+import time
+import logging
+import argparse
+
+from src.gigachat_module.parser import _parse_html_bs4
+from src.gigachat_module.parser_lxml import parse_html_lxml
+
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(__file__), 'fixtures', 'hh_resume_pages')
+
+_EXPERIENCE_BLOCK = (
+    '<div data-qa="resume-block-experience"><div class="resume-block-item-gap">'
+    '<div class="bloko-text bloko-text_strong">{company}</div>'
+    '<div data-qa="resume-block-experience-position">{position}</div>'
+    '<div class="bloko-column bloko-column_xs-4 bloko-column_s-2 bloko-column_m-2 bloko-column_l-2">{period}</div>'
+    '<div data-qa="resume-block-experience-description">{description}</div>'
+    '</div></div>'
+)
+
+# Страницы с найденными, но пустыми тегами
+EDGE_CASE_PAGES = {
+    'edge_empty_name.html': '<html><body><h2 data-qa="resume-personal-name"></h2></body></html>',
+    'edge_empty_personal.html': (
+        '<html><body>'
+        '<span data-qa="resume-personal-address"></span>'
+        '<span data-qa="job-search-status"></span>'
+        '<span data-qa="resume-block-title-position"></span>'
+        '<span data-qa="resume-personal-age"></span>'
+        '<span data-qa="resume-block-salary"></span>'
+        '</body></html>'
+    ),
+    'edge_empty_relocation.html': '<html><body><div class="bloko-translate-guard"><p></p></div></body></html>',
+    'edge_empty_sections.html': (
+        '<html><body>'
+        '<div data-qa="resume-block-experience"></div>'
+        '<div data-qa="skills-table"></div>'
+        '</body></html>'
+    ),
+    'edge_empty_period.html': '<html><body>' + _EXPERIENCE_BLOCK.format(
+        company='ООО Ромашка', position='Продавец', period='', description='Работа с клиентами'
+    ) + '</body></html>',
+    'edge_empty_experience_fields.html': '<html><body>' + _EXPERIENCE_BLOCK.format(
+        company='', position='', period='', description=''
+    ) + '</body></html>',
+    # Текст внутри script, style и template не входит в get_text() BeautifulSoup
+    'edge_script_in_name.html': '<html><body><h2 data-qa="resume-personal-name">Иван<script>var a=1</script></h2></body></html>',
+    'edge_template_skills.html': (
+        '<html><body><div data-qa="skills-table"><span>Excel</span>'
+        '<template><span>Скрытый навык</span></template></div></body></html>'
+    ),
+    'edge_style_in_citizenship.html': '<html><body><p>Гражданство: <style>p{color:red}</style>Россия</p></body></html>',
+    # Вложенность, которую libxml2 исправляет, а html.parser оставляет как есть
+    'edge_div_in_paragraph.html': (
+        '<html><body><div class="resume-block-container">'
+        '<p>Занятость: <div>полная</div></p><p>График работы: сменный</p>'
+        '</div></body></html>'
+    ),
+    'edge_unclosed_paragraph.html': (
+        '<html><body><div class="resume-block-container">'
+        '<p>Занятость: полная<p>График работы: сменный'
+        '</div></body></html>'
+    ),
+}
+
+
+def _load_pages(directory: str) -> dict:
+    pages = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, file_name), 'r', encoding='utf-8') as file:
+                pages[file_name] = file.read()
+    return pages
+
+
+def _measure(engine, pages: dict, repeat: int) -> float:
+    '''Среднее время разбора одной страницы в миллисекундах'''
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        for file_name, html in pages.items():
+            engine(html, file_name, 0)
+    return (time.perf_counter() - started_at) * 1000 / (repeat * len(pages))
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description='Benchmark bs4 vs lxml resume parsing')
+    arg_parser.add_argument('directory', nargs='?', default=FIXTURES_DIRECTORY, help='Directory with saved resume pages (*.html)')
+    arg_parser.add_argument('--repeat', type=int, default=10, help='How many times to parse each page')
+    args = arg_parser.parse_args()
+
+    # Ошибки извлечения отдельных полей на неполных страницах ожидаемы и не интересны для замера
+    logging.disable(logging.CRITICAL)
+
+    pages = _load_pages(args.directory)
+    if not pages:
+        print(f'No *.html pages found in {args.directory}')
+        return 1
+    pages.update(EDGE_CASE_PAGES)
+
+    mismatches = 0
+    for file_name, html in pages.items():
+        expected = _parse_html_bs4(html, file_name, 0)
+        actual = parse_html_lxml(html, file_name, 0)
+        if expected != actual:
+            mismatches += 1
+            print(f'MISMATCH {file_name}:\n  bs4:  {expected}\n  lxml: {actual}')
+
+    bs4_ms = _measure(_parse_html_bs4, pages, args.repeat)
+    lxml_ms = _measure(parse_html_lxml, pages, args.repeat)
+
+    print(f'Pages: {len(pages)}, repeat: {args.repeat}, mismatches: {mismatches}')
+    print(f'bs4:  {bs4_ms:.2f} ms/page')
+    print(f'lxml: {lxml_ms:.2f} ms/page')
+    print(f'Speedup: {bs4_ms / lxml_ms:.1f}x')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+'''
+    Нагрузочный замер скрининга (ResumeScreening / TelegramScreening) на фейковом GigaChat
+    
+    Запуск:
+        python -m tests.benchmark_screening [--resumes 200] [--answers 200] [--concurrency 20]
+            [--batched] [--pool-size 5] [--rps 5] [--latency lognormal:0.8:0.5] [--error-rate 0.05]
+    
+    По умолчанию поднимает tests/fake_gigachat_server.py в этом же процессе на --port,
+    с --url использует уже запущенный сервер. Прогоняет N синтетических резюме через
+    screen_resume и N наборов ответов через screen_answers, не больше --concurrency
+    скринингов одновременно, и выводит p50/p99 времени одного скрининга, скринингов в секунду
+    и статистику запросов к серверу. Скрининг, в котором хотя бы один запрос к GigaChat
+    не удался после повторов, считается в failures.
+    
+    Скрининг идет без запросов к БД, но модуль telegram_screening при импорте создает
+    движок SQLAlchemy из переменных DB_DRIVER, ASYNC_DB_DRIVER, DB_USER, DB_PASSWORD,
+    DB_HOST и DB_NAME (.env). Поэтому для --answers они должны быть заданы, а драйверы -
+    установлены; сама база не нужна, соединение не открывается. Например:
+        DB_DRIVER=postgresql+psycopg2 DB_USER=bench DB_PASSWORD=bench DB_HOST=localhost DB_NAME=bench \
+            python -m tests.benchmark_screening --resumes 0 --answers 200
+'''
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import statistics
+
+from typing import Awaitable, Callable, List
+
+from tests.fake_gigachat_server import add_server_arguments, server_from_arguments
+
+
+# Тексты вопросов и критериев для синтетических анкет
+_QUESTIONS = [
+    ('Почему вы хотите работать у нас?', 'Оцени мотивацию кандидата от 0 до 10.'),
+    ('Опишите конфликт с клиентом и как вы его решили', 'Оцени клиентоориентированность кандидата от 0 до 10.'),
+    ('Готовы ли вы к сменному графику?', 'Оцени готовность к сменной работе от 0 до 10.'),
+    ('Какими программами вы владеете?', 'Оцени компьютерную грамотность от 0 до 10.'),
+]
+_SKILLS = ['Работа с клиентами', 'Excel', '1С', 'Кассовая дисциплина', 'Продажи', 'Грамотная речь', 'Работа в команде']
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _make_resume(index: int):
+    from src.gigachat_module.parser import ResumeData, WorkExperienceInfo, EmploymentInfo
+    
+    experiences = [
+        WorkExperienceInfo(
+            company=f'Компания {index}-{number}',
+            position=random.choice(['Продавец-консультант', 'Оператор call-центра', 'Кассир']),
+            period=(f'20{10 + number}-0{random.randint(1, 9)}', None if number == 0 else f'20{11 + number}-12'),
+            description='Консультирование клиентов, работа с кассой, выкладка товара. ' * random.randint(1, 5)
+        )
+        for number in range(random.randint(0, 3))
+    ]
+    return ResumeData(
+        link=f'https://hh.ru/resume/{index:08x}',
+        vacancy_id=1,
+        name=f'Кандидат {index}',
+        age=random.randint(18, 50),
+        birthdate=None,
+        address='Екатеринбург',
+        citizenship='Россия',
+        ready_to_relocate=False,
+        job_search_status='Активно ищет работу',
+        salary=random.choice([None, 30000, 45000, 70000]),
+        position='Продавец-консультант',
+        skills=random.sample(_SKILLS, random.randint(0, 4)) or None,
+        experiences=experiences or None,
+        employment=EmploymentInfo(employment_type='полная занятость', work_schedule='сменный график')
+    )
+
+
+def _make_answers(index: int) -> str:
+    return json.dumps(
+        {question: f'Ответ кандидата {index}. ' * random.randint(1, 10) for question, _ in _QUESTIONS},
+        ensure_ascii=False
+    )
+
+
+def _synthetic_telegram_screening(pool):
+    from sqlalchemy.exc import ArgumentError
+    from langchain_core.messages import HumanMessage
+    from src.gigachat_module.utils.formatters import candidate_answers_formatter
+    
+    try:
+        from src.gigachat_module.telegram_screening import TelegramScreening
+    except (ArgumentError, ImportError) as e:
+        raise SystemExit(
+            'screen_answers benchmark needs DB_DRIVER, ASYNC_DB_DRIVER, DB_USER, DB_PASSWORD, DB_HOST '
+            f'and DB_NAME to build the SQLAlchemy engine (no connection is opened): {str(e)}'
+        )
+    
+    class SyntheticTelegramScreening(TelegramScreening):
+        '''Вопросы и критерии скрининга берутся из _QUESTIONS, а не из БД'''
+        def _collect_tasks(
+            self,
+            candidate_responses_json: str,
+            vacancy_id: int,
+            raise_errors: bool = False
+        ) -> List[HumanMessage]:
+            return [
+                HumanMessage(content=(
+                    f'{criteria}\n'
+                    f'{candidate_answers_formatter(candidate_responses_json, [question])}'
+                ))
+                for question, criteria in _QUESTIONS
+            ]
+    
+    return SyntheticTelegramScreening(pool=pool)
+
+
+async def _run(name: str, jobs: List[Callable[[], Awaitable[int]]], concurrency: int) -> None:
+    '''Выполнить скрининги не больше concurrency одновременно и вывести статистику'''
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    
+    async def run_job(job):
+        nonlocal failures
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await job()
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started_at)
+    
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_job(job) for job in jobs))
+    elapsed = time.perf_counter() - started_at
+    
+    print(
+        f'{name}: {len(jobs)} screenings in {elapsed:.1f}s, {len(jobs) / elapsed:.2f} screenings/s, '
+        f'p50 {_percentile(latencies, 50):.2f}s, p99 {_percentile(latencies, 99):.2f}s, '
+        f'mean {statistics.mean(latencies):.2f}s, failures {failures}'
+    )
+
+
+async def _benchmark(args: argparse.Namespace) -> int:
+    server = None
+    if args.url is None:
+        server = server_from_arguments(args)
+        await server.start(port=args.port)
+    
+    try:
+        from src.gigachat_module.client import GigaChatClientPool
+        from src.gigachat_module.resume_screening import ResumeScreening
+        
+        # Без кэша ответов: каждый скрининг должен доходить до сервера
+        pool = GigaChatClientPool(size=args.pool_size, cache=None, requests_per_second=args.rps)
+        await pool.warm_up()
+        
+        if args.resumes:
+            resume_screening = ResumeScreening(pool=pool, batched=args.batched)
+            resumes = [_make_resume(index) for index in range(args.resumes)]
+            await _run(
+                'screen_resume',
+                [lambda resume=resume: resume_screening.screen_resume(resume, raise_errors=True) for resume in resumes],
+                args.concurrency
+            )
+        
+        if args.answers:
+            telegram_screening = _synthetic_telegram_screening(pool)
+            answer_sets = [_make_answers(index) for index in range(args.answers)]
+            await _run(
+                'screen_answers',
+                [
+                    lambda answers=answers: telegram_screening.screen_answers(answers, vacancy_id=1, raise_errors=True)
+                    for answers in answer_sets
+                ],
+                args.concurrency
+            )
+        
+        if server is not None:
+            print(f'Fake GigaChat: {server.stats}')
+        print(f'Pool concurrency limit at the end: {pool.concurrency_limiter.limit}')
+        return 0
+    finally:
+        if server is not None:
+            await server.stop()
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description='Benchmark resume and Telegram answers screening against a fake GigaChat')
+    arg_parser.add_argument('--resumes', type=int, default=200, help='How many synthetic resumes to screen')
+    arg_parser.add_argument('--answers', type=int, default=200, help='How many synthetic answer sets to screen')
+    arg_parser.add_argument('--concurrency', type=int, default=20, help='How many screenings run at once')
+    arg_parser.add_argument('--batched', action='store_true', help='Screen all resume criteria with one request')
+    arg_parser.add_argument('--pool-size', type=int, default=5, help='GigaChatClientPool size')
+    arg_parser.add_argument('--rps', type=float, default=5, help='GigaChatClientPool requests per second')
+    arg_parser.add_argument('--url', default=None, help='Use an already running fake server instead of starting one')
+    arg_parser.add_argument('--port', type=int, default=8090, help='Port of the in-process fake server')
+    arg_parser.add_argument('--seed', type=int, default=None, help='Random seed for synthetic data')
+    add_server_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    
+    random.seed(args.seed)
+    # Предупреждения о повторах после 429 ожидаемы при --error-rate и засоряют отчет
+    logging.basicConfig(level=logging.ERROR)
+    
+    # Адреса задаются до импорта src.gigachat_module: клиент читает их при импорте
+    base_url = (args.url or f'http://127.0.0.1:{args.port}').rstrip('/')
+    os.environ['GIGACHAT_BASE_URL'] = f'{base_url}/api/v1'
+    os.environ['GIGACHAT_AUTH_URL'] = f'{base_url}/api/v2/oauth'
+    os.environ.setdefault('GIGACHAT_AUTH_KEY', 'fake-auth-key')
+    
+    return asyncio.run(_benchmark(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+'''
+    Проверка кодирования токенов keyset-пагинации (src/bot/utils/pagination.py)
+
+    Запуск:
+        python -m tests.check_pagination_tokens
+
+    Каждый набор значений ключа кодируется в токен и разбирается обратно: результат должен
+    совпасть с исходным. Среди значений - числа, base-36 запись которых начинается с любой
+    буквы (например, 29 = 't', 1050 = 't6'), отрицательные числа, даты и NULL.
+'''
+import sys
+
+from datetime import datetime
+
+from src.bot.utils.pagination import decode_token, encode_token
+
+
+# Числа, запись которых начинается с каждой цифры base-36, в том числе с букв
+INT_VALUES = [0, 1, 9, 10, 29, 35, 36, 1044, 1050, 1079, 46655, 2 ** 31 - 1, 2 ** 63 - 1, -1, -29, -1050]
+DATETIME_VALUES = [
+    datetime(1970, 1, 1),
+    datetime(1970, 1, 1, 0, 0, 0, 6),
+    datetime(2025, 5, 17, 12, 30, 45, 123456),
+    datetime(1969, 12, 31, 23, 59, 59)
+]
+
+
+def _cases():
+    for value in INT_VALUES + DATETIME_VALUES + [None]:
+        yield [value]
+    for value in INT_VALUES:
+        yield [0, 3, value]
+        yield [None, value]
+    for moment in DATETIME_VALUES:
+        yield [moment, 29]
+
+
+def main() -> int:
+    failures = 0
+    cases = 0
+    for direction in ('n', 'p'):
+        for page, total in ((0, 0), (1, 50), (29, 1050)):
+            for values in _cases():
+                cases += 1
+                token = encode_token(direction, page, total, values)
+                try:
+                    decoded = decode_token(token)
+                except ValueError as e:
+                    decoded = e
+                if decoded != (direction, page, total, values):
+                    failures += 1
+                    print(f'MISMATCH {token}: expected {(direction, page, total, values)}, got {decoded}')
+
+    print(f'Tokens: {cases}, mismatches: {failures}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+'''
+    Локальный фейковый сервер GigaChat API для нагрузочных замеров без обращения к Сберу
+    
+    Запуск:
+        python -m tests.fake_gigachat_server [--port 8090] [--latency lognormal:0.8:0.5]
+            [--error-rate 0.05] [--error-status 429] [--retry-after 1] [--scores 0,5,10]
+    
+    Бот и бенчмарки направляются на сервер переменными окружения:
+        GIGACHAT_AUTH_URL=http://127.0.0.1:8090/api/v2/oauth
+        GIGACHAT_BASE_URL=http://127.0.0.1:8090/api/v1
+    
+    Сервер отвечает на запрос OAuth токена и на /chat/completions: ждет случайную задержку
+    из заданного распределения, с заданной вероятностью возвращает ошибку, иначе - оценку
+    из сценария (число, а для пакетного скрининга резюме - JSON с оценкой каждого критерия).
+    GET /stats возвращает счетчики запросов, ошибок и максимум одновременных запросов.
+'''
+import re
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import itertools
+
+from typing import Callable, Dict, Optional
+from aiohttp import web
+
+
+# Строки критериев в запросе пакетного скрининга резюме: "[work_experience] текст критерия"
+_BATCH_CRITERIA_RE = re.compile(r'^\[(\w+)\]', re.MULTILINE)
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    '''
+    Распределение задержки ответа (в секундах):
+        fixed:0.5            - всегда 0.5
+        uniform:0.2:1.5      - равномерно от 0.2 до 1.5
+        lognormal:0.8:0.5    - логнормальное с медианой 0.8 и sigma 0.5 (длинный хвост, как у LLM)
+        exp:0.5              - экспоненциальное со средним 0.5
+    '''
+    kind, *params = spec.split(':')
+    values = [float(param) for param in params]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'lognormal' and len(values) == 2:
+        import math
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    if kind == 'exp' and len(values) == 1:
+        return lambda: random.expovariate(1 / values[0])
+    raise ValueError(f'Unsupported latency spec: {spec}')
+
+
+def parse_scores(spec: str) -> Callable[[], int]:
+    '''
+    Сценарий оценок:
+        0,5,10          - по кругу
+        random:0:20     - случайное целое в диапазоне
+    '''
+    if spec.startswith('random:'):
+        low, high = (int(value) for value in spec.split(':')[1:])
+        return lambda: random.randint(low, high)
+    scores = itertools.cycle(int(value) for value in spec.split(','))
+    return lambda: next(scores)
+
+
+class FakeGigaChatServer:
+    """
+    Фейковый GigaChat API на aiohttp
+    
+    Может запускаться как отдельный процесс (main) или внутри бенчмарка (start/stop).
+    
+    Args:
+        latency (Callable[[], float]): Генератор задержки ответа в секундах
+        scores (Callable[[], int]): Генератор оценок
+        error_rate (float): Доля запросов, завершающихся ошибкой
+        error_status (int): HTTP статус ошибки (429 или 5xx)
+        retry_after (Optional[float]): Значение заголовка Retry-After для ошибок
+        token_ttl (int): Время жизни выдаваемого OAuth токена (в секундах)
+    """
+    def __init__(
+        self,
+        latency: Callable[[], float] = parse_latency('fixed:0.1'),
+        scores: Callable[[], int] = parse_scores('10'),
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: Optional[float] = None,
+        token_ttl: int = 1800
+    ):
+        self.latency = latency
+        self.scores = scores
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.stats: Dict[str, int] = {
+            'auth_requests': 0,
+            'chat_requests': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'max_in_flight': 0
+        }
+        self._runner: Optional[web.AppRunner] = None
+    
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/v2/oauth', self._oauth)
+        app.router.add_post('/api/v1/chat/completions', self._chat_completions)
+        app.router.add_get('/stats', self._stats)
+        return app
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8090) -> str:
+        '''Запустить сервер в текущем event loop, возвращает адрес сервера'''
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f'http://{host}:{port}'
+    
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    async def _oauth(self, request: web.Request) -> web.Response:
+        self.stats['auth_requests'] += 1
+        return web.json_response({
+            'access_token': f'fake-{uuid.uuid4()}',
+            'expires_at': int((time.time() + self.token_ttl) * 1000)
+        })
+    
+    def _answer(self, payload: dict) -> str:
+        user_messages = [message.get('content') or '' for message in payload.get('messages', []) if message.get('role') == 'user']
+        keys = _BATCH_CRITERIA_RE.findall(user_messages[-1]) if user_messages else []
+        if keys:
+            return json.dumps({key: self.scores() for key in keys})
+        return str(self.scores())
+    
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        self.stats['chat_requests'] += 1
+        self.stats['in_flight'] += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+        try:
+            payload = await request.json()
+            await asyncio.sleep(max(0.0, self.latency()))
+            
+            if random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else None
+                return web.json_response(
+                    {'status': self.error_status, 'message': 'Fake GigaChat error'},
+                    status=self.error_status,
+                    headers=headers
+                )
+            
+            content = self._answer(payload)
+            return web.json_response({
+                'choices': [{
+                    'message': {'role': 'assistant', 'content': content},
+                    'index': 0,
+                    'finish_reason': 'stop'
+                }],
+                'created': int(time.time()),
+                'model': payload.get('model') or 'GigaChat',
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 1, 'total_tokens': 1, 'precached_prompt_tokens': 0},
+                'object': 'chat.completion'
+            })
+        finally:
+            self.stats['in_flight'] -= 1
+    
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+
+def add_server_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    '''Параметры фейкового сервера (общие для запуска сервера и бенчмарков)'''
+    arg_parser.add_argument('--latency', default='lognormal:0.8:0.5', help='Latency distribution, e.g. fixed:0.5, uniform:0.2:1.5, lognormal:0.8:0.5, exp:0.5')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests that fail')
+    arg_parser.add_argument('--error-status', type=int, default=429, help='HTTP status of failed requests')
+    arg_parser.add_argument('--retry-after', type=float, default=None, help='Retry-After header of failed requests')
+    arg_parser.add_argument('--scores', default='random:0:10', help='Scores: comma separated cycle or random:LOW:HIGH')
+
+
+def server_from_arguments(args: argparse.Namespace) -> FakeGigaChatServer:
+    return FakeGigaChatServer(
+        latency=parse_latency(args.latency),
+        scores=parse_scores(args.scores),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after
+    )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description='Fake GigaChat API server')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8090)
+    add_server_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    
+    server = server_from_arguments(args)
+    print(f'GIGACHAT_AUTH_URL=http://{args.host}:{args.port}/api/v2/oauth')
+    print(f'GIGACHAT_BASE_URL=http://{args.host}:{args.port}/api/v1')
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,448 @@
+'''
+    Нагрузочный тест сценария анкеты кандидата (src/bot/handlers/candidate_commands.py)
+    
+    Запуск:
+        python -m tests.loadtest_candidate_flow [--candidates 1000] [--concurrency 200]
+            [--think-time 0.5] [--edit-rate 0.2] [--storage mongo|memory] [--telegram-latency 0.05]
+    
+    Внимание! Тест пишет в БД из .env (вакансию с вопросами, кандидатов, отклики, анкеты
+    и задачи скрининга) и удаляет эти записи в конце, если не указан --keep.
+    Запускать на тестовой БД, а не на боевой.
+    
+    Апдейты Telegram не приходят из сети: тест собирает Message/CallbackQuery и передает их
+    прямо в dp.feed_update, а бот отправляет ответы в FakeTelegramSession, которая ничего
+    не отправляет и только запоминает последнее сообщение в каждый чат. Каждый виртуальный
+    кандидат проходит сценарий целиком:
+        /start -> токен -> согласие -> ответы на все вопросы -> сверка (и, с вероятностью
+        --edit-rate, правка одного ответа) -> отправка анкеты
+    В конце выводятся гистограммы времени обработки апдейта и среднее количество запросов
+    к БД на апдейт по каждому шагу, а также сколько кандидатов дошло до отправки анкеты.
+'''
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import itertools
+import statistics
+
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import TelegramMethod, SendMessage, EditMessageText
+from aiogram.types import Update, Message, CallbackQuery, Chat, User, Document
+from sqlalchemy import event, delete
+
+import src.bot.utils.message_templates as msg_templates
+
+from src.bot.config import TELEGRAM_BOT_TOKEN
+from src.bot.core.bot import dp
+from src.database.session import Session, async_engine
+from src.database.utils.interaction_buffer import interaction_buffer
+from src.database.utils.generate_application_token import generate_application_token
+from src.database.models import (
+    Candidate, Application, Vacancy, BotQuestion,
+    BotInteraction, ScreeningJob, FormReminder
+)
+from src.database.models.application import ApplicationStatus
+from src.database.models.bot_question import AnswerFormat
+
+from tests.bot_questions_data import QUESTION_DATA
+
+
+# Telegram ID виртуальных кандидатов начинаются отсюда, чтобы не пересекаться с настоящими
+VIRTUAL_TELEGRAM_ID_BASE = 7_000_000_000
+# Границы корзин гистограммы времени обработки апдейта (в миллисекундах)
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+# Шаги сценария в порядке прохождения (для отчета)
+STEPS = ['start', 'token_auth', 'consent', 'answer', 'review', 'edit_open', 'edit_answer', 'submit']
+
+# Счетчик запросов к БД шага, который сейчас обрабатывается (None - фоновые запросы)
+_step_queries: ContextVar[Optional[List[int]]] = ContextVar('loadtest_step_queries', default=None)
+_background_queries = [0]
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _step_queries.get()
+    (counter if counter is not None else _background_queries)[0] += 1
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Сессия бота без обращения к Bot API
+    
+    Отвечает на SendMessage и EditMessageText синтетическим Message, на остальные методы - True,
+    и запоминает последний текст, отправленный в каждый чат.
+    
+    Args:
+        latency (float): Задержка ответа "Telegram" на каждый запрос (в секундах)
+    """
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.last_text: Dict[int, str] = {}
+        self._message_ids = itertools.count(1)
+    
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.requests[type(method).__name__] += 1
+        
+        chat_id = getattr(method, 'chat_id', None)
+        text = getattr(method, 'text', None)
+        if chat_id is not None and text is not None:
+            self.last_text[int(chat_id)] = text
+        
+        if isinstance(method, (SendMessage, EditMessageText)):
+            return Message(
+                message_id=getattr(method, 'message_id', None) or next(self._message_ids),
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=int(chat_id), type='private'),
+                from_user=User(id=bot.id, is_bot=True, first_name='Bot'),
+                text=text
+            ).as_(bot)
+        return True
+    
+    async def stream_content(
+        self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True
+    ) -> AsyncGenerator[bytes, None]:
+        '''Бот в сценарии файлы не скачивает: файл "Telegram" всегда пустой'''
+        for chunk in ():
+            yield chunk
+    
+    async def close(self) -> None:
+        pass
+
+
+@dataclass
+class _SeededQuestion:
+    id: int
+    expected_format: AnswerFormat
+    choices: Optional[List[str]]
+
+
+@dataclass
+class _SeededData:
+    vacancy_id: int
+    questions: List[_SeededQuestion]
+    # Токен отклика каждого виртуального кандидата, по порядку
+    tokens: List[str]
+    candidate_ids: List[int]
+    application_ids: List[int]
+
+
+def _seed(candidates: int) -> _SeededData:
+    '''Создать вакансию с вопросами из QUESTION_DATA и отклики с токенами для виртуальных кандидатов'''
+    now = _utcnow()
+    with Session() as db:
+        vacancy = Vacancy(
+            title=f'Нагрузочный тест {now.isoformat(timespec="seconds")}',
+            description='Создано tests/loadtest_candidate_flow.py',
+            created_at=now
+        )
+        db.add(vacancy)
+        db.flush()
+        
+        questions = [
+            BotQuestion(
+                vacancy_id=vacancy.id,
+                question_text=q_data['question_text'],
+                order=q_data['order'],
+                expected_format=q_data['expected_format'],
+                choices=q_data['choices'],
+                is_for_screening=False
+            )
+            for q_data in QUESTION_DATA
+        ]
+        db.add_all(questions)
+        
+        candidate_rows = [Candidate(full_name=f'Виртуальный Кандидат {index}') for index in range(candidates)]
+        db.add_all(candidate_rows)
+        db.flush()
+        
+        tokens = [generate_application_token() for _ in range(candidates)]
+        application_rows = [
+            Application(
+                candidate_id=candidate.id,
+                vacancy_id=vacancy.id,
+                status=ApplicationStatus.ACTIVE,
+                application_date=now,
+                auth_token=token,
+                token_expiry=now + timedelta(days=1)
+            )
+            for candidate, token in zip(candidate_rows, tokens)
+        ]
+        db.add_all(application_rows)
+        db.flush()
+        
+        seeded = _SeededData(
+            vacancy_id=vacancy.id,
+            questions=[
+                _SeededQuestion(q.id, AnswerFormat[q_data['expected_format']], q_data['choices'])
+                for q, q_data in sorted(zip(questions, QUESTION_DATA), key=lambda pair: pair[1]['order'])
+            ],
+            tokens=tokens,
+            candidate_ids=[candidate.id for candidate in candidate_rows],
+            application_ids=[application.id for application in application_rows]
+        )
+        db.commit()
+    return seeded
+
+
+def _cleanup(seeded: _SeededData) -> None:
+    with Session() as db:
+        application_ids = seeded.application_ids
+        db.execute(delete(ScreeningJob).where(ScreeningJob.application_id.in_(application_ids)))
+        db.execute(delete(FormReminder).where(FormReminder.application_id.in_(application_ids)))
+        db.execute(delete(BotInteraction).where(BotInteraction.application_id.in_(application_ids)))
+        db.execute(delete(Application).where(Application.id.in_(application_ids)))
+        db.execute(delete(Candidate).where(Candidate.id.in_(seeded.candidate_ids)))
+        db.execute(delete(BotQuestion).where(BotQuestion.vacancy_id == seeded.vacancy_id))
+        db.execute(delete(Vacancy).where(Vacancy.id == seeded.vacancy_id))
+        db.commit()
+
+
+class StepStats:
+    '''Время обработки апдейтов и количество запросов к БД по шагам сценария'''
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+    
+    def record(self, step: str, latency: float, queries: int) -> None:
+        self.latencies[step].append(latency)
+        self.queries[step].append(queries)
+    
+    def _ordered(self):
+        return sorted(self.latencies.items(), key=lambda item: STEPS.index(item[0]))
+    
+    def report(self) -> None:
+        print(f'{"step":<12}{"updates":>9}{"mean ms":>10}{"p50":>9}{"p90":>9}{"p99":>9}{"max":>9}{"queries":>9}')
+        for step, latencies in self._ordered():
+            ordered = sorted(latency * 1000 for latency in latencies)
+            percentile = lambda percent: ordered[min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))]
+            print(
+                f'{step:<12}{len(ordered):>9}{statistics.mean(ordered):>10.1f}{percentile(50):>9.1f}'
+                f'{percentile(90):>9.1f}{percentile(99):>9.1f}{ordered[-1]:>9.1f}'
+                f'{statistics.mean(self.queries[step]):>9.2f}'
+            )
+        
+        print()
+        for step, latencies in self._ordered():
+            print(f'{step} latency histogram:')
+            counts = Counter()
+            for latency in latencies:
+                latency_ms = latency * 1000
+                counts[next((bucket for bucket in HISTOGRAM_BUCKETS_MS if latency_ms < bucket), None)] += 1
+            largest = max(counts.values())
+            for bucket in HISTOGRAM_BUCKETS_MS + [None]:
+                if not counts[bucket]:
+                    continue
+                label = f'< {bucket} ms' if bucket is not None else f'>= {HISTOGRAM_BUCKETS_MS[-1]} ms'
+                bar = '#' * max(1, round(40 * counts[bucket] / largest))
+                print(f'  {label:>12} {counts[bucket]:>7} {bar}')
+
+
+class VirtualCandidate:
+    """
+    Виртуальный кандидат, который проходит анкету через dp.feed_update
+    
+    Args:
+        index (int): Номер кандидата
+        token (str): Токен его отклика
+        questions (List[_SeededQuestion]): Вопросы анкеты по порядку
+        bot (Bot): Бот с FakeTelegramSession
+        stats (StepStats): Общая статистика шагов
+        think_time (float): Максимальная пауза "на раздумье" перед каждым действием (в секундах)
+        edit (bool): Исправить ли один ответ на сверке перед отправкой
+    """
+    _update_ids = itertools.count(1)
+    _message_ids = itertools.count(1)
+    
+    def __init__(self, index: int, token: str, questions: List[_SeededQuestion], bot: Bot, stats: StepStats, think_time: float, edit: bool):
+        self.telegram_id = VIRTUAL_TELEGRAM_ID_BASE + index
+        self.token = token
+        self.questions = questions
+        self.bot = bot
+        self.stats = stats
+        self.think_time = think_time
+        self.edit = edit
+        self.user = User(id=self.telegram_id, is_bot=False, first_name=f'Candidate{index}')
+        self.chat = Chat(id=self.telegram_id, type='private')
+    
+    def _message(self, **kwargs) -> Message:
+        return Message(
+            message_id=next(self._message_ids),
+            date=datetime.now(timezone.utc),
+            chat=self.chat,
+            from_user=self.user,
+            **kwargs
+        )
+    
+    def _bot_message(self) -> Message:
+        '''Сообщение бота, к которому привязана нажатая кнопка'''
+        return Message(
+            message_id=next(self._message_ids),
+            date=datetime.now(timezone.utc),
+            chat=self.chat,
+            from_user=User(id=self.bot.id, is_bot=True, first_name='Bot'),
+            text='...'
+        )
+    
+    async def _feed(self, step: str, update: Update) -> None:
+        if self.think_time:
+            await asyncio.sleep(random.uniform(0, self.think_time))
+        counter = [0]
+        token = _step_queries.set(counter)
+        started_at = time.perf_counter()
+        try:
+            await dp.feed_update(self.bot, update)
+        finally:
+            latency = time.perf_counter() - started_at
+            _step_queries.reset(token)
+        self.stats.record(step, latency, counter[0])
+    
+    async def send_text(self, step: str, text: str) -> None:
+        await self._feed(step, Update(update_id=next(self._update_ids), message=self._message(text=text)))
+    
+    async def send_document(self, step: str) -> None:
+        document = Document(file_id=f'loadtest-{self.telegram_id}', file_unique_id=f'loadtest-{self.telegram_id}')
+        await self._feed(step, Update(update_id=next(self._update_ids), message=self._message(document=document)))
+    
+    async def press(self, step: str, data: str) -> None:
+        callback = CallbackQuery(
+            id=str(next(self._update_ids)),
+            from_user=self.user,
+            chat_instance=str(self.telegram_id),
+            message=self._bot_message(),
+            data=data
+        )
+        await self._feed(step, Update(update_id=next(self._update_ids), callback_query=callback))
+    
+    async def _answer(self, step: str, question: _SeededQuestion, prefix: str) -> None:
+        if question.expected_format == AnswerFormat.CHOICE and question.choices:
+            await self.press(step, f'{prefix}_{random.randrange(len(question.choices))}')
+        elif question.expected_format == AnswerFormat.FILE:
+            await self.send_document(step)
+        else:
+            await self.send_text(step, f'Ответ кандидата {self.telegram_id} ' * random.randint(1, 5))
+    
+    async def run(self) -> bool:
+        '''Пройти сценарий, True - если анкета отправлена'''
+        await self.send_text('start', '/start')
+        await self.send_text('token_auth', self.token)
+        await self.send_text('consent', msg_templates.CONSENT_AGREE_BUTTON)
+        
+        for number, question in enumerate(self.questions):
+            # Ответ на последний вопрос открывает сверку ответов
+            step = 'review' if number == len(self.questions) - 1 else 'answer'
+            await self._answer(step, question, 'choice')
+        
+        if self.edit:
+            question = random.choice(self.questions)
+            await self.press('edit_open', f'edit_{question.id}')
+            await self._answer('edit_answer', question, 'edit_choice')
+        
+        await self.press('submit', 'submit_answers')
+        return self.bot.session.last_text.get(self.telegram_id) == msg_templates.ON_FORM_SUBMIT
+
+
+async def _load_test(args: argparse.Namespace, seeded: _SeededData) -> None:
+    if args.storage == 'memory':
+        dp.fsm.storage = MemoryStorage()
+    
+    session = FakeTelegramSession(latency=args.telegram_latency)
+    bot = Bot(TELEGRAM_BOT_TOKEN, session=session)
+    stats = StepStats()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures: Counter = Counter()
+    
+    async def run_candidate(index: int) -> None:
+        candidate = VirtualCandidate(
+            index=index,
+            token=seeded.tokens[index],
+            questions=seeded.questions,
+            bot=bot,
+            stats=stats,
+            think_time=args.think_time,
+            edit=random.random() < args.edit_rate
+        )
+        async with semaphore:
+            try:
+                completed = await candidate.run()
+            except Exception as e:
+                failures[f'{type(e).__name__}: {str(e)[:80]}'] += 1
+                return
+        if not completed:
+            failures[f'last message: {session.last_text.get(candidate.telegram_id, "")[:80]!r}'] += 1
+    
+    # Ответы кандидатов записываются в БД буфером, как в боте
+    buffer_task = asyncio.create_task(interaction_buffer.run())
+    started_at = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_candidate(index) for index in range(args.candidates)))
+    finally:
+        elapsed = time.perf_counter() - started_at
+        buffer_task.cancel()
+        await asyncio.gather(buffer_task, return_exceptions=True)
+        await interaction_buffer.flush()
+    
+    updates = sum(len(latencies) for latencies in stats.latencies.values())
+    print(
+        f'Candidates: {args.candidates}, concurrency: {args.concurrency}, storage: {args.storage}, '
+        f'questions: {len(seeded.questions)}'
+    )
+    print(
+        f'Completed: {args.candidates - sum(failures.values())}, failed: {sum(failures.values())}, '
+        f'wall time: {elapsed:.1f}s, updates: {updates} ({updates / elapsed:.1f}/s)'
+    )
+    print(f'Background DB queries (interaction buffer): {_background_queries[0]}')
+    print(f'Bot API requests: {dict(session.requests)}')
+    for failure, count in failures.most_common(10):
+        print(f'  FAILED x{count}: {failure}')
+    print()
+    stats.report()
+    
+    await dp.fsm.storage.close()
+    await async_engine.dispose()
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description='Load test of the candidate questionnaire flow')
+    arg_parser.add_argument('--candidates', type=int, default=1000, help='How many virtual candidates to run')
+    arg_parser.add_argument('--concurrency', type=int, default=200, help='How many candidates fill the form at once')
+    arg_parser.add_argument('--think-time', type=float, default=0.5, help='Max random pause before each action (seconds)')
+    arg_parser.add_argument('--edit-rate', type=float, default=0.2, help='Share of candidates who edit one answer on review')
+    arg_parser.add_argument('--storage', choices=['mongo', 'memory'], default='mongo', help='FSM storage: MongoStorage from .env or MemoryStorage')
+    arg_parser.add_argument('--telegram-latency', type=float, default=0.0, help='Delay of every fake Bot API request (seconds)')
+    arg_parser.add_argument('--keep', action='store_true', help='Do not delete seeded rows after the test')
+    arg_parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    args = arg_parser.parse_args()
+    
+    random.seed(args.seed)
+    # Ошибки обработчиков видны в отчете по неотправленным анкетам
+    logging.basicConfig(level=logging.CRITICAL)
+    
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', _count_query)
+    seeded = _seed(args.candidates)
+    try:
+        asyncio.run(_load_test(args, seeded))
+    finally:
+        if not args.keep:
+            _cleanup(seeded)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())